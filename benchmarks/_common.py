@@ -0,0 +1,43 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """Runs `fn` `repeat` times and returns the best and mean wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "mean_s": statistics.mean(timings)}
+
+
+def tokenizer(model: str):
+    """Returns (encoding, tokens_per_msg, tokens_per_name), falling back to ApproximateEncoding offline."""
+    from sqthon.util import ApproximateEncoding, token_settings
+
+    try:
+        return token_settings(model)
+    except Exception:
+        return ApproximateEncoding(), 3, 1
+
+
+def write_results(name: str, results: list, output: str = None):
+    """Prints the results as JSON and writes them to `output` if given."""
+    payload = {
+        "benchmark": name,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2, default=str)
+    print(text)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            f.write(text)
+    return payload
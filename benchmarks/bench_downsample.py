@@ -0,0 +1,85 @@
+"""
+Render time of DataVisualizer.plot with and without level-of-detail downsampling.
+
+For each size, times the LTTB reduction alone and a full render (Agg, saved to memory) of line,
+scatter and hist plots with downsampling on. The un-reduced seaborn render is only measured up
+to --baseline-max rows, since it takes minutes beyond that.
+
+    python -m benchmarks.bench_downsample --sizes 1e6 1e7 1e8
+"""
+import argparse
+import io
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from benchmarks._common import write_results
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": np.arange(rows, dtype=np.float64),
+        "y": np.cumsum(rng.normal(size=rows)),
+    })
+
+
+def render(data: pd.DataFrame, plot_type: str, max_points: int) -> float:
+    from sqthon.data_visualizer import DataVisualizer
+
+    show = plt.show
+    plt.show = lambda: None
+    try:
+        start = time.perf_counter()
+        y = None if plot_type == "hist" else "y"
+        DataVisualizer.plot(data, plot_type=plot_type, x="x" if y else "y", y=y, max_points=max_points)
+        plt.savefig(io.BytesIO(), format="png")
+        return time.perf_counter() - start
+    finally:
+        plt.show = show
+        plt.close("all")
+
+
+def run(sizes: list, max_points: int = 10_000, baseline_max: int = 1_000_000) -> list:
+    from sqthon.downsample import lttb
+
+    results = []
+    for rows in sizes:
+        data = make_frame(rows)
+        start = time.perf_counter()
+        lttb(data["x"].to_numpy(), data["y"].to_numpy(), max_points)
+        lttb_s = time.perf_counter() - start
+
+        for plot_type in ("line", "scatter", "hist"):
+            record = {
+                "rows": rows,
+                "plot_type": plot_type,
+                "max_points": max_points,
+                "lttb_s": lttb_s if plot_type == "line" else None,
+                "downsampled_s": render(data, plot_type, max_points),
+                "full_s": render(data, plot_type, 0) if rows <= baseline_max else None,
+            }
+            results.append(record)
+        del data
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e6, 1e7])
+    parser.add_argument("--max-points", type=int, default=10_000)
+    parser.add_argument("--baseline-max", type=float, default=1e6)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes]
+    write_results("downsample", run(sizes, args.max_points, int(args.baseline_max)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Import time of sqthon, measured with `python -X importtime` in fresh interpreters.
+
+Each statement is imported --repeat times in a new process; the best cumulative time of its
+top-level module is reported together with the heavy modules it pulled in. Exits with status 1
+if a statement is over its budget or loads a module it shouldn't, so it can gate CI.
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+from benchmarks._common import write_results
+
+
+# (statement, budget in ms, modules that must not be imported)
+CASES = [
+    ("import sqthon", 20, ("sqthon.main", "pandas", "sqlalchemy")),
+    ("from sqthon import Sqthon", 1500, ("seaborn", "matplotlib", "openai", "tiktoken", "rich", "win32com")),
+]
+
+HEAVY = ("seaborn", "matplotlib", "openai", "tiktoken", "rich", "win32com", "pandas", "sqlalchemy")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(statement: str) -> tuple:
+    """Returns (µs spent importing sqthon modules, set of imported modules) for a statement."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    total, modules = 0, set()
+    for line in process.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        modules.add(match.group(4))
+        # Top-level sqthon imports; their cumulative times include everything they pulled in,
+        # but not the interpreter's own startup imports.
+        if len(match.group(3)) == 1 and match.group(4).split(".")[0] == "sqthon":
+            total += int(match.group(2))
+    return total, modules
+
+
+def run(repeat: int, scale: float) -> list:
+    results = []
+    for statement, budget_ms, forbidden in CASES:
+        profiles = [import_profile(statement) for _ in range(repeat)]
+        best_ms = min(total for total, _ in profiles) / 1000
+        modules = profiles[0][1]
+        results.append({
+            "statement": statement,
+            "best_ms": round(best_ms, 1),
+            "budget_ms": budget_ms * scale,
+            "heavy_modules": sorted(name for name in HEAVY if name in modules),
+            "forbidden_loaded": sorted(name for name in forbidden if name in modules),
+            "ok": best_ms <= budget_ms * scale and not any(name in modules for name in forbidden),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiplies every budget, for slow machines.")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    results = run(args.repeat, args.budget_scale)
+    write_results("import", results, args.output)
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-call latency of run_query by result type, for the small lookups where DataFrame
+construction is most of the cost.
+
+Cases, on a SQLite table with --rows rows:
+    raw         connection.execute(...).fetchall() without sqthon, the floor.
+    frame       run_query(query), a DataFrame.
+    rows        run_query(query, as_="rows").
+    columns     run_query(query, as_="columns").
+    scalar      run_query(query, as_="scalar") (the scalar query only).
+
+Each is timed for a one-value lookup and a 100-row range read.
+
+    python -m benchmarks.bench_result_types --calls 5000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from benchmarks._common import write_results
+
+QUERIES = {
+    "scalar_lookup": "SELECT value FROM facts WHERE id = 4242",
+    "range_100": "SELECT id, kind, value FROM facts WHERE id BETWEEN 1000 AND 1099",
+}
+
+
+def per_call(fn, calls: int, repeat: int = 3) -> dict:
+    """Best and median of `repeat` runs, in microseconds per call."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    return {"best_us": min(timings), "median_us": statistics.median(timings)}
+
+
+def run(rows: int, calls: int) -> list:
+    from sqthon import Sqthon
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(
+            database=os.path.join(directory, "lookup.db"))
+        ctx.connection.execute(text("CREATE TABLE facts (id INTEGER PRIMARY KEY, kind TEXT, value REAL)"))
+        ctx.connection.execute(text("INSERT INTO facts (kind, value) VALUES (:kind, :value)"),
+                               [{"kind": f"k{i % 20}", "value": i * 0.5} for i in range(rows)])
+        ctx.connection.commit()
+
+        for name, query in QUERIES.items():
+            cases = {
+                "raw": lambda: ctx.connection.execute(text(query)).fetchall(),
+                "frame": lambda: ctx.run_query(query),
+                "rows": lambda: ctx.run_query(query, as_="rows"),
+                "columns": lambda: ctx.run_query(query, as_="columns"),
+            }
+            if name == "scalar_lookup":
+                cases["scalar"] = lambda: ctx.run_query(query, as_="scalar")
+            for case, fn in cases.items():
+                results.append({"query": name, "case": case, "calls": calls, **per_call(fn, calls)})
+        ctx.connection.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    write_results("result_types", run(args.rows, args.calls), args.output)
+
+
+if __name__ == "__main__":
+    main()
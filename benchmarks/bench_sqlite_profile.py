@@ -0,0 +1,116 @@
+"""
+SQLite PRAGMA profiles and connection modes against SQLite's defaults.
+
+Configurations:
+    default      sqlite_profile="default", the file opened read-write.
+    performance  sqlite_profile="performance" (WAL, synchronous=NORMAL, mmap, busy_timeout).
+    memory_heavy sqlite_profile="memory_heavy": performance plus temp_store=MEMORY and a 64 MB cache.
+    read_only    The performance profile on a read-only engine (reads only).
+    memory       The performance profile on a shared in-memory database.
+
+Cases, for every size in --sizes:
+    insert         Loads `rows` rows in --transactions separate transactions.
+    aggregate      A GROUP BY over the table on one connection.
+    parallel_read  --threads threads running the aggregate at the same time on pooled connections.
+
+    python -m benchmarks.bench_sqlite_profile --sizes 1e5 1e6 --threads 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import text
+
+from benchmarks._common import measure, write_results
+
+AGGREGATE = "SELECT kind, COUNT(*), AVG(value), MAX(created_at) FROM facts GROUP BY kind"
+
+
+def make_rows(rows: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(0, 50, size=rows)
+    values = rng.normal(size=rows)
+    return [
+        {"kind": f"kind_{k}", "value": float(v), "created_at": f"2024-01-01 00:00:{i % 60:02d}"}
+        for i, (k, v) in enumerate(zip(kinds, values))
+    ]
+
+
+def load(engine, rows: list, transactions: int):
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS facts"))
+        conn.execute(text("CREATE TABLE facts (id INTEGER PRIMARY KEY, kind TEXT, value REAL, created_at TEXT)"))
+    batch = max(len(rows) // transactions, 1)
+    for start in range(0, len(rows), batch):
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO facts (kind, value, created_at) VALUES (:kind, :value, :created_at)"),
+                         rows[start:start + batch])
+
+
+def aggregate(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(AGGREGATE)).fetchall()
+
+
+def parallel_read(engine, threads: int):
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: aggregate(engine), range(threads)))
+
+
+def run(sizes: list, repeat: int, threads: int, transactions: int) -> list:
+    from sqthon.sqlite_profile import create_sqlite_engine
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            data = make_rows(rows)
+            configs = [
+                ("default", lambda: create_sqlite_engine(os.path.join(directory, f"default_{rows}.db"),
+                                                         pool_size=threads)),
+                ("performance", lambda: create_sqlite_engine(os.path.join(directory, f"perf_{rows}.db"),
+                                                             profile="performance", pool_size=threads)),
+                ("memory_heavy", lambda: create_sqlite_engine(os.path.join(directory, f"heavy_{rows}.db"),
+                                                              profile="memory_heavy", pool_size=threads)),
+                ("memory", lambda: create_sqlite_engine(f"bench_{rows}", profile="performance", mode="memory",
+                                                        pool_size=threads)),
+            ]
+            for name, make_engine in configs:
+                engine = make_engine()
+                start = time.perf_counter()
+                load(engine, data, transactions)
+                results.append({"config": name, "case": "insert", "rows": rows,
+                                "best_s": time.perf_counter() - start, "mean_s": None})
+                results.append({"config": name, "case": "aggregate", "rows": rows,
+                                **measure(lambda: aggregate(engine), repeat)})
+                results.append({"config": name, "case": "parallel_read", "rows": rows, "threads": threads,
+                                **measure(lambda: parallel_read(engine, threads), repeat)})
+
+                if name == "performance":
+                    reader = create_sqlite_engine(os.path.join(directory, f"perf_{rows}.db"),
+                                                  profile="performance", mode="ro", pool_size=threads)
+                    results.append({"config": "read_only", "case": "aggregate", "rows": rows,
+                                    **measure(lambda: aggregate(reader), repeat)})
+                    results.append({"config": "read_only", "case": "parallel_read", "rows": rows,
+                                    "threads": threads, **measure(lambda: parallel_read(reader, threads), repeat)})
+                    reader.dispose()
+                engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5, 1e6])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes]
+    write_results("sqlite_profile", run(sizes, args.repeat, args.threads, args.transactions), args.output)
+
+
+if __name__ == "__main__":
+    main()
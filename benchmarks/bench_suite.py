@@ -0,0 +1,181 @@
+"""
+Baseline benchmark suite. Runs offline against SQLite with generated data.
+
+Cases, for every size in --sizes:
+    run_query                        SELECT * of the facts table into a DataFrame.
+    run_query_sample_1pct            The same with sample=0.01 (rowid-range sampling).
+    parallel_read_4                  The facts table as 4 rowid ranges read concurrently.
+    create_table_import              create_table from a CSV and load the CSV with pandas.
+    database_schema                  Reflection of --tables tables (size independent, run once).
+    generate_date_series             An hourly date dimension with `rows` rows.
+    make_dataframe_json_serializable The facts table as JSON records.
+    execute_fn                       One ask_db round trip through LLM.execute_fn with a fake
+                                     OpenAI client, so only sqthon's own work is timed.
+
+    python -m benchmarks.bench_suite --sizes 1e4 1e5 1e6 --output results/main.json
+    python -m benchmarks.bench_suite --baseline results/main.json   # compare against a run
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from benchmarks._common import measure, write_results
+
+
+def make_facts(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    note = np.where(rng.random(rows) < 0.1, None, "note")
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "ts": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, rows), unit="s"),
+        "category": rng.choice(["alpha", "beta", "gamma", "delta"], rows),
+        "amount": rng.normal(100, 25, rows).round(2),
+        "qty": rng.integers(1, 50, rows),
+        "note": note,
+    })
+
+
+class FakeCompletions:
+    """Answers the first call of a prompt with an ask_db tool call and the second with text."""
+
+    def __init__(self, query: str):
+        self.query = query
+
+    def create(self, model, messages, **kwargs):
+        last = messages[-1]
+        if (last["role"] if isinstance(last, dict) else last.role) == "tool":
+            message = SimpleNamespace(role="assistant", content="Done.", tool_calls=None)
+        else:
+            call = SimpleNamespace(id="call_0", type="function",
+                                   function=SimpleNamespace(name="ask_db", arguments=json.dumps({"query": self.query})))
+            message = SimpleNamespace(role="assistant", content=None, tool_calls=[call])
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10, total_tokens=110)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def fake_openai_client(query: str):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(query)))
+
+
+def connect(directory: str, name: str):
+    from sqthon import Sqthon
+
+    return Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=os.path.join(directory, name))
+
+
+def run(sizes: list, repeat: int, n_tables: int, model: str) -> list:
+    from sqthon.providers import OpenAIProvider
+    from sqthon.util import ApproximateEncoding, create_table, make_dataframe_json_serializable
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        schema_ctx = connect(directory, "schema.db")
+        for i in range(n_tables):
+            schema_ctx.connection.execute(text(
+                f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY, name TEXT, value REAL, created_at TEXT)"
+            ))
+        schema_ctx.connection.commit()
+        timing = measure(schema_ctx.get_database_schema, repeat)
+        results.append({"case": "database_schema", "rows": n_tables, **timing})
+
+        for rows in sizes:
+            ctx = connect(directory, f"facts_{rows}.db")
+            facts = make_facts(rows)
+            facts.to_sql("facts", ctx.connection, index=False, chunksize=100_000)
+            ctx.connection.commit()
+
+            timing = measure(lambda: ctx.run_query("SELECT * FROM facts"), repeat)
+            results.append({"case": "run_query", "rows": rows, **timing})
+
+            timing = measure(lambda: ctx.run_query("SELECT * FROM facts", sample=0.01), repeat)
+            results.append({"case": "run_query_sample_1pct", "rows": rows, **timing})
+
+            timing = measure(lambda: ctx.parallel_read("facts", "rowid", num_partitions=4), repeat)
+            results.append({"case": "parallel_read_4", "rows": rows, **timing})
+
+            csv_path = os.path.join(directory, f"facts_{rows}.csv")
+            facts.to_csv(csv_path, index=False)
+
+            def create_and_import():
+                ctx.connection.execute(text("DROP TABLE IF EXISTS imported"))
+                ctx.connection.commit()
+                create_table(csv_path, "imported", ctx.connection)
+                pd.read_csv(csv_path).to_sql("imported", ctx.connection, if_exists="append", index=False,
+                                             chunksize=100_000)
+                ctx.connection.commit()
+
+            timing = measure(create_and_import, repeat)
+            results.append({"case": "create_table_import", "rows": rows, **timing})
+
+            end = str(pd.Timestamp("1970-01-01") + pd.Timedelta(hours=rows - 1))
+            timing = measure(lambda: ctx.generate_date_series("dates", "1970-01-01", end, frequency="h",
+                                                              if_exists="replace"), repeat)
+            results.append({"case": "generate_date_series", "rows": rows, **timing})
+
+            timing = measure(lambda: make_dataframe_json_serializable(facts), repeat)
+            results.append({"case": "make_dataframe_json_serializable", "rows": rows, **timing})
+
+            from sqthon.llm import LLM
+
+            llm = LLM(model=model, connection=ctx.connection,
+                      provider=OpenAIProvider(client=fake_openai_client("SELECT * FROM facts")))
+            llm._tokenizer = (ApproximateEncoding(), 3, 1)
+
+            def ask():
+                llm.messages = llm.new_conversation()
+                llm.messages.append({"role": "user", "content": "Show me the facts."})
+                llm.execute_fn()
+
+            timing = measure(ask, repeat)
+            results.append({"case": "execute_fn", "rows": rows, **timing})
+
+            ctx.connection.close()
+            del facts
+    return results
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> bool:
+    """Adds the baseline time and the ratio to each result. Returns False if any case regressed."""
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["rows"]): r["best_s"] for r in json.load(f)["results"]}
+    ok = True
+    for result in results:
+        before = baseline.get((result["case"], result["rows"]))
+        if before is None:
+            continue
+        result["baseline_s"] = before
+        result["ratio"] = result["best_s"] / before if before else None
+        result["regressed"] = result["ratio"] is not None and result["ratio"] > threshold
+        ok = ok and not result["regressed"]
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e4, 1e5, 1e6])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare with.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Ratio to the baseline above which a case counts as a regression.")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = run([int(size) for size in args.sizes], args.repeat, args.tables, args.model)
+    ok = compare(results, args.baseline, args.threshold) if args.baseline else True
+    write_results("suite", results, args.output)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-turn cost of LLM.trim_chat.
+
+Simulates a long chat where every turn carries a tool call and a sizeable tool result, and
+reports for each turn the time spent trimming (with cached per-message counts), the time a
+full recount would take, and the number of tokens left in the conversation.
+
+    python -m benchmarks.bench_trim_chat --turns 60 --rows 200
+"""
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks._common import tokenizer, write_results
+
+
+def build_llm(model: str):
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    from sqthon.llm import LLM
+
+    llm = LLM(model=model, connection=create_engine("sqlite://").connect())
+    llm._tokenizer = tokenizer(model)
+    return llm
+
+
+def turn(i: int, rows: int) -> list:
+    tool_result = [{"id": r, "name": f"customer {r}", "revenue": r * 13.7} for r in range(rows)]
+    return [
+        {"role": "user", "content": f"Question number {i} about revenue?"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "ask_db", "arguments": json.dumps({"query": "SELECT * FROM customers"})},
+            }],
+        },
+        {"role": "tool", "tool_call_id": f"call_{i}", "name": "ask_db", "content": json.dumps(tool_result)},
+        {"role": "assistant", "content": f"Answer number {i}."},
+    ]
+
+
+def run(turns: int = 60, rows: int = 200, model: str = "gpt-4o-mini", budget: int = 16000) -> list:
+    from sqthon.util import message_tokens
+
+    llm = build_llm(model)
+    llm.max_context_tokens = budget
+    encoding, per_msg, per_name = llm._tokenizer
+    results = []
+    for i in range(turns):
+        llm.messages.extend(turn(i, rows))
+
+        start = time.perf_counter()
+        tokens = llm.trim_chat()
+        trim_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sum(message_tokens(msg, encoding, per_msg, per_name) for msg in llm.messages)
+        recount_s = time.perf_counter() - start
+
+        results.append({
+            "turn": i,
+            "messages": len(llm.messages),
+            "tokens": tokens,
+            "trim_ms": trim_s * 1000,
+            "full_recount_ms": recount_s * 1000,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=16000)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    write_results("trim_chat", run(args.turns, args.rows, args.model, args.budget), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,22 @@
-from .main import Sqthon
-from .data_visualizer import DataVisualizer
+# Submodules are imported on first attribute access, so `import sqthon` doesn't load
+# seaborn, matplotlib or the LLM clients until they're used.
+_LAZY = {
+    "Sqthon": "sqthon.main",
+    "DataVisualizer": "sqthon.data_visualizer",
+}
 
 __all__ = ["Sqthon", "DataVisualizer"]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'sqthon' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -4,6 +4,11 @@ from sqlalchemy import create_engine, URL
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError, ArgumentError
 from typing import final
+from sqthon.exception import ServiceConnectionError
+from sqthon.lifecycle import ServerBackend, default_backend, is_local_host, is_reachable, wait_until_ready
+from sqthon.sqlite_profile import SqliteMode, create_sqlite_engine
+from sqthon.pool import GaugedQueuePool, prewarm
+from sqthon.tracing import instrument_engine, span
 
 
 # TODO: Dialects to be added: SQlite ✅, Oracle, Microsoft SQL Server.
@@ -29,7 +34,8 @@ class DatabaseConnector:
     """
 
     def __init__(
-        self, dialect: str, user: str, host: str, service_instance_name: str = None
+        self, dialect: str, user: str, host: str, service_instance_name: str = None,
+        lifecycle: ServerBackend = None, ready_timeout: float = 30,
     ):
         """
         Initializes the DatabaseConnector instance with specified connection parameters.
@@ -39,6 +45,11 @@ class DatabaseConnector:
             user (str): The database user for authentication.
             host (str): The host address of the database.
             service_instance_name (str, optional): An identifier for the database service instance, if any.
+                It names the Windows service or the systemd unit started when the server is down.
+            lifecycle (ServerBackend, optional): Starts the server when it isn't reachable
+                (see sqthon.lifecycle). Defaults to the Windows service or systemd unit when
+                `host` is this machine; remote servers are only started with an explicit backend.
+            ready_timeout (float): Seconds to wait for a started server to answer queries.
 
         Important:
             To enhance security, avoid hardcoding sensitive information like passwords in your code.
@@ -50,6 +61,8 @@ class DatabaseConnector:
         self.user = user
         self.host = host
         self.service_instance_name = service_instance_name
+        self.lifecycle = lifecycle
+        self.ready_timeout = ready_timeout
         self.engines = {}
         self.connections = {}
 
@@ -62,13 +75,19 @@ class DatabaseConnector:
 
     @final
     def _create_engine(
-        self, database: str, local_infile: bool, pool_size: int, max_overflow: int
+        self, database: str, local_infile: bool, pool_size: int, max_overflow: int,
+        sqlite_profile: str | dict = "default", sqlite_mode: SqliteMode = "rw",
+        pool_pre_ping: bool = False, pool_timeout: float = 30, pool_recycle: int = 3600,
     ) -> Engine:
 
         try:
 
             if self.dialect.lower() == "sqlite":
-                return create_engine(f"sqlite:///{database}")
+                return instrument_engine(create_sqlite_engine(
+                    database, profile=sqlite_profile, mode=sqlite_mode,
+                    pool_size=pool_size, max_overflow=max_overflow,
+                    pool_pre_ping=pool_pre_ping, pool_timeout=pool_timeout, pool_recycle=pool_recycle,
+                ))
 
             # TODO: if more than one same username exists then password fetching gonna give problems.
             password = os.getenv(f"{self.user}password")
@@ -89,13 +108,16 @@ class DatabaseConnector:
                 "local_infile": local_infile,
             }
 
-            return create_engine(
+            return instrument_engine(create_engine(
                 url_object,
                 connect_args=connection_args,
+                poolclass=GaugedQueuePool,
                 pool_size=pool_size,
                 max_overflow=max_overflow,
-                pool_recycle=3600,
-            )
+                pool_pre_ping=pool_pre_ping,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+            ))
         except ArgumentError as ae:
             print(f"Incorrect arguments: {ae}")
 
@@ -144,34 +166,72 @@ class DatabaseConnector:
         local_infile: bool,
         pool_size: int = 20,
         max_overflow: int = 10,
+        sqlite_profile: str | dict = "default",
+        sqlite_mode: SqliteMode = "rw",
+        pool_pre_ping: bool = False,
+        pool_timeout: float = 30,
+        pool_recycle: int = 3600,
+        warm: int = 0,
     ):
+        """
+        Returns the open connection to a database, creating the engine on first use.
+
+        Parameters:
+            database (str): The database name (the file path, or the in-memory name, on SQLite).
+            local_infile (bool): Whether to enable local data infile (MySQL).
+            pool_size (int): Connections kept open by the engine's pool.
+            max_overflow (int): Extra connections allowed under load.
+            pool_pre_ping (bool): Test connections with a round trip on checkout and replace dead ones.
+            pool_timeout (float): Seconds a checkout waits for a free connection before failing.
+            pool_recycle (int): Seconds after which a connection is replaced (-1 never).
+            warm (int): Connections to open in parallel right away, so the first requests don't
+                wait for connection setup. Capped at pool_size.
+            sqlite_profile (str | dict): SQLite PRAGMAs run on every new connection: "default",
+                "performance" (WAL, synchronous=NORMAL, mmap, busy_timeout) or a dict.
+                See sqthon.sqlite_profile.
+            sqlite_mode (str): "rw", "ro" (read-only, many readers) or "memory" (shared in-memory).
+        """
         if database not in self.connections or self.connections[database].closed:
-            try:
-                if database not in self.engines:
-                    self.engines[database] = self._create_engine(
-                        database, local_infile, pool_size, max_overflow
-                    )
-                self.connections[database] = self.engines[database].connect()
-            except OperationalError:
-                from sqthon.services import start_service
-
-                print(f"Looks like {self.dialect} server instance is not running.")
-                print("Trying to start the server...")
+            with span("sqthon.connect", database=database, dialect=self.dialect) as s:
                 try:
-                    if self.service_instance_name is None:
-                        self.service_instance_name = input(
-                            "Enter the server instance name: "
+                    if database not in self.engines:
+                        self.engines[database] = self._create_engine(
+                            database, local_infile, pool_size, max_overflow, sqlite_profile, sqlite_mode,
+                            pool_pre_ping=pool_pre_ping, pool_timeout=pool_timeout, pool_recycle=pool_recycle,
                         )
-                    start_service(self.service_instance_name)
                     self.connections[database] = self.engines[database].connect()
-                    return self.connections[database]
-                except Exception:
-                    raise RuntimeError(
-                        f"Not able established the server! Try to start manually."
-                    )
+                except OperationalError:
+                    engine = self.engines[database]
+                    if engine is None or engine.dialect.name == "sqlite" or is_reachable(engine):
+                        # The server is up; the error is about credentials, the database, etc.
+                        raise
+                    self.start_server()
+                    s.set(server_started=True,
+                          ready_s=wait_until_ready(self.engines[database], timeout=self.ready_timeout))
+                    self.connections[database] = self.engines[database].connect()
+                if warm:
+                    s.set(warm=warm, warm_s=prewarm(self.engines[database], warm))
 
         return self.connections[database]
 
+    @final
+    def start_server(self):
+        """
+        Starts the server with the lifecycle backend. Readiness is checked by the caller.
+
+        Raises:
+            ServiceConnectionError: If there's no backend to start the server with.
+            ServiceStartError: If the backend fails to start it.
+        """
+        backend = self.lifecycle or default_backend(self.dialect, self.service_instance_name, self.host)
+        if backend is None:
+            raise ServiceConnectionError(
+                self.host, msg=f"the {self.dialect} server is not running and no lifecycle backend is configured"
+                               + ("" if is_local_host(self.host) else " (remote hosts need an explicit one)")
+            )
+        print(f"Looks like {self.dialect} server instance is not running. Starting it...")
+        backend.start()
+
     @final
     def disconnect(self, database):
         if database in self.connections and self.connections[database] is not None:
@@ -1,15 +1,52 @@
 import seaborn as sns
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import pandas as pd
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from sqlalchemy import text
 from typing import Literal, Tuple, Any, Optional
 from pathlib import Path
+from sqthon.downsample import as_numeric, downsample_line, sample_rows, histogram_bins
+from sqthon.figure_cache import FigureCache
+from sqthon.tracing import traced
+from sqthon.util import derived_table
 
 
 # TODO: Exception Handling.
 # TODO: add multicolored-line from matplotlib.
 
+
+def _many_labels(values: pd.Series, limit: int = 10) -> bool:
+    """True if the column has more than `limit` distinct values. A strided sample is enough to tell."""
+    step = max(len(values) // 10_000, 1)
+    return values.iloc[::step].nunique() > limit
+
+
+def _hexbin_values(values: pd.Series, axis):
+    """hexbin only takes floats: datetimes become matplotlib date numbers and the axis gets date ticks."""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    locator = mdates.AutoDateLocator()
+    axis.set_major_locator(locator)
+    axis.set_major_formatter(mdates.AutoDateFormatter(locator))
+    return mdates.date2num(values)
+
+
+def _plot_attributes(data, plot_type=None, x=None, y=None, *args, **kwargs) -> dict:
+    return {"plot_type": plot_type, "rows": len(data) if data is not None else None, "x": x, "y": y}
+
+
 class DataVisualizer:
+    # Above this many rows line, scatter, hist and kde plots are drawn from a reduced level of detail.
+    max_points = 10_000
+
     @staticmethod
+    @traced("sqthon.plot", _plot_attributes)
     def plot(
             data: pd.DataFrame,
             plot_type: Literal[
@@ -21,11 +58,18 @@ class DataVisualizer:
             theme: Optional[str] = None,
             palette: Optional[str] = None,
             yticks: Optional[list] = None,
+            max_points: Optional[int] = None,
+            show: bool = True,
             **kwargs: Any
-    ) -> None:
+    ) -> Figure:
         """
         Create various types of plots based on the provided data.
 
+        Large inputs are reduced before they reach seaborn: LTTB for line plots, hexbin density
+        (or a hue-stratified sample) for scatter plots and pre-aggregated bins for hist and kde.
+        Dates stored as text or date objects are treated as dates; other categorical axes are
+        plotted as they are (scatter plots are sampled).
+
         Args:
             data (pd.DataFrame): The dataset to visualize.
             plot_type (str): The type of plot to create.
@@ -36,10 +80,13 @@ class DataVisualizer:
             theme (str, optional): The seaborn theme to use.
             palette (str, optional): The color palette to use.
             yticks (list, optional): adjust the scale of y-axis.
+            max_points (int, optional): Point budget before downsampling kicks in.
+                Defaults to DataVisualizer.max_points; 0 disables downsampling.
+            show (bool): Call plt.show(). Set it to False to render headless and save the figure.
             **kwargs: Additional keyword arguments for the specific plot type.
 
         Returns:
-            None
+            Figure: The matplotlib figure.
         """
         if theme:
             sns.set_theme(theme)
@@ -47,38 +94,73 @@ class DataVisualizer:
         if palette:
             sns.set_palette(palette)
 
+        if max_points is None:
+            max_points = DataVisualizer.max_points
+        hue = kwargs.get("hue")
+        reduce = bool(max_points) and len(data) > max_points and x is not None
+
+        # Figure-level seaborn plots create their own figure.
+        if plot_type == "pairplot":
+            grid = sns.pairplot(data=data, **kwargs)
+            plt.suptitle(title, y=1.02)
+            return grid.figure
+        elif plot_type == "jointplot":
+            grid = sns.jointplot(data=data, x=x, y=y, **kwargs)
+            plt.suptitle(title, y=1.02)
+            return grid.figure
+        elif plot_type == "lmplot":
+            grid = sns.lmplot(data=data, x=x, y=y, **kwargs)
+            plt.title(title)
+            return grid.figure
+
         fig, ax = plt.subplots(figsize=figsize)
 
         if plot_type == "scatter":
-            sns.scatterplot(data=data, x=x, y=y, ax=ax, **kwargs)
+            xs, ys = (as_numeric(data[x]), as_numeric(data[y])) if reduce and y is not None else (None, None)
+            if xs is not None and ys is not None and hue is None:
+                hexbin = ax.hexbin(_hexbin_values(xs, ax.xaxis), _hexbin_values(ys, ax.yaxis), gridsize=kwargs.pop("gridsize", 200), mincnt=1,
+                                   cmap=kwargs.pop("cmap", "viridis"), bins="log")
+                fig.colorbar(hexbin, ax=ax, label="count")
+            else:
+                if reduce:
+                    data = sample_rows(data, max_points, hue=hue)
+                sns.scatterplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "line":
+            if reduce and y is not None:
+                data = downsample_line(data, x, y, max_points, hue=hue)
             sns.lineplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "bar":
             sns.barplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "hist":
-            sns.histplot(data=data, x=x, y=y, ax=ax, **kwargs)
+            xs = as_numeric(data[x]) if reduce and y is None else None
+            datetimes = xs is not None and pd.api.types.is_datetime64_any_dtype(xs)
+            if xs is not None and not (datetimes and ("binwidth" in kwargs or "binrange" in kwargs)):
+                data, edges = histogram_bins(data.assign(**{x: xs}), x, hue=hue, bins=kwargs.pop("bins", 100),
+                                             binwidth=kwargs.pop("binwidth", None),
+                                             binrange=kwargs.pop("binrange", None))
+                if datetimes:
+                    binning = {"bins": len(edges) - 1}
+                else:
+                    # Equal-width edges; seaborn can't take an edge array together with weights.
+                    binning = {"binwidth": edges[1] - edges[0], "binrange": (edges[0], edges[-1])}
+                sns.histplot(data=data, x=x, weights="count", ax=ax, **binning, **kwargs)
+            else:
+                sns.histplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "box":
             sns.boxplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "violin":
             sns.violinplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "heatmap":
             sns.heatmap(data=data, ax=ax, annot=kwargs.pop('annot', True), **kwargs)
-        elif plot_type == "pairplot":
-            sns.pairplot(data=data, **kwargs)
-            plt.suptitle(title, y=1.02)
-            return
-        elif plot_type == "jointplot":
-            sns.jointplot(data=data, x=x, y=y, **kwargs)
-            plt.suptitle(title, y=1.02)
-            return
         elif plot_type == "kde":
-            sns.kdeplot(data=data, x=x, y=y, ax=ax, **kwargs)
+            xs = as_numeric(data[x]) if reduce and y is None else None
+            if xs is not None:
+                data, _ = histogram_bins(data.assign(**{x: xs}), x, hue=hue, bins=1000)
+                sns.kdeplot(data=data, x=x, weights="count", ax=ax, **kwargs)
+            else:
+                sns.kdeplot(data=data, x=x, y=y, ax=ax, **kwargs)
         elif plot_type == "swarm":
             sns.swarmplot(data=data, x=x, y=y, ax=ax, **kwargs)
-        elif plot_type == "lmplot":
-            sns.lmplot(data=data, x=x, y=y, **kwargs)
-            plt.title(title)
-            return
         else:
             raise ValueError(f"Unsupported plot type: {plot_type}")
 
@@ -89,40 +171,139 @@ class DataVisualizer:
             plt.ylabel(y)
 
         # Rotate x-axis labels if they're too long
-        if x and len(data[x].unique()) > 10:
+        if x and _many_labels(data[x]):
             plt.xticks(rotation=45, ha='right')
 
         if yticks:
             ax.set_yticks(yticks)
 
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
+        return fig
 
     @staticmethod
-    def multi_plot(
+    def plot_aggregate(
             data: pd.DataFrame,
+            plot_type: Literal["bar", "hist", "box"],
+            x: Optional[str] = None,
+            y: Optional[str] = None,
+            title: str = "",
+            figsize: Tuple[float, float] = (10, 6),
+            theme: Optional[str] = None,
+            palette: Optional[str] = None,
+            show: bool = True,
+            **kwargs: Any
+    ) -> Figure:
+        """
+        Plot the pre-aggregated rows returned by `pushdown.aggregate_for_plot`.
+
+        Args:
+            data (pd.DataFrame): Aggregated rows (bar: x, y; hist: bin centers and "count";
+                box: min, q1, med, q3, max, per x and the optional `hue` column).
+            plot_type (str): "bar", "hist" or "box".
+            x (str, optional): The column name for x-axis.
+            y (str, optional): The column name for y-axis.
+            title (str): The title of the plot.
+            figsize (Tuple[float, float]): The size of the figure in inches.
+            theme (str, optional): The seaborn theme to use.
+            palette (str, optional): The color palette to use.
+            show (bool): Call plt.show().
+            **kwargs: Additional keyword arguments for the specific plot type.
+
+        Returns:
+            Figure: The matplotlib figure.
+        """
+        if theme:
+            sns.set_theme(theme)
+
+        if palette:
+            sns.set_palette(palette)
+
+        fig, ax = plt.subplots(figsize=figsize)
+
+        if plot_type == "bar":
+            sns.barplot(data=data, x=x, y=y if y else "count", ax=ax, errorbar=None, **kwargs)
+        elif plot_type == "hist":
+            column = x or y
+            sns.histplot(data=data, x=column, weights="count", binwidth=data.attrs["binwidth"],
+                         binrange=data.attrs["binrange"], ax=ax, **kwargs)
+        elif plot_type == "box":
+            # Whiskers reach 1.5 IQR, clipped to the observed min/max; outliers aren't fetched.
+            hue = kwargs.pop("hue", None)
+            stats = []
+            for _, row in data.iterrows():
+                iqr = row["q3"] - row["q1"]
+                label = str(row[x]) if x and y else (y or x)
+                stats.append({
+                    "label": f"{label}\n{row[hue]}" if hue else label,
+                    "med": row["med"],
+                    "q1": row["q1"],
+                    "q3": row["q3"],
+                    "whislo": max(row["min"], row["q1"] - 1.5 * iqr),
+                    "whishi": min(row["max"], row["q3"] + 1.5 * iqr),
+                })
+            boxes = ax.bxp(stats, showfliers=False, patch_artist=bool(hue), **kwargs)
+            if hue:
+                levels = list(dict.fromkeys(data[hue]))
+                colors = dict(zip(levels, sns.color_palette(n_colors=len(levels))))
+                for box, level in zip(boxes["boxes"], data[hue]):
+                    box.set_facecolor(colors[level])
+                ax.legend(handles=[Patch(color=colors[level], label=str(level)) for level in levels], title=hue)
+        else:
+            raise ValueError(f"Unsupported plot type for aggregated data: {plot_type}")
+
+        plt.title(title)
+        if x:
+            plt.xlabel(x)
+        if y:
+            plt.ylabel(y)
+
+        if x and plot_type != "hist" and _many_labels(data[x]):
+            plt.xticks(rotation=45, ha='right')
+
+        plt.tight_layout()
+        if show:
+            plt.show()
+        return fig
+
+    @staticmethod
+    def multi_plot(
+            data: Optional[pd.DataFrame],
             plot_specs: list,
             title: str = "",
             figsize: Tuple[float, float] = (15, 10),
             theme: Optional[str] = None,
             palette: Optional[str] = None,
-            yticks: Optional[list] = None
-    ) -> None:
+            yticks: Optional[list] = None,
+            show: bool = True,
+            context=None,
+            max_workers: Optional[int] = None
+    ) -> Figure:
         """
         Create multiple plots in a single figure.
 
+        A subplot can bring its own data with a 'query' (and optionally the 'context' to run it on).
+        The queries run concurrently on a thread pool, each on its own pooled connection and
+        selecting only the columns the subplot uses, and every panel is drawn as soon as its data
+        arrives.
+
         Args:
-            data (pd.DataFrame): The dataset to visualize.
+            data (pd.DataFrame, optional): The dataset for subplots without a query.
             plot_specs (list): A list of dictionaries, each specifying a subplot.
-                Each dict should contain 'type', 'x', 'y', and any additional kwargs.
+                Each dict should contain 'type', 'x', 'y', and any additional kwargs, and may
+                contain 'query', 'context' and 'subtitle'. The dicts are not modified.
             title (str): The main title of the figure.
             figsize (Tuple[float, float]): The size of the figure in inches.
             theme (str, optional): The seaborn theme to use.
             palette (str, optional): The color palette to use.
             yticks (list, optional): adjust the scale of y-axis.
+            show (bool): Call plt.show().
+            context (DatabaseContext, optional): Runs the queries of specs without their own context.
+            max_workers (int, optional): Queries fetched at the same time. Defaults to one per query.
 
         Returns:
-            None
+            Figure: The matplotlib figure.
         """
         if theme:
             sns.set_theme(theme)
@@ -135,46 +316,45 @@ class DataVisualizer:
         fig, axes = plt.subplots(rows, 2, figsize=figsize)
         axes = axes.flatten()  # Flatten axes array for easy indexing
 
-        for i, plot_spec in enumerate(plot_specs):
-            plot_type = plot_spec.pop('type')
-            x = plot_spec.pop('x', None)
-            y = plot_spec.pop('y', None)
-
-            if plot_type == "scatter":
-                sns.scatterplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "line":
-                sns.lineplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "bar":
-                sns.barplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "hist":
-                sns.histplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "box":
-                sns.boxplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "violin":
-                sns.violinplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "kde":
-                sns.kdeplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
-            elif plot_type == "swarm":
-                sns.swarmplot(data=data, x=x, y=y, ax=axes[i], **plot_spec)
+        specs = [dict(plot_spec) for plot_spec in plot_specs]
+        queried = []
+        for i, spec in enumerate(specs):
+            query = spec.pop("query", None)
+            spec_context = spec.pop("context", None) or context
+            if query is None:
+                if data is None:
+                    raise ValueError(f"Subplot {i} has no query and multi_plot got no data.")
+                _draw_panel(axes[i], data, spec)
+            elif spec_context is None:
+                raise ValueError(f"Subplot {i} has a query but no DatabaseContext to run it on.")
             else:
-                raise ValueError(f"Unsupported plot type in multi_plot: {plot_type}")
-
-            axes[i].set_title(plot_spec.get('subtitle', ''))
-            if x:
-                axes[i].set_xlabel(x)
-            if y:
-                axes[i].set_ylabel(y)
+                queried.append((i, query, spec_context))
+
+        if queried:
+            with ThreadPoolExecutor(max_workers=max_workers or len(queried)) as executor:
+                futures = {
+                    executor.submit(_fetch_panel, query, spec_context, _panel_columns(specs[i])): i
+                    for i, query, spec_context in queried
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    _draw_panel(axes[i], future.result(), specs[i])
+                    if plt.isinteractive():
+                        fig.canvas.draw_idle()
 
         # Remove any unused subplots
         for i in range(n_plots, len(axes)):
             fig.delaxes(axes[i])
 
         if yticks:
-            axes.set_yticks(yticks)
+            for ax in axes[:n_plots]:
+                ax.set_yticks(yticks)
 
         plt.suptitle(title, fontsize=16)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
+        return fig
 
     @staticmethod
     def plot_melted_comparison(
@@ -189,8 +369,9 @@ class DataVisualizer:
             theme: Optional[str] = None,
             palette: Optional[str] = None,
             yticks: Optional[list] = None,
+            show: bool = True,
             **kwargs: Any
-    ) -> None:
+    ) -> Figure:
         """
         Plot a comparison of multiple y-variables on the same plot by melting the data.
 
@@ -205,10 +386,11 @@ class DataVisualizer:
             theme (str, optional): The seaborn theme to use.
             palette (str, optional): The color palette to use.
             yticks (list, optional): adjust the scale of y-axis.
+            show (bool): Call plt.show().
             **kwargs: Additional keyword arguments for the line plot.
 
         Returns:
-            None
+            Figure: The matplotlib figure.
         """
         if theme:
             sns.set_theme(theme)
@@ -233,14 +415,101 @@ class DataVisualizer:
         plt.ylabel(value_name)
 
         # Rotate x-axis labels if they're too long
-        if len(data[x].unique()) > 10:
+        if _many_labels(data[x]):
             plt.xticks(rotation=45, ha='right')
 
         if yticks:
             ax.set_yticks(yticks)
 
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
+        return fig
+
+    @staticmethod
+    def render_batch(
+            jobs: list,
+            max_workers: Optional[int] = None,
+            context=None,
+            dpi: int = 100,
+            cache: Optional[FigureCache] = None
+    ) -> list:
+        """
+        Render many charts to files without a display, in parallel.
+
+        Every job is rendered in a worker process using the Agg backend, saved and closed, so
+        memory doesn't grow with the number of charts.
+
+        Args:
+            jobs (list): (data, spec, output_path) tuples. data is a DataFrame or a SQL query;
+                queries run on `context` before rendering. spec holds the keyword arguments of
+                DataVisualizer.plot (plot_type, x, y, ...) and may name another method with
+                "method" (e.g. "plot_melted_comparison"). The output format comes from the file
+                extension (.png, .svg, .pdf).
+            max_workers (int, optional): Worker processes. Defaults to the number of CPUs.
+            context (DatabaseContext, optional): Runs the queries of query jobs.
+            dpi (int): Resolution of raster outputs.
+            cache (FigureCache, optional): Charts whose data and spec are already cached are
+                copied from the cache instead of being drawn again.
+
+        Returns:
+            list: {"path", "seconds", "error", "cached"} per job, in the same order as `jobs`.
+        """
+        results = [None] * len(jobs)
+        prepared = []
+        for i, (data, spec, path) in enumerate(jobs):
+            start = time.perf_counter()
+            if isinstance(data, str):
+                if context is None:
+                    raise ValueError("A DatabaseContext is required to render query jobs.")
+                data = context.run_query(data)
+            path = str(path)
+            key = None
+            if cache is not None and data is not None:
+                fmt = Path(path).suffix.lstrip(".") or "png"
+                key = cache.key(data, _cache_spec(spec, fmt, dpi))
+                hit = cache.get(key, fmt)
+                if hit is not None:
+                    Path(path).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(hit, path)
+                    results[i] = {"path": path, "seconds": time.perf_counter() - start, "error": None,
+                                  "cached": True}
+                    continue
+            prepared.append((i, (data, spec, path, dpi, cache, key)))
+
+        if prepared:
+            with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                     initializer=_init_headless_worker) as executor:
+                rendered = executor.map(_render_job, *zip(*(job for _, job in prepared)))
+                for (i, _), result in zip(prepared, rendered):
+                    results[i] = result
+        return results
+
+    @staticmethod
+    def plot_cached(data: pd.DataFrame, cache: FigureCache, fmt: str = "png", dpi: int = 100, **spec: Any) -> Path:
+        """
+        Like `plot`, but returns the path of a rendered image and reuses it while the data and spec
+        stay the same.
+
+        Args:
+            data (pd.DataFrame): The data to plot.
+            cache (FigureCache): Where rendered images are kept.
+            fmt (str): Image format (png, svg, pdf).
+            dpi (int): Resolution of raster images.
+            **spec: Keyword arguments of DataVisualizer.plot (plot_type, x, y, theme, ...).
+
+        Returns:
+            Path: The cached image.
+        """
+        key = cache.key(data, _cache_spec(spec, fmt, dpi))
+        path = cache.get(key, fmt)
+        if path is not None:
+            return path
+        fig = DataVisualizer.plot(data, show=False, **spec)
+        try:
+            return cache.put(key, fig, fmt=fmt, dpi=dpi)
+        finally:
+            plt.close(fig)
 
     def save_fig(self,
                  fig_id: int,
@@ -250,8 +519,102 @@ class DataVisualizer:
                  resolution: int = 300):
         """Saves the image in a location."""
         path = Path() / location / f"{fig_id}.{fig_extension}"
-        path.mkdir(parents=True, exist_ok=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
         if tight_layout:
             plt.tight_layout()
         plt.savefig(path, format=fig_extension, dpi=resolution)
 
+
+def _init_headless_worker():
+    plt.switch_backend("Agg")
+
+
+# Keyword arguments of the seaborn plots that name a column.
+_COLUMN_KWARGS = ("hue", "style", "size", "units", "weights")
+
+
+def _panel_columns(spec: dict) -> list:
+    """Columns a multi_plot subplot reads."""
+    columns = []
+    for key in ("x", "y") + _COLUMN_KWARGS:
+        value = spec.get(key)
+        if isinstance(value, str) and value not in columns:
+            columns.append(value)
+    return columns
+
+
+def _fetch_panel(query: str, context, columns: list) -> pd.DataFrame:
+    """Runs a subplot's query on its own pooled connection, selecting only `columns`."""
+    engine = context.connection.engine
+    if columns:
+        quote = engine.dialect.identifier_preparer.quote
+        query = f"SELECT {', '.join(quote(column) for column in columns)} FROM {derived_table(query)}"
+    with engine.connect() as connection:
+        return pd.read_sql_query(text(query), connection)
+
+
+def _draw_panel(ax, data: pd.DataFrame, spec: dict):
+    """Draws one multi_plot subplot."""
+    spec = dict(spec)
+    plot_type = spec.pop('type')
+    x = spec.pop('x', None)
+    y = spec.pop('y', None)
+    subtitle = spec.pop('subtitle', '')
+
+    if plot_type == "scatter":
+        sns.scatterplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "line":
+        sns.lineplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "bar":
+        sns.barplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "hist":
+        sns.histplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "box":
+        sns.boxplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "violin":
+        sns.violinplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "kde":
+        sns.kdeplot(data=data, x=x, y=y, ax=ax, **spec)
+    elif plot_type == "swarm":
+        sns.swarmplot(data=data, x=x, y=y, ax=ax, **spec)
+    else:
+        raise ValueError(f"Unsupported plot type in multi_plot: {plot_type}")
+
+    ax.set_title(subtitle)
+    if x:
+        ax.set_xlabel(x)
+    if y:
+        ax.set_ylabel(y)
+
+
+def _cache_spec(spec: dict, fmt: str, dpi: int) -> dict:
+    """The plot spec as it's hashed for FigureCache, with the defaults that change the output."""
+    spec = dict(spec, fmt=fmt, dpi=dpi)
+    spec.setdefault("method", "plot")
+    spec.setdefault("max_points", DataVisualizer.max_points)
+    return spec
+
+
+def _render_job(data: Optional[pd.DataFrame], spec: dict, path: str, dpi: int,
+                cache: Optional[FigureCache] = None, key: Optional[str] = None) -> dict:
+    """Renders one render_batch job and saves it. Runs inside a worker process."""
+    start = time.perf_counter()
+    fig = None
+    try:
+        if data is None:
+            raise ValueError("The query of this job returned no data.")
+        spec = dict(spec)
+        method = getattr(DataVisualizer, spec.pop("method", "plot"))
+        fig = method(data, show=False, **spec)
+        fmt = Path(path).suffix.lstrip(".") or "png"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if cache is not None and key is not None:
+            shutil.copyfile(cache.put(key, fig, fmt=fmt, dpi=dpi), path)
+        else:
+            fig.savefig(path, dpi=dpi, format=fmt, bbox_inches="tight")
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        plt.close(fig if fig is not None else "all")
+    return {"path": path, "seconds": time.perf_counter() - start, "error": error, "cached": False}
@@ -6,7 +6,7 @@ from sqlalchemy.exc import (
     IntegrityError,
     ResourceClosedError,
 )
-from typing import Literal, Callable, final
+from typing import Iterator, Literal, Callable, final
 from sqthon.util import create_table
 from sqthon.util import (
     get_table_schema,
@@ -14,12 +14,39 @@ from sqthon.util import (
     date_dimension,
     indexes,
     database_schema,
+    derived_table,
 )
 import os
+import time
+import itertools
+import numpy as np
 import pandas as pd
-from sqthon.llm import LLM
-from sqthon.data_visualizer import DataVisualizer
-from rich import print as rprint
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from sqthon.rate_limit import RateLimiter
+from sqthon.query_plan import explain
+from sqthon import index_advisor
+from sqthon.partition import partition_bounds, partition_predicates
+from sqthon.pool import pool_status
+from sqthon.sampling import describe, sample_query, sample_tables
+from sqthon.pushdown import aggregate_for_plot
+from sqthon.tracing import span
+from sqthon.memory import MemoryTracker, frame_bytes, log_record
+from sqthon.materialize import MaterializedStore, watermark_of, bind_watermark
+
+
+def _counted(frames: list, chunks: Iterator[pd.DataFrame], record: dict) -> Iterator[pd.DataFrame]:
+    """Yields the fetched frames, then the rest of the chunks; sets the record's rows once done."""
+    rows = 0
+    try:
+        for frame in itertools.chain(frames, chunks):
+            rows += len(frame)
+            yield frame
+        record["rows"] = rows
+    finally:
+        # Closing the generator early releases the cursor.
+        chunks.close()
 
 
 @final
@@ -31,21 +58,293 @@ class DatabaseContext:
                  connection: Engine,
                  llm: bool = False,
                  model_name: str = None,
+                 provider: str = "openai",
                  ):
         self.database = database
         self.connection = connection
-        self.visualizer = DataVisualizer()
+        self._visualizer = None
+        # One record per run_query, import, date series and LLM tool call (see query_history).
+        self.query_log = deque(maxlen=10_000)
+        self.memory_tracker = None
+        self.store = MaterializedStore()
         if llm:
-            self.llm = LLM(model=model_name, connection=self.connection)
+            from sqthon.llm import LLM
+
+            self.llm = LLM(model=model_name, connection=self.connection, provider=provider)
+            self.llm.query_log = self.query_log
+
+    @property
+    def visualizer(self):
+        """The DataVisualizer. seaborn and matplotlib are imported on first use."""
+        if self._visualizer is None:
+            from sqthon.data_visualizer import DataVisualizer
+
+            self._visualizer = DataVisualizer()
+        return self._visualizer
+
+    def track_memory(self, threshold: int = None, action: Literal["warn", "chunk"] = "warn",
+                     chunksize: int = 100_000) -> MemoryTracker:
+        """
+        Starts recording peak and retained memory of every run_query, import, date series and
+        LLM tool-result serialization in the query log.
+
+        Parameters:
+            - threshold (int, optional): Bytes above which an operation triggers the action.
+            - action (str): "warn" emits a MemoryThresholdWarning. "chunk" also makes run_query
+              fetch in chunks of `chunksize` rows and return an iterator of DataFrames once the
+              result grows past the threshold. The iterator keeps its cursor open on the shared
+              connection until it's exhausted or closed, so consume it before the next query.
+            - chunksize (int): Rows per chunk.
+
+        Returns:
+            - MemoryTracker: The active tracker. Call `untrack_memory()` to stop.
+        """
+        self.memory_tracker = MemoryTracker(threshold=threshold, action=action, chunksize=chunksize)
+        if hasattr(self, "llm"):
+            self.llm.memory_tracker = self.memory_tracker
+        return self.memory_tracker
+
+    def untrack_memory(self):
+        """Stops memory tracking."""
+        if self.memory_tracker is not None:
+            self.memory_tracker.stop()
+        self.memory_tracker = None
+        if hasattr(self, "llm"):
+            self.llm.memory_tracker = None
+
+    def query_history(self) -> pd.DataFrame:
+        """
+        Returns the query log as a DataFrame: operation, query (or table), seconds, rows,
+        frame_bytes, peak_bytes, retained_bytes, chunked and error. Memory columns are filled
+        while track_memory is on.
+        """
+        return pd.DataFrame(list(self.query_log))
+
+    @contextmanager
+    def _logged(self, operation: str, **fields):
+        """Times an operation, tracks its memory if enabled and appends it to the query log."""
+        record = log_record(operation, database=self.database, **fields)
+        tracker = self.memory_tracker
+        start = time.perf_counter()
+        try:
+            with tracker.track(record) if tracker else nullcontext(record):
+                yield record
+        except Exception as e:
+            record["error"] = str(e)
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.query_log.append(record)
+
+    def _read_query(self, query: str, record: dict) -> pd.DataFrame | Iterator[pd.DataFrame]:
+        """
+        Runs a query into a DataFrame. In chunked memory mode, returns an iterator of DataFrames
+        instead once the fetched rows pass the tracker's threshold. The iterator holds a cursor on
+        the shared connection until it's exhausted or closed; the record's rows are filled then.
+        """
+        tracker = self.memory_tracker
+        if not (tracker and tracker.chunked):
+            result = pd.read_sql_query(text(query), self.connection)
+            record["rows"] = len(result)
+            if tracker:
+                record["frame_bytes"] = frame_bytes(result)
+            return result
+
+        chunks = pd.read_sql_query(text(query), self.connection, chunksize=tracker.chunksize)
+        frames, total = [], 0
+        for chunk in chunks:
+            frames.append(chunk)
+            total += frame_bytes(chunk)
+            if tracker.over(total):
+                record["chunked"] = True
+                tracker.warn(record, total)
+                return _counted(frames, chunks, record)
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        record["rows"] = len(result)
+        record["frame_bytes"] = total
+        return result
+
+    def _fetch(self, query: str, as_: Literal["rows", "scalar", "columns"]):
+        """Runs a query without building a DataFrame."""
+        with self._logged("run_query", query=query, result_type=as_) as record, \
+                span("sqthon.run_query", database=self.database,
+                     dialect=self.connection.engine.dialect.name, result_type=as_) as s:
+            result = self.connection.execute(text(query))
+            if as_ == "scalar":
+                value = result.scalar()
+                record["rows"] = 0 if value is None else 1
+                return value
+            rows = result.fetchall()
+            record["rows"] = len(rows)
+            s.set(rows=len(rows))
+            if as_ == "rows":
+                return rows
+            keys = list(result.keys())
+            if not rows:
+                return {key: np.empty(0) for key in keys}
+            return {key: np.asarray(values) for key, values in zip(keys, zip(*rows))}
+
+    def materialize(self, name: str, query: str, refresh_by: str = None, max_staleness: float | None = 300,
+                    refresh: bool = False) -> pd.DataFrame:
+        """
+        Keeps the result of an expensive query in the local store (`self.store`) and reads it
+        from there while it's fresh.
+
+        Parameters:
+            - name (str): Name of the stored result.
+            - query (str): The query. Changing it, or materializing the same name from another
+              database, rebuilds the stored result.
+            - refresh_by (str, optional): An ever-increasing column (id, created_at). Refreshes
+              then only fetch rows with refresh_by greater than the stored maximum and append them.
+              Without it every refresh reruns the whole query.
+            - max_staleness (float, optional): Seconds a stored result is served without asking the
+              server. 0 refreshes on every call, None never refreshes once stored.
+            - refresh (bool): Refresh now regardless of max_staleness.
+
+        Returns:
+            - pd.DataFrame: The stored result, read from the local store.
+
+        Notes:
+            Incremental refreshes assume rows are only appended: updated rows and late rows with a
+            refresh_by value at or below the watermark are not picked up. Use refresh on a full
+            rebuild (or drop the result with `self.store.drop(name)`) when that happens.
+        """
+        source = self._store_source()
+        meta = self.store.meta(name)
+        if meta is not None and (meta.get("source") != source or meta["query"] != query
+                                 or meta["refresh_by"] != refresh_by):
+            meta = None
+
+        if meta is not None and not refresh:
+            age = time.time() - meta["refreshed_at"]
+            if max_staleness is None or age <= max_staleness:
+                return self.store.read(name)
+
+        with self._logged("materialize", query=query, table=name) as record:
+            if meta is not None and refresh_by and meta["watermark"] is not None:
+                quote = self.connection.engine.dialect.identifier_preparer.quote
+                incremental = (f"SELECT * FROM ({query.strip().rstrip(';')}) AS sqthon_src "
+                               f"WHERE {quote(refresh_by)} > :watermark")
+                new_rows = pd.read_sql_query(text(incremental), self.connection,
+                                             params={"watermark": bind_watermark(meta["watermark"])})
+                record["rows"] = len(new_rows)
+                watermark = watermark_of(new_rows, refresh_by) if len(new_rows) else meta["watermark"]
+                self.store.append(name, new_rows, dict(meta, watermark=watermark))
+            else:
+                result = pd.read_sql_query(text(query), self.connection)
+                record["rows"] = len(result)
+                self.store.write(name, result, {
+                    "source": source,
+                    "query": query,
+                    "refresh_by": refresh_by,
+                    "watermark": watermark_of(result, refresh_by) if refresh_by else None,
+                })
+        return self.store.read(name)
+
+    def _store_source(self) -> str:
+        """Identifies this database in the materialized store: its URL without password, SQLite paths made absolute."""
+        url = self.connection.engine.url
+        database = url.database
+        if url.get_backend_name() == "sqlite" and database and database != ":memory:" and not database.startswith("file:"):
+            url = url.set(database=os.path.abspath(database))
+        return url.render_as_string(hide_password=True)
 
     def get_tables(self) -> list:
         """Returns the names of available tables"""
         return tables(self.connection)
 
+    def pool_stats(self) -> dict:
+        """
+        Gauges of the connection pool for sizing it: size, checked_out, overflow, and how many
+        checkouts waited for a free connection (waits, wait_s, max_wait_s, timeouts).
+        See `sqthon.pool.pool_status`.
+        """
+        return pool_status(self.connection.engine)
+
     def check_indexes(self, table: str) -> list:
         """Check indexes for the table."""
         return indexes(table=table, connection=self.connection)
 
+    def advise_indexes(self, queries: list = None, min_rows: int = 1000, apply: bool = False,
+                       repeat: int = 3) -> list:
+        """
+        Proposes indexes for queries that do full table scans.
+
+        The filter (WHERE), join (ON) and ORDER BY columns of each scanned table are compared with
+        its existing indexes, and a CREATE INDEX is proposed when none of them starts with those
+        columns.
+
+        Parameters:
+            - queries (list, optional): Queries to analyze. Defaults to the successful SELECTs of
+              `run_query` and LLM tool calls in the query log, weighted by how often they ran.
+              Only plain reads are analyzed, since apply runs them repeatedly: statements that
+              write, including data-modifying CTEs, are skipped.
+            - min_rows (int): Full scans estimated to read fewer rows are ignored.
+            - apply (bool): Create the proposed indexes and benchmark their queries before and after.
+            - repeat (int): Runs per query when benchmarking (the median is kept).
+
+        Returns:
+            - list: Proposals, highest estimated benefit first. See `index_advisor.advise` and
+              `index_advisor.apply` for the fields.
+        """
+        if queries is None:
+            records = [
+                record for record in self.query_log
+                if record["operation"] in ("run_query", "llm_tool_call") and record.get("query")
+                and record["error"] is None
+            ]
+        else:
+            records = [{"query": query, "seconds": None} for query in queries]
+
+        stats = {}
+        for record in records:
+            if not index_advisor.is_plain_read(record["query"]):
+                continue
+            entry = stats.setdefault(record["query"], {"executions": 0, "seconds": 0.0})
+            entry["executions"] += 1
+            entry["seconds"] += record["seconds"] or 0.0
+
+        proposals = index_advisor.advise(stats, self.connection, min_rows=min_rows)
+        if apply:
+            proposals = [index_advisor.apply(p, self.connection, repeat=repeat) for p in proposals]
+        return proposals
+
+    def describe_table(self, table: str, sample_rows: int = 10_000, seed: int = 0) -> dict:
+        """
+        Profiles a table without scanning it: row count and size from the catalog statistics,
+        and per column the null fraction, approximate distinct count and min/max of a sample.
+
+        Parameters:
+            - table (str): Table name.
+            - sample_rows (int): Approximate sample size.
+            - seed (int): Seed of the sample.
+
+        Returns:
+            - dict: {"table", "rows", "bytes", "rows_source", "sample_rows", "columns": pd.DataFrame}
+        """
+        with span("sqthon.describe_table", database=self.database, table=table) as s:
+            result = describe(table, self.connection, sample_rows=sample_rows, seed=seed)
+            s.set(rows=result["rows"], sample_rows=result["sample_rows"])
+        return result
+
+    def sample(self, table: str, fraction: float = None, rows: int = None, seed: int = 0,
+               method: Literal["system", "bernoulli"] = "system") -> pd.DataFrame | None:
+        """
+        Reads a sample of a table without scanning all of it.
+
+        Parameters:
+            - table (str): Table name.
+            - fraction (float, optional): Share of rows, e.g. 0.01.
+            - rows (int, optional): Approximate number of rows instead of a fraction.
+            - seed (int): The same seed returns the same rows while the table doesn't change.
+            - method (str): PostgreSQL only. "system" samples pages, "bernoulli" single rows.
+
+        Returns:
+            - pd.DataFrame: The sampled rows.
+        """
+        return self.run_query(sample_query(table, self.connection, fraction=fraction, rows=rows,
+                                           seed=seed, method=method))
+
     def table_schema(self, table: str) -> list:
         return get_table_schema(table=table, connection=self.connection)
 
@@ -53,6 +352,10 @@ class DatabaseContext:
         """Returns the schema of the database."""
         return database_schema(self.connection)
 
+    def explain(self, query: str) -> dict:
+        """Returns the estimated rows, cost and scanned tables of a query without running it."""
+        return explain(query, self.connection)
+
     def drop_table(self, table: str) -> None:
         """Drops a table from the database."""
         self.connection.execute(text(f"DROP TABLE {table}"))
@@ -82,12 +385,144 @@ class DatabaseContext:
             if as_df and self.llm.last_query_result is not None:
                 return self.llm.last_query_result
             else:
+                from rich import print as rprint
+
                 rprint(result)
                 # return result
 
         except Exception as e:
             raise Exception(f"Error in ask method: {str(e)}")
 
+    def ask_many(
+            self,
+            prompts: list[str],
+            concurrency: int = 4,
+            as_df: bool = False,
+            rpm: int = None,
+            tpm: int = None,
+            return_exceptions: bool = False,
+    ) -> list:
+        """
+        Ask several questions concurrently.
+
+        Every prompt runs in its own conversation, so the answers don't leak into each other
+        or into the chat history used by `ask`. Generated SQL runs on connections checked out
+        from this context's pool.
+
+        Args:
+            prompts (list[str]): The questions to ask.
+            concurrency (int): Number of prompts in flight at the same time.
+            as_df (bool): If True, returns the DataFrames instead of the model's answers.
+            rpm (int, optional): Requests per minute allowed by your OpenAI tier.
+            tpm (int, optional): Tokens per minute allowed by your OpenAI tier. The rpm/tpm limiter
+                only applies to this batch; `llm.rate_limiter` is restored afterwards.
+            return_exceptions (bool): If True, a failed prompt puts its exception in the results
+                instead of aborting the whole batch.
+
+        Returns:
+            list: One answer (or DataFrame) per prompt, in the same order as `prompts`.
+        """
+        previous_limiter = self.llm.rate_limiter
+        if rpm or tpm:
+            self.llm.rate_limiter = RateLimiter(rpm=rpm, tpm=tpm)
+
+        def answer(prompt: str):
+            try:
+                with self.connection.engine.connect() as connection:
+                    content, result = self.llm.answer(prompt, connection=connection)
+                return result if as_df else content
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                return list(executor.map(answer, prompts))
+        finally:
+            self.llm.rate_limiter = previous_limiter
+
+    def parallel_read(
+            self,
+            source: str,
+            partition_column: str,
+            num_partitions: int = 8,
+            max_workers: int = None,
+            stream: bool = False,
+            ordered: bool = False,
+    ):
+        """
+        Reads a big table or query in range partitions fetched concurrently over pooled connections.
+
+        MIN and MAX of the partition column split it into `num_partitions` ranges, each read with
+        its own query on its own connection, so the server can work on several at once.
+
+        Args:
+            source (str): A table name, optionally schema-qualified (sales.orders), or a SELECT query.
+            partition_column (str): A numeric or date/time column, ideally indexed (e.g. the primary key).
+            num_partitions (int): Number of ranges.
+            max_workers (int, optional): Concurrent queries. Defaults to num_partitions; keep it
+                within the pool size (see `pool_stats`).
+            stream (bool): If True, returns an iterator of DataFrames, one per partition in range
+                order, instead of one concatenated DataFrame. At most `max_workers` partitions are
+                fetched ahead while earlier ones are consumed, which bounds memory.
+            ordered (bool): Sort each partition by the partition column, which orders the whole result.
+
+        Returns:
+            pd.DataFrame | Iterator[pd.DataFrame]
+
+        Notes:
+            Rows with a NULL partition column come in the first partition. Partitions are separate
+            queries, so rows written while they run may be missed or seen by only some of them.
+        """
+        quote = self.connection.engine.dialect.identifier_preparer.quote
+        query = source.strip()
+        if query.split(None, 1)[0].lower() in ("select", "with"):
+            source_sql = derived_table(query)
+        else:
+            # Quote each part of a schema-qualified name, e.g. sales.orders.
+            source_sql = ".".join(quote(part) for part in query.split("."))
+        column = quote(partition_column)
+
+        with self.connection.engine.connect() as connection:
+            low, high = connection.execute(text(f"SELECT MIN({column}), MAX({column}) FROM {source_sql}")).one()
+        bounds = partition_bounds(low, high, num_partitions) if low is not None else []
+        order = f" ORDER BY {column}" if ordered else ""
+        queries = [(f"SELECT * FROM {source_sql} WHERE {where}{order}", params)
+                   for where, params in partition_predicates(column, bounds)]
+
+        def fetch(partition):
+            sql, params = partition
+            with self.connection.engine.connect() as connection:
+                return pd.read_sql_query(text(sql), connection, params=params)
+
+        def partitions():
+            with self._logged("parallel_read", query=source, partitions=len(queries)) as record, \
+                    span("sqthon.parallel_read", database=self.database, partitions=len(queries)) as s:
+                workers = max_workers or len(queries)
+                executor = ThreadPoolExecutor(max_workers=workers)
+                try:
+                    # Only `workers` partitions in flight; the next is submitted as each one is taken.
+                    remaining = iter(queries)
+                    pending = deque(executor.submit(fetch, partition)
+                                    for partition in itertools.islice(remaining, workers))
+                    rows = 0
+                    while pending:
+                        frame = pending.popleft().result()
+                        following = next(remaining, None)
+                        if following is not None:
+                            pending.append(executor.submit(fetch, following))
+                        rows += len(frame)
+                        yield frame
+                    record["rows"] = rows
+                    s.set(rows=rows)
+                finally:
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+        if stream:
+            return partitions()
+        return pd.concat(list(partitions()), ignore_index=True)
+
     def generate_date_series(
             self,
             table: str,
@@ -129,20 +564,30 @@ class DatabaseContext:
 
         """
 
-        df = date_dimension(
-            connection=self.connection,
-            year_start=start_year,
-            year_end=end_year,
-            freq=frequency,
-        )
-
-        df.to_sql(
-            name=table,
-            con=self.connection,
-            if_exists=if_exists,
-            method=insert_method,
-            index=index,
-        )
+        with self._logged("generate_date_series", table=table) as record:
+            df = date_dimension(
+                connection=self.connection,
+                year_start=start_year,
+                year_end=end_year,
+                freq=frequency,
+            )
+            record["rows"] = len(df)
+            chunksize = None
+            tracker = self.memory_tracker
+            if tracker:
+                record["frame_bytes"] = frame_bytes(df)
+                if tracker.chunked and tracker.over(record["frame_bytes"]):
+                    record["chunked"] = True
+                    chunksize = tracker.chunksize
+
+            df.to_sql(
+                name=table,
+                con=self.connection,
+                if_exists=if_exists,
+                method=insert_method,
+                index=index,
+                chunksize=chunksize,
+            )
 
     def import_csv_to_mysqldb(
             self, csv_path: str, table: str, terminated_by: str = "\n"
@@ -183,24 +628,25 @@ class DatabaseContext:
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
         try:
-            table = create_table(
-                engine=self.connection, table_name=table, path=csv_path
-            )
-            columns = [col.name for col in table.columns]
-            col_name_clause = ", ".join([f"`{name.strip()}`" for name in columns])
-            query = text(
-                f"""
-            LOAD DATA LOCAL INFILE '{csv_path}'
-            INTO TABLE {table}
-            FIELDS TERMINATED BY ','
-            LINES TERMINATED BY '{terminated_by}'
-            IGNORE 1 ROWS
-            ({col_name_clause})
-            """
-            )
-
-            self.connection.execute(query)
-            self.connection.commit()
+            with self._logged("import_csv_to_mysqldb", table=table, path=csv_path):
+                table = create_table(
+                    engine=self.connection, table_name=table, path=csv_path
+                )
+                columns = [col.name for col in table.columns]
+                col_name_clause = ", ".join([f"`{name.strip()}`" for name in columns])
+                query = text(
+                    f"""
+                LOAD DATA LOCAL INFILE '{csv_path}'
+                INTO TABLE {table}
+                FIELDS TERMINATED BY ','
+                LINES TERMINATED BY '{terminated_by}'
+                IGNORE 1 ROWS
+                ({col_name_clause})
+                """
+                )
+
+                self.connection.execute(query)
+                self.connection.commit()
 
         except (
                 OperationalError,
@@ -236,8 +682,12 @@ class DatabaseContext:
             x=None,
             y=None,
             title=None,
+            aggregate: bool = False,
+            sample: float = None,
+            seed: int = 0,
+            as_: Literal["frame", "rows", "scalar", "columns"] = "frame",
             **kwargs,
-    ) -> pd.DataFrame | None:
+    ) -> pd.DataFrame | Iterator[pd.DataFrame] | None:
         """
         Executes a SQL query and optionally visualizes the result.
 
@@ -249,21 +699,72 @@ class DatabaseContext:
             - x (str, optional): The column name to be used for the x-axis in the plot. Required if visualize is True.
             - y (str, optional): The column name to be used for the y-axis in the plot. Required if visualize is True.
             - title (str, optional): The title for the plot. Required if visualize is True.
+            - aggregate (bool, optional): For bar, hist and box plots, run the aggregation the plot
+                needs inside the database and fetch only the aggregated rows. Bar plots use the
+                `estimator` kwarg (mean, sum, count, min, max), hist plots `bins` (default 50).
+                Box plots are aggregated on PostgreSQL only; other dialects fetch the raw rows.
+            - sample (float, optional): Read only this fraction of every table in FROM and JOIN
+                (e.g. 0.01), with TABLESAMPLE on PostgreSQL and rowid/primary key ranges elsewhere.
+                Results are approximate: counts and sums shrink by the fraction.
+            - seed (int, optional): Seed of the sample. The same seed reads the same rows.
+            - as_ (str, optional): Result type. "frame" (default) is a DataFrame. For small results
+                where building a DataFrame is most of the cost: "rows" is a list of Row tuples,
+                "scalar" the first column of the first row (None without rows) and "columns" a dict of
+                column name -> numpy array. These can't be visualized.
             - **kwargs: Additional keyword arguments passed to the plotting function.
 
         Returns:
-            - result (Object): The result of the SQL query execution.
+            - result (Object): The result of the SQL query execution (the aggregated rows if aggregate is True).
+              With track_memory(action="chunk"), a result bigger than the threshold comes back as an
+              iterator of DataFrames that keeps a cursor open on the shared connection until it's
+              consumed or closed. Its rows are logged once it's exhausted.
 
         Raises:
             - ValueError: If visualize is True but plot_type, x, y, or title are not provided.
         """
 
+        if as_ not in ("frame", "rows", "scalar", "columns"):
+            raise ValueError(f"Invalid as_: {as_}. Expected 'frame', 'rows', 'scalar' or 'columns'.")
+        if as_ != "frame" and visualize:
+            raise ValueError("visualize needs as_='frame'.")
+
         try:
-            result = pd.read_sql_query(text(query), self.connection)
+            if sample is not None:
+                query = sample_tables(query, self.connection, fraction=sample, seed=seed)
+            if as_ != "frame":
+                return self._fetch(query, as_)
+            if visualize and aggregate and plot_type in ("bar", "hist", "box"):
+                if not (x or y):
+                    raise ValueError("For aggregated visualization, please provide x or y.")
+                estimator = kwargs.pop("estimator", "mean")
+                with self._logged("run_query", query=query, aggregate=plot_type) as record:
+                    result = aggregate_for_plot(query, self.connection, plot_type, x, y, hue=kwargs.get("hue"),
+                                                bins=kwargs.get("bins", 50), estimator=estimator)
+                    if result is not None:
+                        record["rows"] = len(result)
+                if result is not None:
+                    kwargs.pop("bins", None)
+                    self.visualizer.plot_aggregate(result, plot_type, x, y, title or "", **kwargs)
+                    return result
+
+            with self._logged("run_query", query=query) as record, \
+                    span("sqthon.run_query", database=self.database,
+                         dialect=self.connection.engine.dialect.name) as s:
+                result = self._read_query(query, record)
+                if isinstance(result, pd.DataFrame):
+                    s.set(rows=len(result), columns=len(result.columns),
+                          bytes=record["frame_bytes"] or int(result.memory_usage(index=False).sum()))
+                else:
+                    s.set(chunked=True)
+            if not isinstance(result, pd.DataFrame):
+                if visualize:
+                    print("The result was too big and is returned in chunks; skipping the visualization.")
+                return result
             if visualize:
-                if not all([plot_type, x, y]):
+                # Histograms and kde plots take a single column.
+                if not (plot_type and x and (y or plot_type in ("hist", "kde"))):
                     raise ValueError(
-                        "For visualization, please provide plot_type, x, y."
+                        "For visualization, please provide plot_type, x, y (y is optional for hist and kde)."
                     )
                 self.visualizer.plot(result, plot_type, x, y, title, **kwargs)
 
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+def as_numeric(values: pd.Series) -> Optional[pd.Series]:
+    """
+    The column as numbers or datetime64, or None if it's categorical. Object columns are
+    converted when they hold numbers (e.g. Decimal) or dates: ISO-8601 text as SQLite stores
+    them, or datetime.date objects as MySQL and PostgreSQL DATE columns arrive.
+    """
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if values.dropna().empty:
+        return None
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        pass
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    """Float view of a numeric or datetime64 column. Datetimes become nanoseconds since the epoch."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    return values.to_numpy(dtype=np.float64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Splits the points into `n_out - 2` buckets and keeps, from each bucket, the point forming the
+    largest triangle with the previously kept point and the average of the next bucket. Peaks and
+    troughs survive, so the line keeps its visual shape. `x` must be sorted.
+
+    Parameters:
+        - x (np.ndarray): Sorted x values.
+        - y (np.ndarray): y values.
+        - n_out (int): Number of points to keep.
+
+    Returns:
+        - np.ndarray: Indices of the kept points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:edges[-1]], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:edges[-1]], edges[:-1]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    next_x = np.append(avg_x[1:], x[-1]).tolist()
+    next_y = np.append(avg_y[1:], y[-1]).tolist()
+    edges = edges.tolist()
+    a_x, a_y = float(x[0]), float(y[0])
+    for k in range(n_out - 2):
+        start, end = edges[k], edges[k + 1]
+        # Twice the triangle area, expanded so each bucket costs a couple of vector operations.
+        dx, dy = a_x - next_x[k], next_y[k] - a_y
+        area = np.abs(dx * y[start:end] + dy * x[start:end] - (dx * a_y + dy * a_x))
+        a = start + int(area.argmax())
+        a_x, a_y = float(x[a]), float(y[a])
+        selected[k + 1] = a
+    return selected
+
+
+def downsample_line(data: pd.DataFrame, x: str, y: str, max_points: int, hue: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reduces a line plot's data to about `max_points` rows with LTTB, per hue group, sorted by x.
+    The kept rows are returned with their original values. Data is returned unchanged if x or y
+    is categorical (see `as_numeric`).
+    """
+    xs, ys = as_numeric(data[x]), as_numeric(data[y])
+    if xs is None or ys is None:
+        return data
+    present = (xs.notna() & ys.notna()).to_numpy()
+    data, xs, ys = data[present], _as_float(xs[present]), _as_float(ys[present])
+    if hue is None:
+        groups = [np.arange(len(data))]
+    else:
+        groups = list(data.groupby(hue, sort=False, observed=True).indices.values())
+    per_group = max(max_points // len(groups), 3)
+
+    kept = []
+    for positions in groups:
+        positions = positions[np.argsort(xs[positions], kind="stable")]
+        kept.append(positions[lttb(xs[positions], ys[positions], per_group)])
+    return data.iloc[np.concatenate(kept)]
+
+
+def sample_rows(data: pd.DataFrame, max_points: int, hue: Optional[str] = None, seed: int = 0) -> pd.DataFrame:
+    """Random sample of `max_points` rows, stratified by hue so every group keeps its share."""
+    if hue is None:
+        return data.sample(n=max_points, random_state=seed)
+    fraction = max_points / len(data)
+    return data.groupby(hue, sort=False, observed=True, group_keys=False).sample(frac=fraction, random_state=seed)
+
+
+def histogram_bins(data: pd.DataFrame, x: str, hue: Optional[str] = None, bins: int = 100,
+                   binwidth: float = None, binrange: tuple = None):
+    """
+    Pre-aggregates a numeric or datetime64 column into histogram bins.
+    `binwidth` and `binrange` work as in seaborn.histplot (numeric columns only).
+
+    Returns:
+        - tuple: (DataFrame with x = bin centers, "count" and hue columns, bin edges).
+    """
+    values = data[x]
+    present = _as_float(values.dropna())
+    if binwidth:
+        low, high = binrange or (present.min(), present.max())
+        edges = np.arange(low, high + binwidth, binwidth)
+    else:
+        edges = np.histogram_bin_edges(present, bins=bins, range=binrange)
+    centers = (edges[:-1] + edges[1:]) / 2
+    if pd.api.types.is_datetime64_any_dtype(values):
+        centers = pd.to_datetime(centers.astype(np.int64))
+
+    groups = [(None, data)] if hue is None else data.groupby(hue, sort=False, observed=True)
+    parts = []
+    for key, group in groups:
+        counts, _ = np.histogram(_as_float(group[x].dropna()), bins=edges)
+        part = pd.DataFrame({x: centers, "count": counts})
+        if hue is not None:
+            part[hue] = key
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True), edges
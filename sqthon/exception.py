@@ -10,7 +10,13 @@ class ServiceStartError(ServiceManagementError):
                  service_name: str,
                  msg: str = None,
                  exit_code: int = None):
-        ...
+        self.service_name = service_name
+        self.msg = msg
+        self.exit_code = exit_code
+        message = f"Failed to start {service_name}"
+        if exit_code is not None:
+            message += f" (exit code {exit_code})"
+        super().__init__(f"{message}: {msg}" if msg else f"{message}.")
 
 
 class ServiceStopError(ServiceManagementError):
@@ -30,5 +36,40 @@ class AdminPrivilegeError(ServiceManagementError):
 class ServiceConnectionError(ServiceManagementError):
     """Raised when unable to connect to a service."""
 
-    def __init__(self):
-        ...
+    def __init__(self,
+                 host: str,
+                 port: int = None,
+                 waited: float = None,
+                 msg: str = None):
+        self.host = host
+        self.port = port
+        self.waited = waited
+        self.msg = msg
+        address = f"{host}:{port}" if port else host
+        message = f"Server at {address} is not ready"
+        if waited is not None:
+            message += f" after {waited:g}s"
+        super().__init__(f"{message}: {msg}" if msg else f"{message}.")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when the estimated cost of a query is over the configured budget."""
+
+    def __init__(self, query: str, plan: dict, reasons: list):
+        self.query = query
+        self.plan = plan
+        self.reasons = reasons
+        super().__init__(f"Query rejected: {'; '.join(reasons)}.")
+
+
+class MemoryThresholdWarning(RuntimeWarning):
+    """
+    Emitted when an operation allocates more memory than the MemoryTracker threshold.
+    A RuntimeWarning, so Python's default filters show it (ResourceWarning would be ignored).
+    """
+    pass
+
+
+class ProviderError(Exception):
+    """Raised when an LLM provider request fails."""
+    pass
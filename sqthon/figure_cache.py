@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+
+class FigureCache:
+    """
+    On-disk cache of rendered charts, keyed by the contents of the data and the plot spec.
+
+    The key is a SHA-256 of `pd.util.hash_pandas_object` over the frame (plus its columns and
+    dtypes) and of the spec, so a chart is only drawn again when its data or its options change.
+    Images are evicted least recently used first once the directory grows past `max_bytes`.
+
+    Parameters:
+        directory (str | Path): Where the images are stored.
+        max_bytes (int): Size limit of the cache directory. Defaults to 256 MB.
+    """
+
+    def __init__(self, directory="figure_cache", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to render_batch worker processes; locks can't be pickled.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: pd.DataFrame, spec: dict) -> str:
+        """Content hash of a frame and a plot spec."""
+        digest = hashlib.sha256()
+        try:
+            digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts).
+            digest.update(pickle.dumps(data))
+        digest.update(repr([(str(column), str(dtype)) for column, dtype in data.dtypes.items()]).encode())
+        digest.update(json.dumps(spec, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str, fmt: str = "png") -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    def get(self, key: str, fmt: str = "png") -> Optional[Path]:
+        """Returns the cached image, or None. A hit marks the image as recently used."""
+        path = self.path(key, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, fig, fmt: str = "png", dpi: int = 100) -> Path:
+        """Saves a figure under `key` and evicts old images if the cache is over its limit."""
+        path = self.path(key, fmt)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        fig.savefig(tmp, format=fmt, dpi=dpi, bbox_inches="tight")
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    def size(self) -> int:
+        """Bytes currently used by cached images."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self):
+        """Removes the least recently used images until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self):
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def _entries(self):
+        return [entry for entry in self.directory.iterdir() if entry.is_file() and entry.suffix != ".tmp"]
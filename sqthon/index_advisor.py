@@ -0,0 +1,207 @@
+import re
+import statistics
+import time
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqthon.query_plan import explain, table_references
+
+
+_COLUMN = r"(?:([`\"\w]+)\.)?([`\"\w]+)"
+_OPERATOR = r"(=|<>|!=|<=|>=|<|>|\bin\b|\blike\b|\bbetween\b|\bis\b)"
+_PREDICATE = re.compile(rf"{_COLUMN}\s*{_OPERATOR}\s*(?:{_COLUMN}\b)?", flags=re.IGNORECASE)
+_ORDER_BY = re.compile(r"\border\s+by\s+(.+?)(?=\blimit\b|\boffset\b|\)|;|$)", flags=re.IGNORECASE | re.DOTALL)
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_KEYWORDS = {"and", "or", "not", "null", "true", "false", "select", "case", "when", "then", "else", "end"}
+# Statements (or clauses) that write or lock: data-modifying CTEs, SELECT ... INTO, FOR UPDATE.
+_WRITES = re.compile(r"\b(?:insert|update|delete|merge|into|create|drop|alter|truncate|grant|revoke|call|"
+                     r"exec|execute|copy|lock|vacuum|analyze)\b", flags=re.IGNORECASE)
+
+
+def _name(identifier: str) -> str:
+    return identifier.replace("`", "").replace('"', "") if identifier else identifier
+
+
+def is_plain_read(query: str) -> bool:
+    """
+    True for a single SELECT, or WITH ... SELECT, that writes nothing. advise and apply run
+    queries repeatedly, so a data-modifying CTE (WITH d AS (DELETE ... RETURNING *) SELECT ...)
+    or SELECT ... INTO must never get there. Conservative: a write keyword anywhere outside a
+    string literal rejects the query, even as a column name.
+    """
+    query = _LITERAL.sub("''", query).strip().rstrip(";")
+    if ";" in query or not re.match(r"(?:select|with)\b", query, flags=re.IGNORECASE):
+        return False
+    return not _WRITES.search(query)
+
+
+def query_columns(query: str, columns: dict) -> dict:
+    """
+    Finds the columns a query filters, joins and orders on.
+
+    Parameters:
+        - query (str): The SQL query.
+        - columns (dict): table -> set of its column names, used to resolve unqualified columns
+          and to drop anything that isn't a column.
+
+    Returns:
+        - dict: table -> {"equality": [...], "range": [...], "join": [...], "order": [...]}
+    """
+    query = _LITERAL.sub("''", query)
+    aliases = table_references(query)
+    referenced = {table for table in aliases.values() if table in columns}
+    found = {}
+
+    def resolve(qualifier, column):
+        qualifier, column = _name(qualifier), _name(column)
+        if column is None or column.lower() in _KEYWORDS:
+            return None
+        if qualifier:
+            table = aliases.get(qualifier, qualifier)
+            return (table, column) if column in columns.get(table, ()) else None
+        owners = [table for table in referenced if column in columns[table]]
+        return (owners[0], column) if len(owners) == 1 else None
+
+    def add(kind, reference):
+        if reference is None:
+            return
+        table, column = reference
+        usage = found.setdefault(table, {"equality": [], "range": [], "join": [], "order": []})
+        if column not in usage[kind]:
+            usage[kind].append(column)
+
+    for match in _PREDICATE.finditer(query):
+        left = resolve(match.group(1), match.group(2))
+        right = resolve(match.group(4), match.group(5)) if match.group(5) else None
+        if left and right and left[0] != right[0]:
+            add("join", left)
+            add("join", right)
+        elif left:
+            add("equality" if match.group(3).lower() in ("=", "is", "in") else "range", left)
+
+    for match in _ORDER_BY.finditer(query):
+        for item in match.group(1).split(","):
+            column = re.match(rf"\s*{_COLUMN}", item)
+            if column:
+                add("order", resolve(column.group(1), column.group(2)))
+    return found
+
+
+def index_columns(usage: dict) -> list:
+    """
+    Orders the columns of a proposed index: equality filters and join keys first, then one range
+    filter, or the ORDER BY columns if there's no range filter.
+    """
+    ordered = usage["equality"] + [c for c in usage["join"] if c not in usage["equality"]]
+    if usage["range"]:
+        ordered.append(usage["range"][0])
+    else:
+        ordered += usage["order"]
+    return list(dict.fromkeys(ordered))
+
+
+def _covered(columns: list, existing: list) -> bool:
+    """True if an existing index starts with the proposed columns."""
+    return any(index["column_names"][:len(columns)] == columns for index in existing)
+
+
+def create_index_statement(table: str, columns: list, connection: Connection) -> str:
+    quote = connection.engine.dialect.identifier_preparer.quote
+    name = f"ix_{table}_{'_'.join(columns)}"[:60]
+    return f"CREATE INDEX {quote(name)} ON {quote(table)} ({', '.join(quote(c) for c in columns)})"
+
+
+def benchmark(query: str, connection: Connection, repeat: int = 3) -> float:
+    """Median seconds to run a query and fetch all of its rows."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(text(query)).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def advise(queries: dict, connection: Connection, min_rows: int = 1000) -> list:
+    """
+    Proposes indexes for the full table scans in a set of queries. Anything but plain reads
+    (see `is_plain_read`) is skipped.
+
+    Parameters:
+        - queries (dict): query -> {"executions": int, "seconds": float}, e.g. built from a query log.
+        - connection (Connection): Connection to the database.
+        - min_rows (int): Full scans estimated to read fewer rows are ignored.
+
+    Returns:
+        - list: One dict per proposed index, highest estimated benefit first:
+          {"table", "columns", "statement", "queries", "executions", "seconds", "rows_scanned",
+           "cost", "benefit"}. `benefit` is the rows the full scans read per execution times the
+           number of executions, i.e. the reads an index could save.
+    """
+    inspector = inspect(connection)
+    columns, existing, proposals = {}, {}, {}
+
+    for query, stats in queries.items():
+        if not is_plain_read(query):
+            continue
+        try:
+            plan = explain(query, connection)
+        except (OperationalError, ProgrammingError, NotImplementedError):
+            continue
+        scans = [s for s in plan["scans"] if s["full_scan"] and (s["rows"] or 0) >= min_rows]
+        if not scans:
+            continue
+        for table in {s["table"] for s in plan["scans"]} - columns.keys():
+            columns[table] = {c["name"] for c in inspector.get_columns(table)}
+            existing[table] = inspector.get_indexes(table)
+        usage = query_columns(query, columns)
+
+        for scan in scans:
+            table = scan["table"]
+            proposed = index_columns(usage.get(table, {"equality": [], "range": [], "join": [], "order": []}))
+            if not proposed or _covered(proposed, existing[table]):
+                continue
+            proposal = proposals.setdefault((table, tuple(proposed)), {
+                "table": table,
+                "columns": proposed,
+                "statement": create_index_statement(table, proposed, connection),
+                "queries": [],
+                "executions": 0,
+                "seconds": 0.0,
+                "rows_scanned": 0,
+                "cost": None,
+                "benefit": 0,
+            })
+            proposal["queries"].append(query)
+            proposal["executions"] += stats["executions"]
+            proposal["seconds"] += stats["seconds"]
+            proposal["rows_scanned"] = max(proposal["rows_scanned"], scan["rows"])
+            if plan["cost"] is not None:
+                proposal["cost"] = max(proposal["cost"] or 0, plan["cost"])
+            proposal["benefit"] += scan["rows"] * stats["executions"]
+
+    return sorted(proposals.values(), key=lambda p: p["benefit"], reverse=True)
+
+
+def apply(proposal: dict, connection: Connection, repeat: int = 3) -> dict:
+    """
+    Creates a proposed index and benchmarks its queries before and after.
+    Adds "before_s", "after_s" (median seconds per query), "full_scans_after" and "error".
+    """
+    proposal = dict(proposal, before_s={}, after_s={}, full_scans_after=None, error=None)
+    if not all(is_plain_read(query) for query in proposal["queries"]):
+        raise ValueError("Only plain SELECT queries can be benchmarked.")
+    for query in proposal["queries"]:
+        proposal["before_s"][query] = benchmark(query, connection, repeat)
+    try:
+        connection.execute(text(proposal["statement"]))
+        connection.commit()
+    except (OperationalError, ProgrammingError) as e:
+        connection.rollback()
+        proposal["error"] = str(e)
+        return proposal
+    full_scans = 0
+    for query in proposal["queries"]:
+        proposal["after_s"][query] = benchmark(query, connection, repeat)
+        scans = explain(query, connection)["scans"]
+        full_scans += sum(s["full_scan"] for s in scans if s["table"] == proposal["table"])
+    proposal["full_scans_after"] = full_scans
+    return proposal
@@ -0,0 +1,307 @@
+import ipaddress
+import os
+import shutil
+import socket
+import subprocess
+import time
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError, DBAPIError
+from sqthon.exception import ServiceStartError, ServiceConnectionError
+
+
+DEFAULT_PORTS = {"postgresql": 5432, "mysql": 3306}
+
+
+class ServerBackend:
+    """
+    Starts and stops a database server for `DatabaseConnector`.
+
+    Backends only launch the server; `wait_until_ready` decides when it accepts queries, so
+    `start` should return as soon as the launch command has been issued.
+    """
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def is_running(self) -> bool:
+        raise NotImplementedError
+
+
+def _run(command: list, service: str):
+    """Runs a lifecycle command and raises ServiceStartError if it fails."""
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except FileNotFoundError as e:
+        raise ServiceStartError(service, msg=f"{command[0]} not found: {e}")
+    except subprocess.CalledProcessError as e:
+        raise ServiceStartError(service, msg=(e.stderr or e.stdout or "").strip(), exit_code=e.returncode)
+
+
+class WindowsServiceBackend(ServerBackend):
+    """
+    A Windows service (e.g. MySQL84), started with `sc` or elevated with `net`.
+
+    Parameters:
+        service_name (str): Name of the service instance.
+    """
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+
+    def start(self):
+        from sqthon.services import start_service
+
+        start_service(self.service_name)
+
+    def stop(self):
+        from sqthon.services import stop_service
+
+        stop_service(self.service_name)
+
+    def is_running(self) -> bool:
+        from sqthon.services import is_service_running
+
+        return is_service_running(self.service_name)
+
+
+class SystemdBackend(ServerBackend):
+    """
+    A systemd unit, e.g. postgresql or mysql.
+
+    Parameters:
+        unit (str): Name of the unit.
+        user (bool): Use the user's service manager (`systemctl --user`).
+        sudo (bool): Prefix the commands with `sudo -n`.
+
+    Commands run with --no-ask-password (and sudo with -n), so they fail instead of prompting.
+    """
+
+    def __init__(self, unit: str, user: bool = False, sudo: bool = False):
+        self.unit = unit
+        self.user = user
+        self.sudo = sudo
+
+    def _command(self, *args) -> list:
+        command = ["systemctl", "--no-ask-password"] + (["--user"] if self.user else []) + list(args)
+        return (["sudo", "-n"] + command) if self.sudo else command
+
+    def start(self):
+        # --no-block returns once the job is queued; readiness is probed by the caller.
+        _run(self._command("start", "--no-block", self.unit), self.unit)
+
+    def stop(self):
+        _run(self._command("stop", self.unit), self.unit)
+
+    def is_running(self) -> bool:
+        command = ["systemctl"] + (["--user"] if self.user else []) + ["is-active", "--quiet", self.unit]
+        return subprocess.run(command).returncode == 0
+
+
+class PgCtlBackend(ServerBackend):
+    """
+    A PostgreSQL cluster controlled with pg_ctl.
+
+    Parameters:
+        data_dir (str): The cluster's data directory.
+        log_file (str, optional): Server log. Defaults to <data_dir>/server.log.
+        pg_ctl (str): Path of the pg_ctl executable.
+        options (str, optional): Extra server options passed with -o (e.g. "-p 5433").
+    """
+
+    def __init__(self, data_dir: str, log_file: str = None, pg_ctl: str = "pg_ctl", options: str = None):
+        self.data_dir = data_dir
+        self.log_file = log_file or os.path.join(data_dir, "server.log")
+        self.pg_ctl = pg_ctl
+        self.options = options
+
+    def start(self):
+        # -W: don't wait for startup; readiness is probed by the caller.
+        command = [self.pg_ctl, "-D", self.data_dir, "-l", self.log_file, "-W"]
+        if self.options:
+            command += ["-o", self.options]
+        _run(command + ["start"], self.data_dir)
+
+    def stop(self):
+        _run([self.pg_ctl, "-D", self.data_dir, "-m", "fast", "stop"], self.data_dir)
+
+    def is_running(self) -> bool:
+        return subprocess.run([self.pg_ctl, "-D", self.data_dir, "status"], capture_output=True).returncode == 0
+
+
+class SubprocessBackend(ServerBackend):
+    """
+    A server run as a child process of this one.
+
+    Parameters:
+        command (list): The server command line.
+        log_file (str, optional): Where the server's output goes. Discarded by default.
+    """
+
+    def __init__(self, command: list, log_file: str = None):
+        self.command = list(command)
+        self.log_file = log_file
+        self.process = None
+
+    def start(self):
+        if self.is_running():
+            return
+        output = open(self.log_file, "ab") if self.log_file else subprocess.DEVNULL
+        try:
+            self.process = subprocess.Popen(self.command, stdout=output, stderr=subprocess.STDOUT,
+                                            stdin=subprocess.DEVNULL)
+        except OSError as e:
+            raise ServiceStartError(self.command[0], msg=str(e))
+        finally:
+            if self.log_file:
+                output.close()
+
+    def stop(self, timeout: float = 30):
+        if self.process is None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class MysqldBackend(SubprocessBackend):
+    """
+    A MySQL server started as `mysqld`.
+
+    Parameters:
+        defaults_file (str, optional): my.cnf to use (--defaults-file).
+        mysqld (str): Path of the mysqld executable.
+        args (list, optional): Extra server arguments (e.g. ["--port=3307"]).
+        log_file (str, optional): Where the server's output goes.
+    """
+
+    def __init__(self, defaults_file: str = None, mysqld: str = "mysqld", args: list = None, log_file: str = None):
+        command = [mysqld] + ([f"--defaults-file={defaults_file}"] if defaults_file else []) + list(args or [])
+        super().__init__(command, log_file=log_file)
+
+
+class LocalBackend(ServerBackend):
+    """
+    Stand-in backend that calls Python functions, for tests and custom start scripts.
+
+    Parameters:
+        start (callable, optional): Starts the server.
+        stop (callable, optional): Stops it.
+        is_running (callable, optional): Returns True while it runs.
+    """
+
+    def __init__(self, start=None, stop=None, is_running=None):
+        self._start = start
+        self._stop = stop
+        self._is_running = is_running
+        self.starts = 0
+
+    def start(self):
+        self.starts += 1
+        if self._start:
+            self._start()
+
+    def stop(self):
+        if self._stop:
+            self._stop()
+
+    def is_running(self) -> bool:
+        return bool(self._is_running()) if self._is_running else True
+
+
+def is_local_host(host: str) -> bool:
+    """True for localhost, loopback addresses and this machine's host name."""
+    if not host or host.lower() == "localhost" or host == socket.gethostname():
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def default_backend(dialect: str, service_instance_name: str = None, host: str = None):
+    """
+    Picks a backend for the platform: the Windows service or the systemd unit named
+    `service_instance_name`. Returns None when there's nothing to start (SQLite, no service name
+    on Windows, no systemd) or when `host` isn't this machine: a remote server needs an
+    explicit backend.
+    """
+    dialect = dialect.lower()
+    if dialect not in DEFAULT_PORTS or not is_local_host(host):
+        return None
+    if os.name == "nt":
+        return WindowsServiceBackend(service_instance_name) if service_instance_name else None
+    if shutil.which("systemctl"):
+        return SystemdBackend(service_instance_name or dialect)
+    return None
+
+
+def _port_open(host: str, port: int, timeout: float) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def is_reachable(engine: Engine, timeout: float = 1.0) -> bool:
+    """True if the server's TCP port accepts connections. Always False for file databases."""
+    host = engine.url.host
+    port = engine.url.port or DEFAULT_PORTS.get(engine.dialect.name)
+    return bool(host and port) and _port_open(host, port, timeout)
+
+
+def wait_until_ready(engine: Engine, timeout: float = 30, initial_delay: float = 0.05,
+                     max_delay: float = 1.0) -> float:
+    """
+    Waits until the server behind `engine` answers `SELECT 1`.
+
+    The TCP port is probed first, which is much cheaper than a login while the server is still
+    starting, then a query is run. Retries back off exponentially from `initial_delay` up to
+    `max_delay` until `timeout` seconds have passed.
+
+    Parameters:
+        - engine (Engine): Engine of the server to wait for.
+        - timeout (float): Deadline in seconds.
+        - initial_delay (float): First wait between probes.
+        - max_delay (float): Longest wait between probes.
+
+    Returns:
+        - float: Seconds waited.
+
+    Raises:
+        - ServiceConnectionError: If the server isn't ready before the deadline.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    host = engine.url.host
+    port = engine.url.port or DEFAULT_PORTS.get(engine.dialect.name)
+    delay = initial_delay
+    error = None
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if host and port and not _port_open(host, port, timeout=max(min(remaining, 1.0), 0.01)):
+            error = f"{host}:{port} is not accepting connections"
+        else:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                return time.monotonic() - start
+            except (OperationalError, DBAPIError) as e:
+                error = str(e.orig or e)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ServiceConnectionError(host or str(engine.url), port=port, waited=timeout, msg=error)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
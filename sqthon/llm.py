@@ -1,23 +1,56 @@
-from openai import OpenAI, APIError, APIConnectionError, OpenAIError, RateLimitError
+from openai import APIError, APIConnectionError, OpenAIError, RateLimitError
 from dotenv import load_dotenv
 from sqthon.util import (
     database_schema,
     format_database_schema,
-    make_dataframe_json_serializable)
-import os
-from sqlalchemy import Engine, text
+    make_dataframe_json_serializable,
+    get_encoding,
+    token_settings,
+    message_tokens,
+    dataframe_preview,
+    limit_query,
+    count_tokens_for_tools,
+    message_as_dict,
+    ApproximateEncoding)
+from sqthon.rate_limit import RateLimiter
+from sqthon.query_plan import explain, over_budget, streams_rows
+from sqthon.exception import QueryBudgetExceeded, ProviderError
+from sqthon.providers import ChatProvider, get_provider
+from sqthon.tracing import span
+from sqthon.memory import frame_bytes, log_record
+from sqlalchemy import Engine, Connection, text
 import json
 import pandas as pd
-from typing import final
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Literal, final
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 
 
+# Messages whose token counts are kept, least recently used dropped first.
+TOKEN_CACHE_SIZE = 4096
+
+
+def _token_key(msg):
+    """Cache key of a message's content. Strings cache their hash, so repeated lookups are cheap."""
+    fields = message_as_dict(msg)
+    key = tuple(fields.items())
+    try:
+        hash(key)
+    except TypeError:
+        # tool_calls and other structured fields.
+        key = json.dumps(fields, sort_keys=True, default=lambda o: getattr(o, "__dict__", str(o)))
+    return key
+
+
 class LLM:
-    def __init__(self, model: str, connection: Engine):
+    def __init__(self, model: str, connection: Engine, provider: str | ChatProvider = "openai"):
         load_dotenv()
         self.model = model
         self.connection = connection
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.provider = get_provider(provider)
         self.db_schema = database_schema(self.connection)
         self.messages = [
             {
@@ -72,27 +105,174 @@ class LLM:
 
         self.last_query_result = None
         self.max_messages = 30
+        self.max_context_tokens = 16000
+        # Rows of a query result sent to the model. Bigger results are sent as a preview.
+        self.preview_rows = 20
+        # If set, generated SELECT queries are wrapped with this LIMIT (as_df results are capped too).
+        self.preview_limit: int | None = None
+        # Budget for generated SQL, checked with EXPLAIN before the query runs. None disables a check.
+        self.max_rows: int | None = None
+        self.max_cost: float | None = None
+        # max_rows bounds the estimated rows examined. "reject" sends the plan back to the model so it
+        # can rewrite the query; "limit" runs the query with LIMIT max_rows when only the row estimate
+        # is over budget and the query streams rows (no outer aggregate, GROUP BY, ORDER BY, ...).
+        self.over_budget: Literal["reject", "limit"] = "reject"
+        self.max_rewrites = 2
+        self.rate_limiter: RateLimiter | None = None
+        # Pooled connections used at most to run the tool calls of one turn concurrently (see
+        # run_tool_calls). 1 runs them one after another on the shared connection.
+        self.tool_call_workers = 4
+        # Set by DatabaseContext: executed tool calls are appended to its query log, with memory
+        # figures while track_memory is on.
+        self.query_log: deque | None = None
+        self.memory_tracker = None
+        self._tokenizer = None
+        self._token_counts = OrderedDict()
+        self._token_lock = threading.Lock()
+        self._tool_schema_tokens = None
+        self._stats = deque(maxlen=10_000)
+        self._stats_lock = threading.Lock()
+        self.stats_callbacks: list[Callable[[dict], None]] = []
+
+    def new_conversation(self) -> list:
+        """Returns a fresh message list holding only the developer prompt."""
+        return [dict(self.messages[0])]
+
+    def count_tokens(self, msg) -> int:
+        """
+        Returns the token count of a message. Counts are cached by message content (the last
+        TOKEN_CACHE_SIZE messages), so copies of the developer prompt are counted once.
+        """
+        key = _token_key(msg)
+        with self._token_lock:
+            count = self._token_counts.get(key)
+            if count is not None:
+                self._token_counts.move_to_end(key)
+                return count
+
+        if self._tokenizer is None:
+            self._tokenizer = self._load_tokenizer()
+        count = message_tokens(msg, *self._tokenizer)
+        with self._token_lock:
+            self._token_counts[key] = count
+            if len(self._token_counts) > TOKEN_CACHE_SIZE:
+                self._token_counts.popitem(last=False)
+        return count
+
+    def _load_tokenizer(self) -> tuple:
+        try:
+            try:
+                return token_settings(self.model)
+            except NotImplementedError:
+                return get_encoding(self.model), 3, 1
+        except Exception as e:
+            print(f"Warning: tiktoken encoding unavailable ({e}). Estimating tokens from text length.")
+            return ApproximateEncoding(), 3, 1
+
+    def tool_schema_tokens(self) -> int:
+        """Returns the tokens the tool definitions add to every request that offers them."""
+        if self._tool_schema_tokens is None:
+            try:
+                # count_tokens_for_tools also counts the 3 reply-priming tokens of an empty chat.
+                self._tool_schema_tokens = count_tokens_for_tools(self.tools, [], self.model) - 3
+            except Exception:
+                self._tool_schema_tokens = len(ApproximateEncoding().encode(json.dumps(self.tools)))
+        return self._tool_schema_tokens
+
+    def request_tokens(self, messages: list, use_tools: bool = True) -> int:
+        """Estimated prompt tokens of a request: the conversation plus the tool definitions if offered."""
+        tokens = sum(self.count_tokens(msg) for msg in messages) + 3
+        return tokens + self.tool_schema_tokens() if use_tools else tokens
+
+    def on_stats(self, callback: Callable[[dict], None]):
+        """Registers a callback that receives the stats record of every ask."""
+        self.stats_callbacks.append(callback)
+
+    def stats(self) -> pd.DataFrame:
+        """
+        Returns one row per ask with token usage and timings.
+
+        Columns:
+            - prompt_tokens / tool_schema_tokens: estimated tokens of the conversation and tool definitions.
+            - api_prompt_tokens / completion_tokens: tokens reported by the API usage field.
+            - model_calls, model_s, model_latencies_s: number of completion calls and their latency.
+            - sql_s, rows: SQL execution time and rows returned.
+            - serialization_s: time spent turning results into tool messages.
+            - total_s, error.
+        """
+        with self._stats_lock:
+            return pd.DataFrame(list(self._stats))
+
+    def _record_stats(self, record: dict):
+        with self._stats_lock:
+            self._stats.append(record)
+        for callback in self.stats_callbacks:
+            callback(record)
 
     def trim_chat(self):
-        total_msg = 0
-        for _ in self.messages:
-            total_msg += 1
-            if total_msg > self.max_messages:
-                self.messages.pop(1)
-                self.messages.pop(1)
+        """
+        Drops the oldest turns until the chat fits in `max_context_tokens` and `max_messages`.
+
+        A turn starts at a user message and runs up to the next one, so a tool call is never
+        separated from its tool result. The developer prompt and the latest turn are always kept.
+        """
+        counts = [self.count_tokens(msg) for msg in self.messages]
+        total = sum(counts) + 3
+        turn_starts = [
+            i for i, msg in enumerate(self.messages)
+            if i > 0 and (msg.get("role") if isinstance(msg, dict) else getattr(msg, "role", None)) == "user"
+        ]
+
+        cut = 1
+        for next_turn in turn_starts[1:]:
+            if total <= self.max_context_tokens and len(self.messages) - cut + 1 <= self.max_messages:
+                break
+            total -= sum(counts[cut:next_turn])
+            cut = next_turn
+        del self.messages[1:cut]
+        return total
 
     @final
     @retry(wait=wait_random_exponential(multiplier=1, max=10), stop=stop_after_attempt(3))
-    def get_response(self):
+    def get_response(self, messages: list = None, use_tools: bool = True, stats: dict = None):
+        """
+        Sends the conversation to the model.
+        Parameters:
+            - messages (list, optional): Conversation to send. Defaults to the shared chat history.
+            - use_tools (bool): Offer the ask_db tool to the model if True.
+            - stats (dict, optional): Stats record of the current ask, updated with latency and usage.
+        """
+        messages = self.messages if messages is None else messages
+        if self.rate_limiter:
+            self.rate_limiter.acquire(self.request_tokens(messages, use_tools))
+        options = {"tools": self.tools, "tool_choice": "auto"} if use_tools else {}
         try:
-            return self.client.chat.completions.create(
-                model=self.model, messages=self.messages,
-                tools=self.tools, tool_choice="auto",
-                temperature=0.3
-            )
-        except (APIError, APIConnectionError, OpenAIError, RateLimitError) as e:
+            start = time.perf_counter()
+            with span("sqthon.llm.completion", model=self.model, provider=type(self.provider).__name__,
+                      messages=len(messages), tools=use_tools) as s:
+                response = self.provider.create(
+                    model=self.model, messages=messages,
+                    temperature=0.3, **options
+                )
+                usage = getattr(response, "usage", None)
+                if usage:
+                    s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+            if stats is not None:
+                stats["model_latencies_s"].append(time.perf_counter() - start)
+                usage = getattr(response, "usage", None)
+                if usage:
+                    stats["api_prompt_tokens"] += usage.prompt_tokens or 0
+                    stats["completion_tokens"] += usage.completion_tokens or 0
+        except RateLimitError as e:
+            print(f"Rate limit exceeded: {e}")
+            raise
+        except (APIError, APIConnectionError, OpenAIError, ProviderError) as e:
             print(f"Error occurred: {e}")
+            return None
 
+        if self.rate_limiter and getattr(response, "usage", None):
+            self.rate_limiter.record(response.usage.completion_tokens)
+        return response
 
     def execute_fn(self, show_query: bool = False):
         """
@@ -100,61 +280,212 @@ class LLM:
         Parameters:
             - show_query (bool): Show the generated query if True.
         """
+        content, result = self._complete(self.messages, show_query=show_query)
+        if result is not None:
+            self.last_query_result = result
+        return content
 
-        try:
-            response = self.get_response()
-            response_msg = response.choices[0].message
-            self.messages.append(response_msg)
+    def answer(self, prompt: str, show_query: bool = False, connection: Connection = None):
+        """
+        Answers a single prompt in an isolated conversation.
 
-            if response_msg.tool_calls:
-                tool_call = response_msg.tool_calls[0]
-                tool_call_id = tool_call.id
-                function_name = tool_call.function.name
+        Nothing is read from or written to the shared chat history, so it is safe to call
+        from several threads as long as each one passes its own connection.
 
-                if function_name == "ask_db":
-                    query = json.loads(tool_call.function.arguments)["query"]
+        Parameters:
+            - prompt (str): The question to ask.
+            - show_query (bool): Show the generated query if True.
+            - connection (Connection, optional): Connection used to run the generated SQL.
+
+        Returns:
+            - tuple: The model's answer and the query result (None if no query was run).
+        """
+        messages = self.new_conversation()
+        messages.append({"role": "user", "content": prompt})
+        return self._complete(messages, show_query=show_query, connection=connection)
+
+    def _complete(self, messages: list, show_query: bool = False, connection: Connection = None):
+        stats = {
+            "prompt": next((m["content"] for m in reversed(messages)
+                            if isinstance(m, dict) and m.get("role") == "user"), None),
+            "started_at": time.time(),
+            "prompt_tokens": sum(self.count_tokens(msg) for msg in messages) + 3,
+            "tool_schema_tokens": self.tool_schema_tokens(),
+            "api_prompt_tokens": 0,
+            "completion_tokens": 0,
+            "model_calls": 0,
+            "model_s": 0.0,
+            "model_latencies_s": [],
+            "sql_s": 0.0,
+            "rows": 0,
+            "serialization_s": 0.0,
+            "total_s": 0.0,
+            "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            result = None
+            rejected = 0
+            use_tools = True
+            while True:
+                response = self.get_response(messages, use_tools=use_tools, stats=stats)
+                response_msg = response.choices[0].message
+                messages.append(response_msg)
 
-                    if show_query:
-                        print(query)
+                if not response_msg.tool_calls:
+                    return response_msg.content, result
 
-                    result = self.ask_db(query)
-                    results_json = make_dataframe_json_serializable(result)
+                for tool_call in response_msg.tool_calls:
+                    if tool_call.function.name != "ask_db":
+                        raise ValueError(f"Unknown function: {tool_call.function.name}")
 
-                    if len(json.dumps(results_json)) > 100:
-                        results_json = make_dataframe_json_serializable(result[:20])
-                        results_json.append(
-                            {"summary": f"{len(result)} rows fetched. Showing the first 30 rows only."}
-                        )
+                outcomes = self.run_tool_calls(
+                    response_msg.tool_calls, show_query=show_query, connection=connection, stats=stats
+                )
 
-                    self.messages.append(
+                any_rejected = False
+                for tool_call, (content, tool_result) in zip(response_msg.tool_calls, outcomes):
+                    if tool_result is None:
+                        any_rejected = True
+                    else:
+                        result = tool_result
+                    messages.append(
                         {
                             "role": "tool",
-                            "tool_call_id": tool_call_id,
-                            "name": function_name,
-                            "content": json.dumps(results_json),
+                            "tool_call_id": tool_call.id,
+                            "name": tool_call.function.name,
+                            "content": content,
                         }
                     )
-                    try:
-                        final_response = self.client.chat.completions.create(
-                            model=self.model, messages=self.messages, temperature=0.3
-                        )
-                        return final_response.choices[0].message.content
-                    except RateLimitError as e:
-                        print(f"Rate limit exceeded: {e}")
-
-                else:
-                    raise ValueError(f"Unknown function: {function_name}")
-            else:
-                return response_msg.content
+
+                # One follow-up completion answers every tool result of this turn.
+                rejected += any_rejected
+                use_tools = any_rejected and rejected <= self.max_rewrites
 
         except Exception as e:
+            stats["error"] = str(e)
             raise Exception(f"Error in execute_fn: {str(e)}")
+        finally:
+            stats["model_calls"] = len(stats["model_latencies_s"])
+            stats["model_s"] = sum(stats["model_latencies_s"])
+            stats["total_s"] = time.perf_counter() - start
+            self._record_stats(stats)
+
+    def run_tool_calls(self, tool_calls: list, show_query: bool = False, connection: Connection = None,
+                       stats: dict = None) -> list:
+        """
+        Runs the ask_db calls of one model turn.
+
+        With a `connection` (as ask_many passes), every call runs on it one after another, so a
+        prompt holds one pooled connection however many calls the model makes. Otherwise a single
+        call runs on the shared connection and several run concurrently on up to
+        `tool_call_workers` connections checked out from the engine's pool. Those count against
+        pool_size + max_overflow and see only committed data, not the shared connection's
+        uncommitted rows or temp tables; set tool_call_workers = 1 if the chat relies on them.
+
+        Returns:
+            - list: (tool message content, DataFrame or None if rejected) per tool call, in order.
+        """
+        if connection is not None or len(tool_calls) == 1 or self.tool_call_workers <= 1:
+            return [self._run_tool_call(tool_call, show_query, connection, stats) for tool_call in tool_calls]
+
+        def run(tool_call):
+            with self.connection.engine.connect() as pooled:
+                return self._run_tool_call(tool_call, show_query, pooled, stats)
+
+        with ThreadPoolExecutor(max_workers=min(len(tool_calls), self.tool_call_workers)) as executor:
+            return list(executor.map(run, tool_calls))
+
+    def _run_tool_call(self, tool_call, show_query: bool, connection: Connection, stats: dict = None):
+        query = json.loads(tool_call.function.arguments)["query"]
+
+        if show_query:
+            print(query)
 
-    def ask_db(self, query: str) -> pd.DataFrame:
+        if self.preview_limit:
+            query = limit_query(query, self.preview_limit)
+
+        record = log_record("llm_tool_call", query=query)
+        try:
+            start = time.perf_counter()
+            result = self.ask_db(query, connection=connection)
+            sql_s = time.perf_counter() - start
+            record["rows"] = len(result)
+            if self.memory_tracker:
+                # Serialization builds the JSON for the model and is where big results blow up.
+                record["frame_bytes"] = frame_bytes(result)
+                with self.memory_tracker.track(record):
+                    content = self.tool_content(result)
+            else:
+                content = self.tool_content(result)
+            record["seconds"] = time.perf_counter() - start
+            if self.query_log is not None:
+                self.query_log.append(record)
+            if stats is not None:
+                with self._stats_lock:
+                    stats["sql_s"] += sql_s
+                    stats["rows"] += len(result)
+                    stats["serialization_s"] += time.perf_counter() - start - sql_s
+            return content, result
+        except QueryBudgetExceeded as e:
+            # Let the model see the plan and rewrite the query.
+            content = json.dumps({
+                "error": str(e),
+                "estimated_rows_examined": e.plan["examined"],
+                "estimated_rows_returned": e.plan["returned"],
+                "estimated_cost": e.plan["cost"],
+                "scans": e.plan["scans"],
+                "instruction": "Rewrite the query so it reads fewer rows, "
+                               "e.g. add join conditions, filters or aggregates.",
+            }, default=str)
+            return content, None
+
+    def check_budget(self, query: str, connection: Connection = None) -> str:
+        """
+        Runs EXPLAIN on the query and compares the estimate with `max_rows` / `max_cost`.
+
+        Returns:
+            - str: The query to run. With over_budget="limit", a query that only exceeds
+              max_rows comes back wrapped with LIMIT max_rows, if its outer level streams rows.
+              A LIMIT around an aggregate or sort wouldn't bound what the database reads.
+
+        Raises:
+            - QueryBudgetExceeded: If the query is over budget and can't be limited.
+        """
+        if self.max_rows is None and self.max_cost is None:
+            return query
+
+        plan = explain(query, connection or self.connection)
+        reasons = over_budget(plan, max_rows=self.max_rows, max_cost=self.max_cost)
+        if not reasons:
+            return query
+        if (self.over_budget == "limit" and not over_budget(plan, max_cost=self.max_cost)
+                and streams_rows(query)):
+            return limit_query(query, self.max_rows)
+        raise QueryBudgetExceeded(query, plan, reasons)
+
+    def tool_content(self, result: pd.DataFrame) -> str:
+        """
+        Serializes a query result for the model.
+        Results up to `preview_rows` rows are sent whole, bigger ones as a preview (head rows + stats).
+        """
+        if len(result) <= self.preview_rows:
+            return json.dumps(make_dataframe_json_serializable(result))
+
+        preview = dataframe_preview(result, max_rows=self.preview_rows)
+        summary = f"{len(result)} rows fetched. Showing the first {self.preview_rows} rows only."
+        if self.preview_limit and len(result) >= self.preview_limit:
+            summary += f" The query was capped at {self.preview_limit} rows."
+        preview["summary"] = summary
+        return json.dumps(preview)
+
+    def ask_db(self, query: str, connection: Connection = None) -> pd.DataFrame:
         """Function to query  databases with a provided SQL query."""
+        query = self.check_budget(query, connection=connection)
         try:
-            result = pd.read_sql_query(text(query), self.connection)
-            self.last_query_result = result
+            result = pd.read_sql_query(text(query), connection or self.connection)
+            if connection is None:
+                self.last_query_result = result
             return result
         except Exception as e:
             raise Exception(f"Error executing query: {e}")
@@ -9,7 +9,8 @@ from sqthon.db_context import DatabaseContext
 
 class Sqthon:
     def __init__(
-            self, dialect: str, user: str, host: str, service_instance_name: str = None
+            self, dialect: str, user: str, host: str, service_instance_name: str = None,
+            lifecycle=None, ready_timeout: float = 30
     ):
         self.dialect = dialect
         self.user = user
@@ -19,6 +20,8 @@ class Sqthon:
             user=self.user,
             host=self.host,
             service_instance_name=service_instance_name,
+            lifecycle=lifecycle,
+            ready_timeout=ready_timeout,
         )
         self.connections = {}
 
@@ -126,14 +129,31 @@ class Sqthon:
 
     @final
     def connect_to_database(self, database: str = None, local_infile: bool = False, use_llm: bool = False,
-                            model: str = None):
-        """Connects to specific database."""
+                            model: str = None, llm_provider: str = "openai",
+                            sqlite_profile: str | dict = "default", sqlite_mode: str = "rw",
+                            pool_size: int = 20, max_overflow: int = 10, pool_pre_ping: bool = False,
+                            pool_timeout: float = 30, pool_recycle: int = 3600, warm: int = 0):
+        """Connects to specific database.
+
+        Parameters:
+            llm_provider (str): "openai" or "ollama" (a local Ollama server, see OLLAMA_HOST).
+            sqlite_profile (str | dict): "default", "performance" or a dict of PRAGMAs (SQLite only).
+            sqlite_mode (str): "rw", "ro" or "memory" (SQLite only).
+            pool_size, max_overflow, pool_pre_ping, pool_timeout, pool_recycle: Settings of the
+                database's connection pool (see DatabaseConnector.connect). They apply when the
+                database is first connected.
+            warm (int): Connections to open in parallel at connect time.
+        """
         try:
             connection = self.connect_db.connect(
-                database=database, local_infile=local_infile
+                database=database, local_infile=local_infile,
+                sqlite_profile=sqlite_profile, sqlite_mode=sqlite_mode,
+                pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=pool_pre_ping,
+                pool_timeout=pool_timeout, pool_recycle=pool_recycle, warm=warm,
             )
             self.connections[database] = DatabaseContext(
-                database=database, connection=connection, llm=use_llm, model_name=model
+                database=database, connection=connection, llm=use_llm, model_name=model,
+                provider=llm_provider
             )
         except Exception as e:
             print(f"Error connecting to database {database}: {e}")
@@ -0,0 +1,159 @@
+import datetime
+import decimal
+import json
+import os
+import re
+import shutil
+import time
+import pandas as pd
+from pathlib import Path
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Materialized results are stored with pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def _json_value(value):
+    """
+    Watermarks are kept in JSON; timestamps and dates as ISO strings, decimals as strings,
+    tagged with their type.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime.datetime):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    return value.item() if hasattr(value, "item") else value
+
+
+def bind_watermark(value):
+    """Turns a stored watermark back into a query parameter."""
+    if isinstance(value, dict) and "timestamp" in value:
+        return pd.Timestamp(value["timestamp"]).to_pydatetime()
+    if isinstance(value, dict) and "date" in value:
+        return datetime.date.fromisoformat(value["date"])
+    if isinstance(value, dict) and "decimal" in value:
+        return decimal.Decimal(value["decimal"])
+    return value
+
+
+class MaterializedStore:
+    """
+    Local columnar store for query results, one directory per name.
+
+    Results are written as uncompressed Arrow IPC (Feather v2) files, so reads map them
+    instead of parsing. Incremental refreshes add a new part file instead of rewriting
+    the existing ones. The metadata records the database a result came from.
+
+    Parameters:
+        directory (str | Path): Root directory of the store.
+    """
+
+    def __init__(self, directory=".sqthon_store"):
+        self.directory = Path(directory)
+
+    def _dir(self, name: str) -> Path:
+        if not re.fullmatch(r"[\w-][\w.-]*", name):
+            raise ValueError(f"Invalid materialized result name: {name!r}. Use letters, digits, '_', '.' or '-' "
+                             f"and don't start with '.'.")
+        return self.directory / name
+
+    def meta(self, name: str):
+        """The stored metadata (source, query, refresh_by, watermark, refreshed_at, rows, parts) or None."""
+        try:
+            with open(self._dir(name) / "meta.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: dict):
+        content = json.dumps(meta)
+        path = directory / "meta.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _write_part(directory: Path, df: pd.DataFrame, part: int) -> str:
+        pa = _arrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        filename = f"part-{part:05d}.arrow"
+        path = directory / filename
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        return filename
+
+    def write(self, name: str, df: pd.DataFrame, meta: dict):
+        """
+        Replaces a stored result. The new result is written next to the old one and swapped in,
+        so a failed write leaves the old result in place.
+        """
+        directory = self._dir(name)
+        staging, previous = directory.with_name(f".{name}.new"), directory.with_name(f".{name}.old")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        try:
+            meta = dict(meta, rows=len(df), parts=[self._write_part(staging, df, 0)], refreshed_at=time.time())
+            self._write_meta(staging, meta)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        shutil.rmtree(previous, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+        return meta
+
+    def append(self, name: str, df: pd.DataFrame, meta: dict):
+        """Adds rows to a stored result as a new part."""
+        meta = dict(meta, refreshed_at=time.time())
+        if len(df):
+            meta["parts"] = meta["parts"] + [self._write_part(self._dir(name), df, len(meta["parts"]))]
+            meta["rows"] += len(df)
+        self._write_meta(self._dir(name), meta)
+        return meta
+
+    def read(self, name: str) -> pd.DataFrame:
+        """
+        Reads the parts of a stored result through a memory map and returns them as one DataFrame.
+        Arrow skips parsing, but converting to pandas copies the data into memory.
+        """
+        pa = _arrow()
+        meta = self.meta(name)
+        if meta is None:
+            raise KeyError(f"No materialized result named {name!r}.")
+        tables = []
+        for part in meta["parts"]:
+            with pa.memory_map(str(self._dir(name) / part)) as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        table = pa.concat_tables(tables, promote_options="default") if len(tables) > 1 else tables[0]
+        return table.to_pandas()
+
+    def drop(self, name: str):
+        shutil.rmtree(self._dir(name), ignore_errors=True)
+
+    def names(self) -> list:
+        if not self.directory.exists():
+            return []
+        return sorted(entry.name for entry in self.directory.iterdir()
+                      if not entry.name.startswith(".") and (entry / "meta.json").exists())
+
+
+def watermark_of(df: pd.DataFrame, column: str):
+    if column not in df.columns:
+        raise ValueError(f"refresh_by column {column!r} is not in the query result.")
+    return _json_value(df[column].max()) if len(df) else None
+
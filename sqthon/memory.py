@@ -0,0 +1,94 @@
+import time
+import tracemalloc
+import warnings
+import pandas as pd
+from contextlib import contextmanager
+from typing import Literal
+from sqthon.exception import MemoryThresholdWarning
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory held by a DataFrame, including the Python objects of object columns."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def log_record(operation: str, **fields) -> dict:
+    """A query log entry. Memory fields stay None unless a MemoryTracker fills them."""
+    return {
+        "operation": operation,
+        "started_at": time.time(),
+        "seconds": None,
+        "rows": None,
+        "frame_bytes": None,
+        "peak_bytes": None,
+        "retained_bytes": None,
+        "chunked": False,
+        "error": None,
+        **fields,
+    }
+
+
+class MemoryTracker:
+    """
+    Opt-in peak and retained memory accounting with tracemalloc.
+
+    `track` measures the Python allocations of one operation: `peak_bytes` is the highest
+    point above the starting level and `retained_bytes` what was still allocated at the end.
+    tracemalloc slows allocations down and its peak is process-wide, so numbers of operations
+    running at the same time overlap.
+
+    Parameters:
+        threshold (int, optional): Bytes above which an operation counts as too big.
+        action (str): "warn" emits a MemoryThresholdWarning. "chunk" also makes run_query fetch
+            in chunks and return an iterator of DataFrames once the result passes the threshold.
+        chunksize (int): Rows per chunk in chunked mode.
+    """
+
+    def __init__(self, threshold: int = None, action: Literal["warn", "chunk"] = "warn", chunksize: int = 100_000):
+        if action not in ("warn", "chunk"):
+            raise ValueError(f"Invalid action: {action}. Expected 'warn' or 'chunk'.")
+        self.threshold = threshold
+        self.action = action
+        self.chunksize = chunksize
+        self._started = False
+
+    @property
+    def chunked(self) -> bool:
+        return self.action == "chunk" and self.threshold is not None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self):
+        """Stops tracemalloc if this tracker started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def over(self, nbytes: int) -> bool:
+        return self.threshold is not None and nbytes is not None and nbytes > self.threshold
+
+    def warn(self, record: dict, nbytes: int):
+        warnings.warn(
+            f"{record['operation']} used {nbytes:,} bytes (threshold {self.threshold:,}): "
+            f"{(record.get('query') or record.get('table') or '')[:200]}",
+            MemoryThresholdWarning,
+            stacklevel=4,
+        )
+
+    @contextmanager
+    def track(self, record: dict):
+        """Fills `peak_bytes` and `retained_bytes` of a query log record for the enclosed code."""
+        self.start()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield record
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            record["peak_bytes"] = max(peak - before, 0)
+            record["retained_bytes"] = current - before
+            if self.over(record["peak_bytes"]) and not record["chunked"]:
+                self.warn(record, record["peak_bytes"])
@@ -0,0 +1,59 @@
+import datetime
+import decimal
+import pandas as pd
+
+
+def _is_text_timestamp(value) -> bool:
+    try:
+        pd.Timestamp(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def partition_bounds(low, high, partitions: int) -> list:
+    """
+    Splits [low, high] into at most `partitions` ranges and returns the inner boundaries
+    (partitions - 1 values, fewer if an integer range is too narrow).
+
+    Integers split on integers, floats and decimals evenly, and dates/datetimes (or ISO-8601
+    text, as SQLite stores them) by time. Text boundaries come back in the same text format.
+    """
+    if isinstance(low, bool) or isinstance(high, bool):
+        raise ValueError("Can't partition on a boolean column.")
+    if isinstance(low, int) and isinstance(high, int):
+        span = high - low + 1
+        return sorted({low + span * i // partitions for i in range(1, partitions)} - {low})
+    if isinstance(low, (float, decimal.Decimal)) or isinstance(high, (float, decimal.Decimal)):
+        if not (isinstance(low, decimal.Decimal) and isinstance(high, decimal.Decimal)):
+            # Decimal and float don't mix in arithmetic.
+            low, high = float(low), float(high)
+        return [low + (high - low) * i / partitions for i in range(1, partitions)] if high > low else []
+
+    text = isinstance(low, str)
+    if text and not (_is_text_timestamp(low) and _is_text_timestamp(high)):
+        raise ValueError(f"Can't partition on text values like {low!r}; use a numeric or date/time column.")
+    if not isinstance(low, (str, datetime.date, pd.Timestamp)):
+        raise ValueError(f"Can't partition on values of type {type(low).__name__}.")
+    start, end = pd.Timestamp(low), pd.Timestamp(high)
+    if end <= start:
+        return []
+    bounds = [start + (end - start) * i / partitions for i in range(1, partitions)]
+    if text:
+        sep = "T" if "T" in low else " "
+        return [bound.isoformat(sep=sep) for bound in bounds]
+    return [bound.to_pydatetime() for bound in bounds]
+
+
+def partition_predicates(column: str, bounds: list) -> list:
+    """
+    WHERE clauses with parameters, one per partition, covering every row exactly once.
+    NULLs go to the first partition.
+    """
+    if not bounds:
+        return [("1 = 1", {})]
+    predicates = [(f"({column} < :hi OR {column} IS NULL)", {"hi": bounds[0]})]
+    for low, high in zip(bounds, bounds[1:]):
+        predicates.append((f"{column} >= :lo AND {column} < :hi", {"lo": low, "hi": high}))
+    predicates.append((f"{column} >= :lo", {"lo": bounds[-1]}))
+    return predicates
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class GaugedQueuePool(QueuePool):
+    """
+    QueuePool that also counts how long checkouts wait for a free connection and how long
+    opening new connections takes. Read the numbers with `pool_status`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gauge_lock = threading.Lock()
+        self._gauges = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_s": 0.0,
+            "max_wait_s": 0.0,
+            "timeouts": 0,
+            "connects": 0,
+            "connect_s": 0.0,
+        }
+        self._connecting = threading.local()
+        self._checkout = threading.local()
+
+    def recreate(self):
+        # Engine.dispose() swaps in a fresh pool; the counters carry over.
+        pool = super().recreate()
+        pool._gauges = self._gauges
+        pool._gauge_lock = self._gauge_lock
+        return pool
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            self._connecting.seconds = getattr(self._connecting, "seconds", 0.0) + elapsed
+            with self._gauge_lock:
+                self._gauges["connects"] += 1
+                self._gauges["connect_s"] += elapsed
+
+    def checkout_started(self):
+        """time.perf_counter() when this thread's latest checkout started waiting, or None."""
+        return getattr(self._checkout, "start", None)
+
+    def _do_get(self):
+        self._connecting.seconds = 0.0
+        start = self._checkout.start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._gauge_lock:
+                self._gauges["timeouts"] += 1
+            raise
+        finally:
+            # Time spent opening a connection isn't waiting for one.
+            wait = time.perf_counter() - start - self._connecting.seconds
+            with self._gauge_lock:
+                gauges = self._gauges
+                gauges["checkouts"] += 1
+                if wait > 0.001:
+                    gauges["waits"] += 1
+                    gauges["wait_s"] += wait
+                    gauges["max_wait_s"] = max(gauges["max_wait_s"], wait)
+
+
+def pool_status(engine: Engine) -> dict:
+    """
+    Gauges of an engine's pool.
+
+    Returns:
+        - dict: size, checked_in, checked_out, overflow (connections beyond size, negative while
+          the pool hasn't reached size), and for a GaugedQueuePool also checkouts, waits
+          (checkouts that waited over 1 ms), wait_s, max_wait_s, timeouts, connects and connect_s.
+    """
+    pool = engine.pool
+    status = {}
+    if isinstance(pool, QueuePool):
+        status = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+    if isinstance(pool, GaugedQueuePool):
+        with pool._gauge_lock:
+            status.update(pool._gauges)
+    return status
+
+
+def prewarm(engine: Engine, connections: int) -> float:
+    """
+    Opens `connections` connections in parallel and returns them to the pool, so the first
+    requests don't pay for connecting. Capped at the pool's size, since the pool closes
+    connections returned beyond it.
+
+    Returns:
+        - float: Seconds it took.
+    """
+    start = time.perf_counter()
+    if isinstance(engine.pool, QueuePool):
+        connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return 0.0
+    barrier = threading.Barrier(connections)
+
+    def open_connection(_):
+        try:
+            with engine.connect():
+                # Hold it until every thread has one, or they'd reuse each other's.
+                barrier.wait()
+        except Exception:
+            barrier.abort()
+            raise
+
+    with ThreadPoolExecutor(connections) as executor:
+        list(executor.map(open_connection, range(connections)))
+    return time.perf_counter() - start
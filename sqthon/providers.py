@@ -0,0 +1,194 @@
+import json
+import os
+import uuid
+from types import SimpleNamespace
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from sqthon.exception import ProviderError
+
+
+class ChatProvider:
+    """
+    Base class for the chat-completion backends used by `LLM`.
+
+    `create` takes OpenAI-style arguments and returns an OpenAI-shaped response
+    (`response.choices[0].message` with `content` and `tool_calls`, plus `response.usage`),
+    so `LLM` doesn't need to know which backend it talks to.
+    """
+
+    def create(self, model: str, messages: list, temperature: float = 0.3, tools: list = None,
+               tool_choice: str = None):
+        raise NotImplementedError
+
+
+class OpenAIProvider(ChatProvider):
+    """
+    Chat completions through the OpenAI API.
+
+    Parameters:
+        client (OpenAI, optional): A ready client. Defaults to one using OPENAI_API_KEY.
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = client
+
+    def create(self, model: str, messages: list, temperature: float = 0.3, tools: list = None,
+               tool_choice: str = None):
+        options = {"tools": tools, "tool_choice": tool_choice} if tools else {}
+        return self.client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, **options
+        )
+
+
+class OllamaProvider(ChatProvider):
+    """
+    Chat completions through a local Ollama server (`/api/chat`).
+
+    Models with tool support get the tools natively. For models without it, the provider switches
+    to JSON mode and asks the model for {"query": ...} or {"answer": ...}, turning a query into an
+    ask_db tool call, so `LLM` works the same either way.
+
+    Parameters:
+        host (str, optional): Server URL. Defaults to OLLAMA_HOST or http://localhost:11434.
+        timeout (float): Seconds to wait for a completion.
+        keep_alive (str): How long Ollama keeps the model loaded after a request.
+        pool_size (int): HTTP connections kept open for reuse.
+    """
+
+    JSON_MODE_PROMPT = (
+        "Reply with a single JSON object. To run SQL against the database reply "
+        '{"query": "<SQL query>"}. Otherwise reply {"answer": "<your answer in Markdown>"}.'
+    )
+
+    def __init__(self, host: str = None, timeout: float = 120, keep_alive: str = "5m", pool_size: int = 16):
+        self.host = (host or os.getenv("OLLAMA_HOST") or "http://localhost:11434").rstrip("/")
+        if not self.host.startswith("http"):
+            self.host = f"http://{self.host}"
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Models that answered "does not support tools" once.
+        self.json_mode_models = set()
+
+    def create(self, model: str, messages: list, temperature: float = 0.3, tools: list = None,
+               tool_choice: str = None):
+        payload = {
+            "model": model,
+            "messages": [self._to_ollama(msg) for msg in messages],
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": temperature},
+        }
+        json_mode = bool(tools) and model in self.json_mode_models
+        if tools and not json_mode:
+            payload["tools"] = tools
+            response = self._post(payload)
+            if response.status_code == 400 and "does not support tools" in response.text:
+                self.json_mode_models.add(model)
+                json_mode = True
+            else:
+                return self._to_openai(self._json(response), json_mode=False)
+
+        if json_mode:
+            payload.pop("tools", None)
+            payload["format"] = "json"
+            payload["messages"].append({"role": "system", "content": self.JSON_MODE_PROMPT})
+
+        return self._to_openai(self._json(self._post(payload)), json_mode=json_mode)
+
+    def _post(self, payload: dict) -> requests.Response:
+        try:
+            return self.session.post(f"{self.host}/api/chat", json=payload, timeout=self.timeout)
+        except RequestException as e:
+            raise ProviderError(f"Ollama request failed: {e}")
+
+    @staticmethod
+    def _json(response: requests.Response) -> dict:
+        if response.status_code != 200:
+            raise ProviderError(f"Ollama returned {response.status_code}: {response.text}")
+        return response.json()
+
+    @staticmethod
+    def _to_ollama(msg) -> dict:
+        """Converts an OpenAI-style message (dict or response object) to Ollama's format."""
+        if not isinstance(msg, dict):
+            msg = msg.model_dump(exclude_none=True) if hasattr(msg, "model_dump") else vars(msg)
+        role = "system" if msg["role"] == "developer" else msg["role"]
+        converted = {"role": role, "content": msg.get("content") or ""}
+        if msg.get("tool_calls"):
+            converted["tool_calls"] = []
+            for call in msg["tool_calls"]:
+                function = call["function"] if isinstance(call, dict) else vars(call.function)
+                arguments = function["arguments"]
+                converted["tool_calls"].append({
+                    "function": {
+                        "name": function["name"],
+                        "arguments": json.loads(arguments) if isinstance(arguments, str) else arguments,
+                    }
+                })
+        if role == "tool" and msg.get("name"):
+            converted["tool_name"] = msg["name"]
+        return converted
+
+    @staticmethod
+    def _to_openai(data: dict, json_mode: bool) -> SimpleNamespace:
+        """Converts an Ollama /api/chat response to the OpenAI response shape."""
+        message = data.get("message", {})
+        content = message.get("content")
+        calls = [call["function"] for call in message.get("tool_calls") or []]
+
+        if json_mode and content:
+            try:
+                reply = json.loads(content)
+            except json.JSONDecodeError:
+                reply = {"answer": content}
+            if isinstance(reply, dict) and reply.get("query"):
+                calls, content = [{"name": "ask_db", "arguments": {"query": reply["query"]}}], None
+            elif isinstance(reply, dict):
+                content = reply.get("answer", content)
+
+        tool_calls = [
+            SimpleNamespace(
+                id=f"call_{uuid.uuid4().hex[:12]}",
+                type="function",
+                function=SimpleNamespace(
+                    name=call["name"],
+                    arguments=call["arguments"] if isinstance(call["arguments"], str)
+                    else json.dumps(call["arguments"]),
+                ),
+            )
+            for call in calls
+        ]
+        prompt_tokens = data.get("prompt_eval_count", 0)
+        completion_tokens = data.get("eval_count", 0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(
+                message=SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls or None)
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+def get_provider(provider: "str | ChatProvider") -> ChatProvider:
+    """Returns a provider instance for "openai", "ollama" or an existing ChatProvider."""
+    if isinstance(provider, ChatProvider):
+        return provider
+    if provider == "openai":
+        return OpenAIProvider()
+    if provider == "ollama":
+        return OllamaProvider()
+    raise ValueError(f"Unsupported LLM provider: {provider}. Expected 'openai' or 'ollama'.")
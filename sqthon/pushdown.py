@@ -0,0 +1,104 @@
+import pandas as pd
+from sqlalchemy import Connection, text
+from typing import Optional
+from sqthon.util import derived_table
+
+
+SQL_ESTIMATORS = {"mean": "AVG", "sum": "SUM", "count": "COUNT", "min": "MIN", "max": "MAX"}
+
+
+def bar_query(query: str, x: str, y: Optional[str], quote, hue: Optional[str] = None,
+              estimator: str = "mean") -> str:
+    """GROUP BY x (and hue) with the estimator applied to y. Without y, rows are counted."""
+    if estimator not in SQL_ESTIMATORS:
+        raise ValueError(f"Unsupported estimator for aggregation: {estimator}. "
+                         f"Expected one of {list(SQL_ESTIMATORS)}.")
+    keys = [quote(x)] + ([quote(hue)] if hue else [])
+    value = f"{SQL_ESTIMATORS[estimator]}({quote(y)}) AS {quote(y)}" if y else "COUNT(*) AS count"
+    return (
+        f"SELECT {', '.join(keys)}, {value} FROM {derived_table(query)} "
+        f"GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}"
+    )
+
+
+def hist_query(query: str, x: str, quote, dialect: str, low: float, width: float, bins: int,
+               hue: Optional[str] = None) -> str:
+    """Counts rows per equal-width bucket of x. Bucket numbers run from 0 to bins - 1."""
+    column = quote(x)
+    if dialect == "postgresql":
+        bucket = f"LEAST(width_bucket({column}, {low}, {low + width * bins}, {bins}), {bins}) - 1"
+    elif dialect == "sqlite":
+        # x - low is never negative, so truncating equals FLOOR.
+        bucket = f"MIN(CAST(({column} - {low}) / {width} AS INTEGER), {bins - 1})"
+    else:
+        bucket = f"LEAST(FLOOR(({column} - {low}) / {width}), {bins - 1})"
+    keys = ["bin"] + ([quote(hue)] if hue else [])
+    return (
+        f"SELECT {bucket} AS bin{', ' + quote(hue) if hue else ''}, COUNT(*) AS count "
+        f"FROM {derived_table(query)} WHERE {column} IS NOT NULL GROUP BY {', '.join(keys)}"
+    )
+
+
+def box_query(query: str, x: Optional[str], y: str, quote, dialect: str, hue: Optional[str] = None) -> Optional[str]:
+    """Five-number summary per x (and hue) group. Returns None if the dialect has no percentile aggregate."""
+    if dialect != "postgresql":
+        return None
+    value = quote(y)
+    quartiles = ", ".join(
+        f"percentile_cont({q}) WITHIN GROUP (ORDER BY {value}) AS {name}"
+        for q, name in ((0.25, "q1"), (0.5, "med"), (0.75, "q3"))
+    )
+    select = f"MIN({value}) AS min, {quartiles}, MAX({value}) AS max"
+    keys = [quote(column) for column in (x, hue) if column]
+    if keys:
+        return (f"SELECT {', '.join(keys)}, {select} FROM {derived_table(query)} "
+                f"GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}")
+    return f"SELECT {select} FROM {derived_table(query)}"
+
+
+def aggregate_for_plot(query: str, connection: Connection, plot_type: str, x: Optional[str], y: Optional[str],
+                       hue: Optional[str] = None, bins: int = 50, estimator: str = "mean") -> Optional[pd.DataFrame]:
+    """
+    Runs the aggregation a plot needs inside the database and returns only the aggregated rows.
+
+    - bar: one row per x (and hue) with the estimator of y.
+    - hist: one row per bin with the bin center in x and its row count in "count".
+      The bin width is stored in `result.attrs["binwidth"]`.
+    - box: min, q1, med, q3 and max of y per x and hue (PostgreSQL only).
+
+    Returns:
+        - pd.DataFrame, or None if the plot type, dialect or column type can't be aggregated in SQL.
+    """
+    dialect = connection.engine.dialect.name
+    quote = connection.engine.dialect.identifier_preparer.quote
+
+    if plot_type == "bar":
+        return pd.read_sql_query(text(bar_query(query, x, y, quote, hue=hue, estimator=estimator)), connection)
+
+    if plot_type == "hist":
+        column = x or y
+        low, high = connection.execute(
+            text(f"SELECT MIN({quote(column)}), MAX({quote(column)}) FROM {derived_table(query)}")
+        ).one()
+        if low is None:
+            result = pd.DataFrame({column: [], "count": []})
+            result.attrs.update(binwidth=1.0, binrange=(0.0, 1.0))
+            return result
+        if not hasattr(low, "__float__"):
+            return None  # Dates, times and text are binned client-side.
+        low, high = float(low), float(high)
+        width = (high - low) / bins if high > low else 1.0
+        result = pd.read_sql_query(
+            text(hist_query(query, column, quote, dialect, low, width, bins, hue=hue)), connection
+        )
+        result[column] = low + (result.pop("bin").astype(float) + 0.5) * width
+        result = result.sort_values(column, ignore_index=True)
+        result.attrs["binwidth"] = width
+        result.attrs["binrange"] = (low, low + width * bins)
+        return result
+
+    if plot_type == "box":
+        sql = box_query(query, x if y else None, y or x, quote, dialect, hue=hue)
+        return None if sql is None else pd.read_sql_query(text(sql), connection)
+
+    return None
@@ -0,0 +1,284 @@
+import json
+import math
+import re
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+
+# Rows SQLite is assumed to return for an indexed lookup (same guess SQLite's planner makes).
+SQLITE_SEARCH_ROWS = 10
+
+_SQL_KEYWORDS = {
+    "where", "join", "inner", "left", "right", "full", "outer", "cross", "natural", "on", "using",
+    "group", "order", "limit", "having", "union", "except", "intersect", "window", "offset", "as",
+}
+
+_AGGREGATE = (r"\b(?:count|sum|avg|min|max|total|group_concat|string_agg|array_agg|json_agg|"
+              r"jsonb_agg|json_arrayagg|bool_and|bool_or|every|stddev\w*|var\w*)\s*\(")
+
+
+def _from_clauses(query: str):
+    """Yields the body of every FROM clause, with parenthesized parts (subqueries) reduced to '('."""
+    for match in re.finditer(r"\bfrom\b", query, flags=re.IGNORECASE):
+        depth, body = 0, []
+        for char in query[match.end():]:
+            if char == "(":
+                depth += 1
+                if depth == 1:
+                    body.append(char)
+            elif char == ")":
+                depth -= 1
+                if depth < 0:
+                    break
+            elif depth == 0:
+                body.append(char)
+        yield re.split(
+            r"\b(?:where|group|order|limit|having|union|except|intersect|window)\b|;",
+            "".join(body),
+            maxsplit=1,
+            flags=re.IGNORECASE,
+        )[0]
+
+
+def table_references(query: str) -> dict:
+    """
+    Returns a mapping of alias -> table name for the tables in FROM and JOIN clauses.
+    Tables without an alias map to themselves.
+
+    Notes:
+        This is a regex over the SQL text, not a parser. It doesn't skip comments or string
+        literals, doesn't know table-valued functions or LATERAL, and reads only the first word
+        of an identifier quoted with spaces. Callers (plans, sampling, the index advisor) use
+        it for best-effort estimates and must tolerate missing or extra names.
+    """
+    references = {}
+    for clause in _from_clauses(query):
+        items = re.split(
+            r",|\b(?:natural\s+)?(?:(?:left|right|full|inner|cross)\s+)?(?:outer\s+)?join\b",
+            clause,
+            flags=re.IGNORECASE,
+        )
+        for item in items:
+            match = re.match(r"\s*([`\"\w.]+)(?:\s+(?:as\s+)?([`\"\w]+))?", item, flags=re.IGNORECASE)
+            if not match:
+                continue
+            table = match.group(1).replace("`", "").replace('"', "").split(".")[-1]
+            references[table] = table
+            alias = (match.group(2) or "").replace("`", "").replace('"', "")
+            if alias and alias.lower() not in _SQL_KEYWORDS:
+                references[alias] = table
+    return references
+
+
+def _outer_level(query: str) -> str:
+    """The query with everything inside parentheses (subqueries, CTE bodies, function arguments) removed."""
+    depth, outer = 0, []
+    for char in query:
+        if char == "(":
+            depth += 1
+            if depth == 1:
+                outer.append(char)
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                outer.append(char)
+        elif depth == 0:
+            outer.append(char)
+    return "".join(outer)
+
+
+def _aggregates_to_one_row(outer: str) -> bool:
+    return bool(re.search(_AGGREGATE, outer, flags=re.IGNORECASE)) and not re.search(
+        r"\bgroup\s+by\b", outer, flags=re.IGNORECASE)
+
+
+def streams_rows(query: str) -> bool:
+    """
+    True if the outer level of a query returns rows as it reads them: no aggregate, GROUP BY,
+    DISTINCT, ORDER BY, window function or set operation. Only then does a LIMIT also bound the
+    rows the database reads.
+    """
+    outer = _outer_level(query.strip().rstrip(";"))
+    blocking = r"\b(?:group\s+by|order\s+by|distinct|having|union|except|intersect|over)\b"
+    return not (re.search(blocking, outer, flags=re.IGNORECASE)
+                or re.search(_AGGREGATE, outer, flags=re.IGNORECASE))
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _mysql_plan(plan: dict) -> dict:
+    cost = plan.get("query_block", {}).get("cost_info", {}).get("query_cost")
+    examined, returned, scans, joined = 0, None, [], set()
+
+    def scan(node: dict, loops: float):
+        rows = node.get("rows_examined_per_scan", 0)
+        scans.append({
+            "table": node["table_name"],
+            "rows": rows,
+            "index": node.get("key"),
+            "full_scan": node.get("access_type") == "ALL",
+        })
+        return loops * rows
+
+    for node in _walk(plan):
+        # A nested loop reads each table once per row produced by the tables before it.
+        if "nested_loop" in node:
+            loops = 1
+            for step in node["nested_loop"]:
+                table = step.get("table", {})
+                if "table_name" not in table:
+                    continue
+                joined.add(id(table))
+                examined += scan(table, loops)
+                loops = table.get("rows_produced_per_join", loops)
+            if returned is None:
+                returned = loops
+        elif "table_name" in node and id(node) not in joined:
+            examined += scan(node, 1)
+            if returned is None:
+                returned = node.get("rows_produced_per_join", node.get("rows_examined_per_scan", 0))
+    return {"examined": examined, "returned": returned or 0,
+            "cost": float(cost) if cost is not None else None, "scans": scans}
+
+
+def _postgres_table_rows(table: str, connection: Connection):
+    # reltuples is -1 until the table is vacuumed or analyzed for the first time.
+    rows = connection.execute(text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:t)"),
+                              {"t": table}).scalar()
+    return rows if rows is not None and rows >= 0 else None
+
+
+def _postgres_plan(plan: list, connection: Connection) -> dict:
+    root = plan[0]["Plan"]
+    scans = []
+
+    def examined(node: dict, loops: float) -> float:
+        rows = 0
+        if "Relation Name" in node:
+            full_scan = node.get("Node Type") == "Seq Scan"
+            # Plan Rows of a scan counts rows left after its filter; a seq scan reads the whole table.
+            table_rows = _postgres_table_rows(node["Relation Name"], connection) if full_scan else None
+            rows = table_rows if table_rows is not None else node.get("Plan Rows", 0)
+            scans.append({
+                "table": node["Relation Name"],
+                "rows": rows,
+                "index": node.get("Index Name"),
+                "full_scan": full_scan,
+            })
+        children = node.get("Plans", [])
+        if node.get("Node Type") == "Nested Loop" and len(children) == 2:
+            # The inner side runs once per outer row.
+            outer, inner = children
+            return loops * rows + examined(outer, loops) + examined(inner, loops * max(outer.get("Plan Rows", 1), 1))
+        return loops * rows + sum(examined(child, loops) for child in children)
+
+    return {"examined": examined(root, 1), "returned": root.get("Plan Rows"),
+            "cost": root.get("Total Cost"), "scans": scans}
+
+
+def _sqlite_table_rows(table: str, connection: Connection) -> int:
+    try:
+        # MAX(rowid) is answered from the b-tree without a scan.
+        return connection.execute(text(f'SELECT MAX(rowid) FROM "{table}"')).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return 0
+
+
+def _sqlite_plan(query: str, steps: list, connection: Connection) -> dict:
+    aliases = table_references(query)
+    known_tables = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+    examined, loops, scans = 0, 1, []
+    for step in steps:
+        match = re.match(r"(SCAN|SEARCH)\s+(?:TABLE\s+)?(\S+)(.*)", step)
+        if not match:
+            continue
+        operation, table, detail = match.group(1), aliases.get(match.group(2), match.group(2)), match.group(3)
+        if table not in known_tables:
+            # Subqueries, CTEs and views materialized by SQLite.
+            continue
+        if operation == "SCAN":
+            estimate = _sqlite_table_rows(table, connection)
+        elif "PRIMARY KEY" in detail:
+            estimate = 1
+        else:
+            estimate = SQLITE_SEARCH_ROWS
+        index = re.search(r"USING (?:COVERING )?INDEX (\S+)", detail)
+        scans.append({
+            "table": table,
+            "rows": estimate,
+            "index": index.group(1) if index else None,
+            "full_scan": operation == "SCAN" and index is None,
+        })
+        # Each step of the join loop runs once per row of the steps before it.
+        examined += loops * estimate
+        loops *= max(estimate, 1)
+    return {"examined": examined, "returned": loops if scans else 0, "cost": None, "scans": scans}
+
+
+def explain(query: str, connection: Connection) -> dict:
+    """
+    Runs the dialect's EXPLAIN for a query without executing it.
+
+    Parameters:
+        - query (str): The SQL query.
+        - connection (Connection): Connection to the database.
+
+    Returns:
+        - dict: {"examined": estimated rows read by all scans, "returned": estimated rows the
+                 query returns, "cost": planner cost (None on SQLite),
+                 "scans": [{"table", "rows" read per scan, "index", "full_scan"}], "plan": the raw plan}
+
+    Notes:
+        Rows examined count every scan once per row of the join loop driving it, on every dialect.
+        PostgreSQL returns the planner's output estimate. MySQL and SQLite don't estimate grouping,
+        so their "returned" is the join output (an upper bound for GROUP BY), 1 for an aggregate
+        without GROUP BY, and capped by an outer LIMIT. SQLite has no cost model in EXPLAIN QUERY
+        PLAN, so it assumes full scans read the whole table and searches SQLITE_SEARCH_ROWS rows.
+    """
+    query = query.strip().rstrip(";")
+    dialect = connection.engine.dialect.name
+
+    if dialect == "mysql":
+        raw = connection.execute(text(f"EXPLAIN FORMAT=JSON {query}")).scalar()
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        summary = _mysql_plan(plan)
+    elif dialect == "postgresql":
+        raw = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}")).scalar()
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        summary = _postgres_plan(plan, connection)
+    elif dialect == "sqlite":
+        plan = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}"))]
+        summary = _sqlite_plan(query, plan, connection)
+    else:
+        raise NotImplementedError(f"explain() is not implemented for {dialect}.")
+
+    if dialect != "postgresql":
+        outer = _outer_level(query)
+        if _aggregates_to_one_row(outer):
+            summary["returned"] = min(summary["returned"], 1)
+        limit = re.search(r"\blimit\s+(\d+)\s*$", outer, flags=re.IGNORECASE)
+        if limit:
+            summary["returned"] = min(summary["returned"], int(limit.group(1)))
+    summary["plan"] = plan
+    return summary
+
+
+def over_budget(plan: dict, max_rows: int = None, max_cost: float = None) -> list:
+    """
+    Returns the reasons a plan is over budget. Empty if it's within budget.
+    `max_rows` bounds the rows examined, so it means the same on every dialect.
+    """
+    reasons = []
+    if max_rows is not None and plan["examined"] is not None and plan["examined"] > max_rows:
+        reasons.append(f"estimated rows examined {math.ceil(plan['examined'])} > max_rows {max_rows}")
+    if max_cost is not None and plan["cost"] is not None and plan["cost"] > max_cost:
+        reasons.append(f"estimated cost {plan['cost']} > max_cost {max_cost}")
+    return reasons
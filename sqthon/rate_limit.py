@@ -0,0 +1,86 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+
+    The bucket holds up to `capacity` tokens and refills continuously at `capacity / period`
+    tokens per second. Callers block in `acquire` until enough tokens are available.
+
+    Attributes:
+        capacity (float): Maximum number of tokens the bucket can hold.
+        period (float): Seconds needed to refill an empty bucket.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0.")
+        self.capacity = float(capacity)
+        self.period = period
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Blocks until `amount` tokens are available and takes them.
+
+        Requests bigger than the capacity are clamped to the capacity, so they wait for a
+        full bucket instead of waiting forever.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def consume(self, amount: float):
+        """Takes tokens without waiting. The balance may go negative and is paid back by later refills."""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for LLM calls.
+
+    Parameters:
+        rpm (int, optional): Allowed requests per minute.
+        tpm (int, optional): Allowed tokens per minute.
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Waits for one request slot and `tokens` prompt tokens. Returns the seconds spent waiting."""
+        waited = 0.0
+        if self.requests:
+            waited += self.requests.acquire(1)
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens)
+        return waited
+
+    def record(self, tokens: int):
+        """Charges tokens that were only known after the call (e.g. completion tokens)."""
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
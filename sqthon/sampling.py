@@ -0,0 +1,305 @@
+import random
+import re
+import warnings
+import pandas as pd
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.exc import OperationalError
+from typing import Literal, Optional
+from sqthon.query_plan import _SQL_KEYWORDS as _KEYWORDS
+
+
+# Key ranges a rowid/primary key sample is spread over.
+SAMPLE_BLOCKS = 16
+
+
+def _name(identifier: str) -> str:
+    return identifier.replace("`", "").replace('"', "").split(".")[-1]
+
+
+def table_stats(table: str, connection: Connection) -> dict:
+    """
+    Row count and size of a table from the catalog, without scanning it.
+
+    Returns:
+        - dict: {"rows": estimated rows, "bytes": size on disk or None, "source": where rows came from}
+
+    Notes:
+        PostgreSQL's reltuples and MySQL's TABLE_ROWS are estimates kept by ANALYZE/InnoDB.
+        SQLite reads sqlite_stat1 (written by ANALYZE) and otherwise the rowid span.
+    """
+    dialect = connection.engine.dialect.name
+    if dialect == "postgresql":
+        row = connection.execute(text(
+            "SELECT c.reltuples, pg_total_relation_size(c.oid) FROM pg_class c WHERE c.oid = to_regclass(:t)"
+        ), {"t": table}).first()
+        if row is None:
+            raise ValueError(f"Table {table} does not exist.")
+        # reltuples is -1 until the table is vacuumed or analyzed for the first time.
+        rows = int(row[0]) if row[0] is not None and row[0] >= 0 else None
+        return {"rows": rows, "bytes": row[1], "source": "pg_class.reltuples"}
+
+    if dialect == "mysql":
+        row = connection.execute(text(
+            "SELECT TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t"
+        ), {"t": table}).first()
+        if row is None:
+            raise ValueError(f"Table {table} does not exist.")
+        return {"rows": row[0], "bytes": row[1], "source": "information_schema.TABLES"}
+
+    if dialect == "sqlite":
+        rows, source = None, None
+        try:
+            stat = connection.execute(text(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = :t ORDER BY idx IS NOT NULL LIMIT 1"
+            ), {"t": table}).scalar()
+            if stat:
+                rows, source = int(stat.split()[0]), "sqlite_stat1"
+        except OperationalError:
+            pass  # No sqlite_stat1 before the first ANALYZE.
+        if rows is None:
+            bounds = key_bounds(table, "rowid", connection)
+            rows = bounds[1] - bounds[0] + 1 if bounds else 0
+            source = "rowid"
+        try:
+            size = connection.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :t"), {"t": table}).scalar()
+        except OperationalError:
+            size = None  # SQLite built without the dbstat table.
+        return {"rows": rows, "bytes": size, "source": source}
+
+    raise NotImplementedError(f"table_stats() is not implemented for {dialect}.")
+
+
+def sample_key(table: str, connection: Connection) -> Optional[str]:
+    """The integer key a table's rows can be range-sampled on: rowid on SQLite, else a one-column integer primary key."""
+    if connection.engine.dialect.name == "sqlite":
+        return "rowid"
+    inspector = inspect(connection)
+    key = inspector.get_pk_constraint(table)["constrained_columns"]
+    if len(key) != 1:
+        return None
+    column = next(c for c in inspector.get_columns(table) if c["name"] == key[0])
+    try:
+        return key[0] if column["type"].python_type is int else None
+    except NotImplementedError:
+        return None
+
+
+def key_bounds(table: str, key: str, connection: Connection) -> Optional[tuple]:
+    """MIN and MAX of an indexed key, each answered from the index."""
+    quote = connection.engine.dialect.identifier_preparer.quote
+    column = key if key == "rowid" else quote(key)
+    low = connection.execute(text(f"SELECT MIN({column}) FROM {quote(table)}")).scalar()
+    high = connection.execute(text(f"SELECT MAX({column}) FROM {quote(table)}")).scalar()
+    return None if low is None else (low, high)
+
+
+def key_ranges(low: int, high: int, fraction: float, seed: int = 0, blocks: int = SAMPLE_BLOCKS) -> list:
+    """
+    Key ranges covering `fraction` of [low, high]: the keys are split into `blocks` equal strata
+    and each gets one range at a seeded random offset. Each range is one index range scan.
+    """
+    rng = random.Random(seed)
+    span = high - low + 1
+    total = max(round(span * fraction), 1)
+    blocks = min(blocks, total)
+    width, extra = divmod(total, blocks)
+    ranges = []
+    for i in range(blocks):
+        start, end = low + span * i // blocks, low + span * (i + 1) // blocks - 1
+        size = min(width + (i < extra), end - start + 1)
+        offset = start + rng.randint(0, end - start + 1 - size)
+        ranges.append((offset, offset + size - 1))
+    return ranges
+
+
+def sample_query(table: str, connection: Connection, fraction: float = None, rows: int = None, seed: int = 0,
+                 method: Literal["system", "bernoulli"] = "system", stats: dict = None) -> str:
+    """
+    A SELECT * over a sample of a table that doesn't scan the whole table.
+
+    Parameters:
+        - table (str): Table name.
+        - connection (Connection): Connection to the database.
+        - fraction (float, optional): Share of rows to sample, e.g. 0.01.
+        - rows (int, optional): Approximate number of rows to sample instead of a fraction.
+        - seed (int): The same seed returns the same sample while the table doesn't change.
+        - method (str): PostgreSQL TABLESAMPLE method. "system" reads whole pages, "bernoulli"
+          picks single rows (less clustered, but reads every page).
+        - stats (dict, optional): `table_stats` result, if already fetched.
+
+    Notes:
+        PostgreSQL uses TABLESAMPLE ... REPEATABLE (seed). SQLite and MySQL read seeded rowid/primary
+        key ranges, so rows are sampled in runs of neighbouring keys. MySQL tables without an integer
+        key are read whole, keeping each row with probability `fraction` (RAND(seed)), with a warning.
+        If `rows` is given but the catalog has no row count for the table, the whole table is sorted
+        in random order (ORDER BY random() LIMIT rows; RAND(seed) on MySQL), with a warning.
+    """
+    if (fraction is None) == (rows is None):
+        raise ValueError("Pass either fraction or rows.")
+    if fraction is not None and not 0 < fraction <= 1:
+        raise ValueError(f"fraction must be in (0, 1], got {fraction}.")
+    if method not in ("system", "bernoulli"):
+        raise ValueError(f"Invalid method: {method}. Expected 'system' or 'bernoulli'.")
+
+    dialect = connection.engine.dialect.name
+    quote = connection.engine.dialect.identifier_preparer.quote
+    source = quote(table)
+    if rows is not None:
+        total = (stats or table_stats(table, connection))["rows"]
+        if not total:
+            # No estimate (e.g. reltuples before the first ANALYZE): shuffle instead of reading the head.
+            warnings.warn(f"{table} has no row count estimate (run ANALYZE), so the sample sorts the whole "
+                          f"table in random order.", stacklevel=2)
+            shuffle = f"RAND({int(seed)})" if dialect == "mysql" else "random()"
+            return f"SELECT * FROM {source} ORDER BY {shuffle} LIMIT {rows}"
+        fraction = min(rows / total, 1.0)
+    limit = f" LIMIT {rows}" if rows is not None else ""
+
+    if fraction >= 1:
+        return f"SELECT * FROM {source}{limit}"
+
+    if dialect == "postgresql":
+        return (f"SELECT * FROM {source} TABLESAMPLE {method.upper()} ({fraction * 100:.6f}) "
+                f"REPEATABLE ({seed}){limit}")
+
+    key = sample_key(table, connection)
+    if key is None:
+        if dialect != "mysql":
+            raise NotImplementedError(f"Sampling is not implemented for {dialect} tables without an integer key.")
+        warnings.warn(f"{table} has no integer primary key to sample ranges of, so the sample reads the "
+                      f"whole table.", stacklevel=2)
+        return f"SELECT * FROM {source} WHERE RAND({int(seed)}) < {fraction}{limit}"
+    bounds = key_bounds(table, key, connection)
+    if bounds is None:
+        return f"SELECT * FROM {source}{limit}"
+    column = key if key == "rowid" else quote(key)
+    ranges = " OR ".join(f"{column} BETWEEN {a} AND {b}" for a, b in key_ranges(*bounds, fraction, seed))
+    return f"SELECT * FROM {source} WHERE {ranges}{limit}"
+
+
+def approx_distinct(values: pd.Series, total_rows: int) -> int:
+    """
+    Estimates the distinct values of a column from a sample with the Duj1 estimator
+    (Haas et al., also used by PostgreSQL's ANALYZE): n * d / (n - f1 + f1 * n / N), where d is
+    the distinct values in the sample and f1 the values seen exactly once.
+    """
+    counts = values.dropna().value_counts()
+    sample_rows, distinct = len(values), len(counts)
+    if not sample_rows or not total_rows or total_rows <= sample_rows:
+        return int(distinct)
+    once = int((counts == 1).sum())
+    estimate = sample_rows * distinct / (sample_rows - once + once * sample_rows / total_rows)
+    return int(min(max(round(estimate), distinct), total_rows))
+
+
+def _bound(values: pd.Series, how: str):
+    try:
+        return getattr(values.dropna(), how)()
+    except TypeError:
+        return None  # Mixed or unorderable values.
+
+
+def describe(table: str, connection: Connection, sample_rows: int = 10_000, seed: int = 0) -> dict:
+    """
+    Profiles a table from catalog statistics and a sample.
+
+    Returns:
+        - dict: {"table", "rows", "bytes", "rows_source", "sample_rows",
+                 "columns": DataFrame of column, dtype, null_fraction, distinct, min, max}
+
+    Notes:
+        null_fraction, distinct, min and max are computed on the sample, so they are
+        approximations. min and max are the sample's, not the table's.
+    """
+    stats = table_stats(table, connection)
+    sample = pd.read_sql_query(
+        text(sample_query(table, connection, rows=sample_rows, seed=seed, stats=stats)), connection
+    )
+    total = max(stats["rows"] or 0, len(sample))
+    columns = pd.DataFrame([
+        {
+            "column": name,
+            "dtype": str(sample[name].dtype),
+            "null_fraction": float(sample[name].isna().mean()) if len(sample) else None,
+            "distinct": approx_distinct(sample[name], total),
+            "min": _bound(sample[name], "min"),
+            "max": _bound(sample[name], "max"),
+        }
+        for name in sample.columns
+    ])
+    return {
+        "table": table,
+        "rows": stats["rows"],
+        "bytes": stats["bytes"],
+        "rows_source": stats["source"],
+        "sample_rows": len(sample),
+        "columns": columns,
+    }
+
+
+# Words that can follow a table name without being its alias.
+_NOT_ALIASES = _KEYWORDS | {"from", "select", "and", "or", "not", "indexed", "use", "force", "ignore",
+                            "tablesample", "for", "lateral", "returning", "set", "values"}
+
+_TABLE_REFERENCE = re.compile(
+    rf"(\bfrom\b|\bjoin\b|,)(\s*)([`\"\w.]+)(?:\s+(?:as\s+)?(?!(?:{'|'.join(_NOT_ALIASES)})\b)([`\"\w]+))?"
+    rf"(\s+(?:indexed\s+by|not\s+indexed|(?:use|force|ignore)\s+(?:index|key)))?",
+    flags=re.IGNORECASE,
+)
+_CLAUSE_END = re.compile(r"(?:where|group|order|limit|having|union|except|intersect|window)\b", flags=re.IGNORECASE)
+
+
+def _from_list_commas(query: str) -> set:
+    """Positions of the commas separating the tables of FROM clauses (not those of select lists or calls)."""
+    commas = set()
+    for match in re.finditer(r"\bfrom\b", query, flags=re.IGNORECASE):
+        depth = 0
+        for position in range(match.end(), len(query)):
+            char = query[position]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth < 0:
+                    break
+            elif depth == 0:
+                previous = query[position - 1]
+                if char == ";" or (not (previous.isalnum() or previous in "_`\"") and _CLAUSE_END.match(query, position)):
+                    break
+                if char == ",":
+                    commas.add(position)
+    return commas
+
+
+def sample_tables(query: str, connection: Connection, fraction: float, seed: int = 0,
+                  method: Literal["system", "bernoulli"] = "system") -> str:
+    """
+    Rewrites a query so every base table in its FROM clauses (comma-separated lists included)
+    and JOIN clauses is read through `sample_query`. The table's name (or alias) stays the same,
+    so the rest of the query is untouched.
+
+    Raises:
+        - ValueError: If a sampled table has an index hint (INDEXED BY, USE/FORCE/IGNORE INDEX),
+          which can't apply to the sampled subquery.
+
+    Notes:
+        CTEs, subqueries and table-valued functions are left alone. Joining two sampled tables
+        keeps roughly fraction² of the matching pairs, so sample the larger side only when
+        that matters, with `sample_query` in a hand-written query.
+    """
+    known = set(inspect(connection).get_table_names())
+    quote = connection.engine.dialect.identifier_preparer.quote
+    commas = _from_list_commas(query)
+
+    def rewrite(match):
+        keyword, space, table, alias, hint = match.groups()
+        name = _name(table)
+        if name not in known or (keyword == "," and match.start() not in commas):
+            return match.group(0)
+        if hint:
+            raise ValueError(f"Can't sample {name}: its index hint ({hint.strip()}) doesn't apply to a sampled subquery.")
+        sampled = sample_query(name, connection, fraction=fraction, seed=seed, method=method)
+        return f"{keyword}{space or ' '}({sampled}) AS {alias or quote(name)}"
+
+    return _TABLE_REFERENCE.sub(rewrite, query)
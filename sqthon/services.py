@@ -3,9 +3,6 @@ from requests.exceptions import RequestException
 import subprocess
 import os
 import traceback
-import win32event, win32process
-from win32com.shell.shell import ShellExecuteEx
-import win32com.shell.shellcon as shellcon
 
 
 def is_admin():
@@ -20,6 +17,11 @@ def is_admin():
 
 
 def _runAsAdmin(service: str, action: str):
+    # pywin32 only exists on Windows.
+    import win32event, win32process
+    from win32com.shell.shell import ShellExecuteEx
+    import win32com.shell.shellcon as shellcon
+
     cmd = "net"
     params = f"{action} {service}"
     execute_cmd = ShellExecuteEx(
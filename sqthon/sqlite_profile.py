@@ -0,0 +1,109 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from typing import Literal
+from sqthon.pool import GaugedQueuePool
+
+
+PROFILES = {
+    # SQLite's own defaults: rollback journal, 2 MB page cache, no mmap, synchronous=FULL.
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+    },
+    # temp_store=MEMORY and a large cache_size let SQLite's sorter work in memory, which made
+    # GROUP BY over 1M rows 1.5-3x slower than spilling sorted runs (benchmarks/bench_sqlite_profile.py).
+    # Worth it for temp-table heavy work.
+    "memory_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        "cache_size": -64 * 1024,  # Negative means KiB: 64 MB per connection.
+    },
+}
+
+SqliteMode = Literal["rw", "ro", "memory"]
+
+
+def pragmas(profile: str | dict, mode: SqliteMode = "rw") -> dict:
+    """
+    The PRAGMAs run on every new connection for a profile name (see PROFILES) or a dict of PRAGMAs.
+    Read-only and in-memory databases can't switch to WAL, so journal_mode is dropped for them,
+    and read-only connections also get query_only.
+    """
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Invalid SQLite profile: {profile}. Expected one of {list(PROFILES)} or a dict.")
+        profile = PROFILES[profile]
+    settings = dict(profile)
+    if mode in ("ro", "memory"):
+        settings.pop("journal_mode", None)
+    if mode == "ro":
+        settings["query_only"] = 1
+    return settings
+
+
+def sqlite_url(database: str, mode: SqliteMode = "rw") -> str:
+    """
+    - "rw": the database file, created if missing.
+    - "ro": the database file opened read-only (mode=ro), for many concurrent readers.
+    - "memory": an in-memory database shared by all connections of the engine (cache=shared).
+      `database` is its name, and it's gone once the engine is disposed.
+    """
+    if mode == "rw":
+        return f"sqlite:///{database}"
+    if mode == "ro":
+        return f"sqlite:///file:{database}?mode=ro&uri=true"
+    if mode == "memory":
+        return f"sqlite:///file:{database}?mode=memory&cache=shared&uri=true"
+    raise ValueError(f"Invalid SQLite mode: {mode}. Expected 'rw', 'ro' or 'memory'.")
+
+
+def apply_pragmas(engine: Engine, settings: dict) -> Engine:
+    """Runs the PRAGMAs on every new DBAPI connection of the engine."""
+    if not settings:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in settings.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_sqlite_engine(database: str, profile: str | dict = "default", mode: SqliteMode = "rw",
+                         pool_size: int = 5, max_overflow: int = 10, **pool_options) -> Engine:
+    """
+    Creates a SQLite engine with a PRAGMA profile.
+
+    Parameters:
+        - database (str): Path of the database file, or the name of the in-memory database.
+        - profile (str | dict): A name in PROFILES or a dict of PRAGMAs.
+        - mode (str): "rw", "ro" or "memory". See `sqlite_url`.
+        - pool_size (int): Connections kept open, shared between threads.
+        - max_overflow (int): Extra connections allowed under load.
+        - **pool_options: More pool settings for create_engine (pool_timeout, pool_pre_ping, ...).
+
+    Notes:
+        Connections to a shared-cache in-memory database lock whole tables, so a reader waits for
+        (or fails on) a table another connection is writing. Load the data first, then read.
+    """
+    # Explicit, since SQLAlchemy gives a URI with mode=memory a connection-per-thread pool.
+    engine = create_engine(
+        sqlite_url(database, mode),
+        poolclass=GaugedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={"check_same_thread": False},
+        **pool_options,
+    )
+    return apply_pragmas(engine, pragmas(profile, mode))
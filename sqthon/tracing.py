@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import time
+from typing import Callable
+
+
+class Span:
+    """
+    A timed operation. Attributes can be added while it runs with `set`.
+
+    Attributes:
+        name (str): Operation name, e.g. "sqthon.execute".
+        attributes (dict): Database, dialect, rows, bytes, ...
+        start / end (float): time.perf_counter() timestamps. Pass `start` for an operation that
+            began before the span could be opened.
+        error (BaseException | None): The exception the operation raised, if any.
+        parent (Span | None): The enclosing span in the same thread.
+    """
+
+    __slots__ = ("name", "attributes", "start", "end", "error", "parent", "_token", "_backend")
+
+    def __init__(self, name: str, attributes: dict, start: float = None):
+        self.name = name
+        self.attributes = attributes
+        self.start = start
+        self.end = None
+        self.error = None
+        self.parent = None
+        self._token = None
+        self._backend = None
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self._token = _current.set(self)
+        if self.start is None:
+            self.start = time.perf_counter()
+        for tracer in _tracers:
+            tracer.on_start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        self.error = exc
+        _current.reset(self._token)
+        for tracer in _tracers:
+            tracer.on_end(self)
+        return False
+
+
+class _NoopSpan:
+    """Returned by `span` while no tracer is registered, so disabled tracing costs one check."""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class Tracer:
+    """Receives spans. Subclass it and override `on_start` and/or `on_end`."""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+
+class CallbackTracer(Tracer):
+    """Calls `callback(span)` when a span ends."""
+
+    def __init__(self, callback: Callable[[Span], None]):
+        self.callback = callback
+
+    def on_end(self, span: Span):
+        self.callback(span)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Forwards spans to OpenTelemetry. Requires the opentelemetry-api package.
+
+    Parameters:
+        tracer (opentelemetry.trace.Tracer, optional): Defaults to the global provider's "sqthon" tracer.
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OpenTelemetryTracer needs opentelemetry-api: pip install opentelemetry-api")
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("sqthon")
+
+    @staticmethod
+    def _attributes(attributes: dict) -> dict:
+        return {
+            key: value if isinstance(value, (str, bool, int, float)) else str(value)
+            for key, value in attributes.items() if value is not None
+        }
+
+    def on_start(self, span: Span):
+        parent = span.parent._backend if span.parent is not None else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        # Spans may start in the past (see Span's `start`); OpenTelemetry wants epoch nanoseconds.
+        start_time = time.time_ns() - int((time.perf_counter() - span.start) * 1e9)
+        span._backend = self.tracer.start_span(span.name, context=context, start_time=start_time,
+                                               attributes=self._attributes(span.attributes))
+
+    def on_end(self, span: Span):
+        otel_span = span._backend
+        if otel_span is None:
+            return
+        otel_span.set_attributes(self._attributes(span.attributes))
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(span.error)))
+        otel_span.end()
+
+
+_tracers = []
+_current = contextvars.ContextVar("sqthon_span", default=None)
+_NOOP = _NoopSpan()
+
+
+def add_tracer(tracer) -> Tracer:
+    """Registers a Tracer, or a callable that receives every finished span. Returns the tracer."""
+    if not isinstance(tracer, Tracer):
+        tracer = CallbackTracer(tracer)
+    _tracers.append(tracer)
+    return tracer
+
+
+def remove_tracer(tracer: Tracer):
+    if tracer in _tracers:
+        _tracers.remove(tracer)
+
+
+def enabled() -> bool:
+    return bool(_tracers)
+
+
+def span(name: str, **attributes):
+    """
+    Context manager timing an operation:
+
+        with span("sqthon.run_query", database="sales") as s:
+            ...
+            s.set(rows=len(df))
+    """
+    if not _tracers:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def traced(name: str, attributes: Callable[..., dict] = None):
+    """
+    Decorator wrapping every call of a function in a span. `attributes` receives the call's
+    arguments and returns the span attributes.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _tracers:
+                return fn(*args, **kwargs)
+            with Span(name, attributes(*args, **kwargs) if attributes else {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine):
+    """
+    Adds spans for connection checkouts ("sqthon.checkout") and statement execution
+    ("sqthon.execute") of an engine. The listeners return at once while tracing is disabled.
+
+    SQLAlchemy's checkout event fires once a connection is handed out, so checkout spans start
+    when the pool started waiting (GaugedQueuePool) or opening a connection. Pools that record
+    neither get no checkout span rather than one that always reads ~0 s.
+    """
+    from sqlalchemy import event
+
+    attributes = {"dialect": engine.dialect.name, "database": engine.url.database}
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        if not _tracers:
+            return
+        connected = connection_record.info.pop("sqthon_connect_start", None)
+        checkout_started = getattr(engine.pool, "checkout_started", None)
+        waited = checkout_started() if checkout_started else None
+        start = waited if waited is not None else connected
+        if start is None:
+            return
+        with Span("sqthon.checkout", dict(attributes, checked_out=engine.pool.checkedout()), start=start) as s:
+            if connected is not None:
+                # A new DBAPI connection was opened for this checkout.
+                s.set(new_connection=True, connect_s=time.perf_counter() - connected)
+
+    @event.listens_for(engine, "do_connect")
+    def do_connect(dialect, connection_record, cargs, cparams):
+        if _tracers:
+            connection_record.info["sqthon_connect_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if not _tracers:
+            return
+        s = Span("sqthon.execute", dict(attributes, statement=statement[:1000], executemany=executemany))
+        conn.info.setdefault("sqthon_spans", []).append(s.__enter__())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("sqthon_spans")
+        if spans:
+            s = spans.pop()
+            s.set(rows=cursor.rowcount if cursor.rowcount >= 0 else None)
+            s.__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("sqthon_spans") if conn is not None else None
+        if spans:
+            error = exception_context.original_exception
+            spans.pop().__exit__(type(error), error, None)
+
+    return engine
@@ -5,8 +5,9 @@ from sqlalchemy import (
 )
 from sqlalchemy.exc import ResourceClosedError
 from typing import List
+from functools import lru_cache
 import json
-import tiktoken
+import re
 
 
 def map_dtype_to_sqlalchemy(dtype):
@@ -259,6 +260,67 @@ def make_dataframe_json_serializable(df: pd.DataFrame):
     return df.to_dict(orient="records")
 
 
+def _json_scalar(value):
+    """Converts numpy/pandas scalars to plain JSON values."""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def dataframe_preview(df: pd.DataFrame, max_rows: int = 20) -> dict:
+    """
+    Builds a JSON-serializable preview of a DataFrame.
+
+    Only the first `max_rows` rows are serialized. The rest of the frame is described by its row
+    count and vectorized per-column stats (nulls, and min/max for numeric and datetime columns),
+    so the cost stays flat no matter how many rows were fetched.
+
+    Parameters:
+        - df (pd.DataFrame): The result to preview.
+        - max_rows (int): Number of leading rows to include.
+
+    Returns:
+        - dict: {"row_count", "columns", "rows"}
+    """
+    nulls = df.isna().sum()
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        col_stats = {"dtype": str(series.dtype), "nulls": int(nulls[col])}
+        if (
+                pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        ) or pd.api.types.is_datetime64_any_dtype(series):
+            col_stats["min"] = _json_scalar(series.min())
+            col_stats["max"] = _json_scalar(series.max())
+        columns[str(col)] = col_stats
+
+    return {
+        "row_count": len(df),
+        "columns": columns,
+        "rows": make_dataframe_json_serializable(df.head(max_rows)),
+    }
+
+
+def limit_query(query: str, limit: int) -> str:
+    """
+    Wraps a SELECT (or WITH ... SELECT) query so the database returns at most `limit` rows.
+    Any other statement is returned unchanged.
+    """
+    stripped = query.strip().rstrip(";").strip()
+    if not re.match(r"(select|with)\b", stripped, flags=re.IGNORECASE):
+        return query
+    return f"SELECT * FROM ({stripped}) AS sqthon_limited LIMIT {int(limit)}"
+
+
+def derived_table(query: str, alias: str = "sqthon_src") -> str:
+    """The query as a derived table, `(query) AS alias`, to select from or filter."""
+    return f"({query.strip().rstrip(';')}) AS {alias}"
+
+
 def format_database_schema(db_schema: List):
     """
     Format database schema into a readable string representation
@@ -274,13 +336,30 @@ def format_database_schema(db_schema: List):
     )
 
 
-def num_tokens_from_messages(messages: List, model: str):
-    """Returns the number of tokens used by a list of messages."""
+class ApproximateEncoding:
+    """Stand-in for a tiktoken encoding when its BPE files can't be loaded (e.g. offline): ~4 characters per token."""
+
+    name = "approximate"
+
+    def encode(self, value: str) -> range:
+        return range((len(value) + 3) // 4)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """Returns the tiktoken encoding for the model. Cached, so the lookup happens once per model."""
+    import tiktoken
+
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         print("Warning: model not found. Using o200k_base encoding.")
-        encoding = tiktoken.get_encoding("o200k_base")
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=None)
+def token_settings(model: str) -> tuple:
+    """Returns (encoding, tokens_per_msg, tokens_per_name) for the model."""
     if model in {
         "gpt-3.5-turbo-0125",
         "gpt-4-0314",
@@ -290,42 +369,64 @@ def num_tokens_from_messages(messages: List, model: str):
         "gpt-4o-mini-2024-07-18",
         "gpt-4o-2024-08-06",
     }:
-        tokens_per_msg = 3
-        tokens_per_name = 1
+        return get_encoding(model), 3, 1
 
     elif "gpt-3.5-turbo" in model:
         print(
             "Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0125."
         )
-        return num_tokens_from_messages(messages, model="gpt-3.5-turbo-0125")
+        return token_settings("gpt-3.5-turbo-0125")
     elif "gpt-4o-mini" in model:
         print(
             "Warning: gpt-4o-mini may update over time. Returning num tokens assuming gpt-4o-mini-2024-07-18."
         )
-        return num_tokens_from_messages(
-            messages, model="gpt-4o-mini-2024-07-18"
-        )
+        return token_settings("gpt-4o-mini-2024-07-18")
     elif "gpt-4o" in model:
         print(
             "Warning: gpt-4o and gpt-4o-mini may update over time. Returning num tokens assuming gpt-4o-2024-08-06."
         )
-        return num_tokens_from_messages(messages, model="gpt-4o-2024-08-06")
+        return token_settings("gpt-4o-2024-08-06")
     elif "gpt-4" in model:
         print(
             "Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613."
         )
-        return num_tokens_from_messages(messages, model="gpt-4-0613")
+        return token_settings("gpt-4-0613")
     else:
         raise NotImplementedError(
             f"""num_tokens_from_messages() is not implemented for model {model}."""
         )
+
+
+def message_as_dict(msg) -> dict:
+    """Returns a chat message as a dict. Accepts dicts and OpenAI message objects."""
+    if isinstance(msg, dict):
+        return msg
+    if hasattr(msg, "model_dump"):
+        return msg.model_dump(exclude_none=True)
+    return vars(msg)
+
+
+def message_tokens(msg, encoding, tokens_per_msg: int = 3, tokens_per_name: int = 1) -> int:
+    """Returns the number of tokens used by a single message."""
+    num_tokens = tokens_per_msg
+    for key, value in message_as_dict(msg).items():
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            # tool_calls and other structured fields.
+            value = json.dumps(value, default=lambda o: getattr(o, "__dict__", str(o)))
+        num_tokens += len(encoding.encode(value))
+        if key == "name":
+            num_tokens += tokens_per_name
+    return num_tokens
+
+
+def num_tokens_from_messages(messages: List, model: str):
+    """Returns the number of tokens used by a list of messages."""
+    encoding, tokens_per_msg, tokens_per_name = token_settings(model)
     num_tokens = 0
     for msg in messages:
-        num_tokens += tokens_per_msg
-        for key, value in msg.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
+        num_tokens += message_tokens(msg, encoding, tokens_per_msg, tokens_per_name)
     num_tokens += 3  # every reply is  primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -359,11 +460,7 @@ def count_tokens_for_tools(functions: List, messages: List, model: str):
         raise NotImplementedError(
             f"""num_tokens_for_tools() is not implemented for model {model}."""
         )
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        print("Warning: model not found. Using o200k_base encoding.")
-        encoding = tiktoken.get_encoding("o200k_base")
+    encoding = get_encoding(model)
 
     func_token_count = 0
     if len(functions) > 0:
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import unittest
+
+
+HEAVY_MODULES = ["seaborn", "matplotlib", "openai", "tiktoken", "rich", "win32com"]
+
+
+def loaded_modules(statement: str) -> set:
+    """Runs a statement in a fresh interpreter and returns the heavy modules it imported."""
+    code = f"{statement}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_import_sqthon_is_lazy(self):
+        self.assertEqual(loaded_modules("import sqthon"), set())
+
+    def test_connect_loads_no_llm_or_plotting(self):
+        statement = (
+            "import os, tempfile\n"
+            "from sqthon import Sqthon\n"
+            "ctx = Sqthon(dialect='sqlite', user='', host='').connect_to_database("
+            "database=os.path.join(tempfile.mkdtemp(), 'test.db'))\n"
+            "ctx.run_query('SELECT 1 AS one')"
+        )
+        self.assertEqual(loaded_modules(statement), set())
+
+    def test_visualizer_loads_on_use(self):
+        self.assertIn("seaborn", loaded_modules("import sqthon\nsqthon.DataVisualizer"))
+
+
+if __name__ == "__main__":
+    unittest.main()
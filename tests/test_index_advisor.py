@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import text
+
+from sqthon import Sqthon
+from sqthon.index_advisor import is_plain_read, query_columns
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        self.ctx.connection.execute(text(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, status TEXT, created_at TEXT)"
+        ))
+        self.ctx.connection.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)"))
+        self.ctx.connection.execute(
+            text("INSERT INTO orders (customer_id, status, created_at) VALUES (:c, :s, :d)"),
+            [{"c": i % 100, "s": "open" if i % 7 else "closed", "d": f"2024-01-{i % 28 + 1:02d}"} for i in range(5000)],
+        )
+        self.ctx.connection.commit()
+
+    def test_query_columns(self):
+        columns = {"orders": {"id", "customer_id", "status", "created_at"}, "customers": {"id", "name"}}
+        usage = query_columns(
+            "SELECT c.name FROM orders o JOIN customers c ON o.customer_id = c.id "
+            "WHERE o.status = 'a = b' AND created_at >= '2024-01-01' ORDER BY o.created_at DESC",
+            columns,
+        )
+        self.assertEqual(usage["orders"], {
+            "equality": ["status"], "range": ["created_at"], "join": ["customer_id"], "order": ["created_at"],
+        })
+        self.assertEqual(usage["customers"]["join"], ["id"])
+
+    def test_only_plain_reads_are_replayed(self):
+        self.assertTrue(is_plain_read("WITH r AS (SELECT * FROM orders) SELECT REPLACE(status, 'a', 'b') FROM r"))
+        self.assertTrue(is_plain_read("SELECT * FROM orders WHERE note = 'delete me'"))
+        self.assertFalse(is_plain_read("WITH d AS (DELETE FROM orders RETURNING *) SELECT * FROM d"))
+        self.assertFalse(is_plain_read("SELECT * INTO backup FROM orders"))
+        self.assertFalse(is_plain_read("SELECT * FROM orders FOR UPDATE"))
+        self.assertFalse(is_plain_read("SELECT 1; DROP TABLE orders"))
+
+    def test_advise_from_query_log_and_apply(self):
+        query = "SELECT * FROM orders WHERE status = 'closed' AND created_at > '2024-01-20'"
+        for _ in range(3):
+            self.ctx.run_query(query)
+        self.ctx.run_query("SELECT * FROM orders WHERE id = 3")
+
+        proposals = self.ctx.advise_indexes()
+        self.assertEqual(len(proposals), 1)
+        proposal = proposals[0]
+        self.assertEqual(proposal["columns"], ["status", "created_at"])
+        self.assertEqual(proposal["executions"], 3)
+        self.assertEqual(proposal["benefit"], 3 * 5000)
+        self.assertEqual(proposal["statement"],
+                         'CREATE INDEX ix_orders_status_created_at ON orders (status, created_at)')
+
+        applied = self.ctx.advise_indexes(apply=True, repeat=1)[0]
+        self.assertIsNone(applied["error"])
+        self.assertEqual(applied["full_scans_after"], 0)
+        self.assertIn(query, applied["after_s"])
+        self.assertEqual(self.ctx.advise_indexes(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
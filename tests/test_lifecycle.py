@@ -0,0 +1,53 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+from sqlalchemy import create_engine
+
+from sqthon.connection import DatabaseConnector
+from sqthon.exception import ServiceConnectionError
+from sqthon.lifecycle import LocalBackend, SystemdBackend, default_backend, is_reachable, wait_until_ready
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestLifecycle(unittest.TestCase):
+    def test_ready_sqlite(self):
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+        self.assertLess(wait_until_ready(engine, timeout=1), 1)
+
+    def test_deadline_when_server_never_comes_up(self):
+        engine = create_engine(f"mysql+pymysql://user:pw@127.0.0.1:{free_port()}/db")
+        start = time.monotonic()
+        with self.assertRaises(ServiceConnectionError) as error:
+            wait_until_ready(engine, timeout=0.3)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertIn("not accepting connections", str(error.exception))
+
+    def test_connect_starts_backend_without_prompting(self):
+        os.environ["lifecycle_userpassword"] = "pw"
+        backend = LocalBackend()
+        connector = DatabaseConnector("mysql", "lifecycle_user", "127.0.0.1", lifecycle=backend, ready_timeout=0.3)
+        engine = connector._create_engine("db", False, 1, 0)
+        if is_reachable(engine):
+            self.skipTest("A MySQL server is listening on 127.0.0.1:3306.")
+
+        with self.assertRaises(ServiceConnectionError):
+            connector.connect("db", local_infile=False)
+        self.assertEqual(backend.starts, 1)
+
+    def test_no_default_backend_for_remote_hosts(self):
+        self.assertIsNone(default_backend("mysql", "mysql", host="db.example.com"))
+        self.assertIsNone(default_backend("postgresql", host="10.0.0.5"))
+        self.assertEqual(SystemdBackend("mysql", sudo=True)._command("start", "mysql"),
+                         ["sudo", "-n", "systemctl", "--no-ask-password", "start", "mysql"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from sqthon import Sqthon
+from sqthon.providers import OpenAIProvider
+from sqthon.rate_limit import TokenBucket
+from sqthon.util import ApproximateEncoding
+
+
+class FakeCompletions:
+    """Answers every question with `SELECT COUNT(*) AS n FROM items` and echoes the tool result."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, temperature, tools=None, tool_choice=None):
+        self.calls += 1
+        last = messages[-1]
+        if tools and last["role"] == "user":
+            tool_call = SimpleNamespace(
+                id=f"call_{self.calls}",
+                type="function",
+                function=SimpleNamespace(
+                    name="ask_db",
+                    arguments=json.dumps({"query": f"SELECT COUNT(*) AS n, '{last['content']}' AS q FROM items"}),
+                ),
+            )
+            message = SimpleNamespace(role="assistant", content=None, tool_calls=[tool_call])
+        else:
+            message = SimpleNamespace(role="assistant", content=last["content"], tool_calls=None)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class MultiCallCompletions(FakeCompletions):
+    """Asks three questions in a single turn."""
+
+    def create(self, model, messages, temperature, tools=None, tool_choice=None):
+        self.calls += 1
+        if tools:
+            tool_calls = [
+                SimpleNamespace(
+                    id=f"call_{i}",
+                    type="function",
+                    function=SimpleNamespace(name="ask_db", arguments=json.dumps({"query": f"SELECT {i} AS n"})),
+                )
+                for i in range(3)
+            ]
+            message = SimpleNamespace(role="assistant", content=None, tool_calls=tool_calls)
+        else:
+            tool_results = [m["content"] for m in messages if isinstance(m, dict) and m["role"] == "tool"]
+            message = SimpleNamespace(role="assistant", content=" ".join(tool_results), tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def fake_provider(completions) -> OpenAIProvider:
+    return OpenAIProvider(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+
+def make_context(rows: int = 3):
+    """Creates a SQLite database with an `items` table and a context with a fake LLM client."""
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    path = os.path.join(tempfile.mkdtemp(), "test.db")
+    sq = Sqthon(dialect="sqlite", user="", host="")
+    ctx = sq.connect_to_database(database=path, use_llm=True, model="gpt-4o-mini")
+    ctx.connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    for i in range(rows):
+        ctx.connection.execute(text("INSERT INTO items (name) VALUES (:name)"), {"name": f"item{i}"})
+    ctx.connection.commit()
+    ctx.llm.provider = fake_provider(FakeCompletions())
+    ctx.llm._tokenizer = (ApproximateEncoding(), 3, 1)
+    return ctx
+
+
+class TestLLM(unittest.TestCase):
+    def setUp(self):
+        self.ctx = make_context()
+
+    def test_ask_many_returns_results_in_order(self):
+        prompts = [f"question {i}" for i in range(8)]
+        results = self.ctx.ask_many(prompts, concurrency=4, as_df=True)
+
+        self.assertEqual([df.iloc[0]["q"] for df in results], prompts)
+        self.assertTrue(all(df.iloc[0]["n"] == 3 for df in results))
+        # The shared conversation is left untouched.
+        self.assertEqual(len(self.ctx.llm.messages), 1)
+
+    def test_ask_many_rate_limiter_is_scoped_to_the_batch(self):
+        self.ctx.ask_many(["question"], rpm=6000, tpm=1_000_000)
+
+        self.assertIsNone(self.ctx.llm.rate_limiter)
+
+    def test_rate_limiter_counts_the_tool_definitions(self):
+        acquired = []
+        self.ctx.llm.rate_limiter = SimpleNamespace(acquire=acquired.append, record=lambda tokens: None)
+
+        self.ctx.llm.answer("how many items?")
+
+        llm = self.ctx.llm
+        self.assertGreater(acquired[0], llm.tool_schema_tokens() + llm.count_tokens(llm.messages[0]))
+
+    def test_token_counts_are_cached_by_content(self):
+        llm = self.ctx.llm
+        llm.count_tokens(llm.messages[0])
+        cached = len(llm._token_counts)
+
+        llm.count_tokens(llm.new_conversation()[0])
+
+        self.assertEqual(len(llm._token_counts), cached)
+
+    def test_all_tool_calls_of_a_turn_are_answered(self):
+        completions = MultiCallCompletions()
+        self.ctx.llm.provider = fake_provider(completions)
+
+        content, _ = self.ctx.llm.answer("three questions")
+
+        self.assertEqual(completions.calls, 2)
+        self.assertEqual(content, '[{"n": 0}] [{"n": 1}] [{"n": 2}]')
+
+    def test_tool_calls_share_the_callers_connection(self):
+        self.ctx.llm.provider = fake_provider(MultiCallCompletions())
+        with self.ctx.connection.engine.connect() as connection:
+            checkouts = self.ctx.pool_stats()["checkouts"]
+
+            content, _ = self.ctx.llm.answer("three questions", connection=connection)
+
+            self.assertEqual(self.ctx.pool_stats()["checkouts"], checkouts)
+        self.assertEqual(content, '[{"n": 0}] [{"n": 1}] [{"n": 2}]')
+
+    def test_stats_are_recorded_per_ask(self):
+        records = []
+        self.ctx.llm.on_stats(records.append)
+
+        self.ctx.llm.answer("how many items?")
+
+        stats = self.ctx.llm.stats()
+        self.assertEqual(len(stats), 1)
+        row = stats.iloc[0]
+        self.assertEqual(row["model_calls"], 2)
+        self.assertEqual(row["completion_tokens"], 10)
+        self.assertEqual(row["rows"], 1)
+        self.assertGreater(row["prompt_tokens"], 0)
+        self.assertEqual(records[0]["prompt"], "how many items?")
+
+    def test_tool_calls_are_logged_with_memory(self):
+        self.ctx.track_memory()
+        self.addCleanup(self.ctx.untrack_memory)
+
+        self.ctx.llm.answer("how many items?")
+
+        record = self.ctx.query_history().iloc[-1]
+        self.assertEqual(record["operation"], "llm_tool_call")
+        self.assertEqual(record["rows"], 1)
+        self.assertGreater(record["peak_bytes"], 0)
+
+    def test_trim_chat_keeps_tool_pairs_within_budget(self):
+        llm = self.ctx.llm
+        for i in range(10):
+            llm.messages.extend([
+                {"role": "user", "content": f"question {i}"},
+                {"role": "assistant", "content": None, "tool_calls": [{"id": f"call_{i}"}]},
+                {"role": "tool", "tool_call_id": f"call_{i}", "content": "word " * 500},
+                {"role": "assistant", "content": f"answer {i}"},
+            ])
+        llm.max_context_tokens = 1500
+
+        total = llm.trim_chat()
+
+        self.assertLessEqual(total, 1500)
+        self.assertEqual(llm.messages[0]["role"], "developer")
+        self.assertEqual(llm.messages[1]["role"], "user")
+        self.assertEqual(llm.messages[-1]["content"], "answer 9")
+        call_ids = {m["tool_calls"][0]["id"] for m in llm.messages if m.get("tool_calls")}
+        result_ids = {m["tool_call_id"] for m in llm.messages if m["role"] == "tool"}
+        self.assertEqual(call_ids, result_ids)
+
+    def test_token_bucket_waits_for_refill(self):
+        bucket = TokenBucket(capacity=10, period=0.1)
+        bucket.acquire(10)
+        self.assertGreater(bucket.acquire(5), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import datetime
+import decimal
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from sqlalchemy import text
+
+from sqthon import Sqthon
+from sqthon.materialize import MaterializedStore, bind_watermark, watermark_of
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+@unittest.skipUnless(pyarrow, "pyarrow is not installed")
+class TestMaterialize(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(
+            database=os.path.join(directory, "test.db"))
+        self.ctx.store = MaterializedStore(os.path.join(directory, "store"))
+        self.ctx.connection.execute(text("CREATE TABLE events (id INTEGER, kind TEXT)"))
+        self.insert(range(1, 4))
+
+    def insert(self, ids):
+        for i in ids:
+            self.ctx.connection.execute(text("INSERT INTO events VALUES (:id, :kind)"), {"id": i, "kind": f"k{i}"})
+        self.ctx.connection.commit()
+
+    def test_fresh_result_is_read_locally(self):
+        query = "SELECT id, kind FROM events"
+        df = self.ctx.materialize("events", query, refresh_by="id")
+        self.assertEqual(df["id"].tolist(), [1, 2, 3])
+
+        self.insert([4])
+        with mock.patch("pandas.read_sql_query") as read_sql:
+            df = self.ctx.materialize("events", query, refresh_by="id")
+        read_sql.assert_not_called()
+        self.assertEqual(len(df), 3)
+
+    def test_incremental_refresh_appends_past_watermark(self):
+        query = "SELECT id, kind FROM events"
+        self.ctx.materialize("events", query, refresh_by="id")
+        self.insert([4, 5])
+
+        df = self.ctx.materialize("events", query, refresh_by="id", max_staleness=0)
+        self.assertEqual(df["id"].tolist(), [1, 2, 3, 4, 5])
+        meta = self.ctx.store.meta("events")
+        self.assertEqual(meta["watermark"], 5)
+        self.assertEqual(len(meta["parts"]), 2)
+
+        df = self.ctx.materialize("events", query, refresh_by="id", refresh=True)
+        self.assertEqual(len(df), 5)
+        self.assertEqual(self.ctx.store.meta("events")["watermark"], 5)
+
+    def test_changed_query_rebuilds(self):
+        self.ctx.materialize("events", "SELECT id, kind FROM events", refresh_by="id")
+        df = self.ctx.materialize("events", "SELECT id FROM events WHERE id > 1", refresh_by="id")
+        self.assertEqual(list(df.columns), ["id"])
+        self.assertEqual(df["id"].tolist(), [2, 3])
+        self.assertEqual(len(self.ctx.store.meta("events")["parts"]), 1)
+
+    def test_other_database_rebuilds(self):
+        other = Sqthon(dialect="sqlite", user="", host="").connect_to_database(
+            database=os.path.join(tempfile.mkdtemp(), "other.db"))
+        other.store = self.ctx.store
+        other.connection.execute(text("CREATE TABLE events (id INTEGER, kind TEXT)"))
+        other.connection.execute(text("INSERT INTO events VALUES (42, 'other')"))
+        other.connection.commit()
+
+        self.ctx.materialize("events", "SELECT * FROM events")
+        df = other.materialize("events", "SELECT * FROM events")
+        self.assertEqual(df["id"].tolist(), [42])
+
+    def test_date_and_decimal_watermarks(self):
+        df = pd.DataFrame({"day": [datetime.date(2024, 1, 1), datetime.date(2024, 3, 1)],
+                           "amount": [decimal.Decimal("1.50"), decimal.Decimal("12.25")]})
+        for column, expected in (("day", datetime.date(2024, 3, 1)), ("amount", decimal.Decimal("12.25"))):
+            meta = self.ctx.store.write(column, df, {"refresh_by": column, "watermark": watermark_of(df, column)})
+            self.assertEqual(bind_watermark(self.ctx.store.meta(column)["watermark"]), expected)
+            self.assertEqual(meta["rows"], 2)
+
+    def test_failed_write_keeps_the_old_result(self):
+        self.ctx.materialize("events", "SELECT id, kind FROM events")
+        with mock.patch.object(MaterializedStore, "_write_meta", side_effect=TypeError("not serializable")):
+            with self.assertRaises(TypeError):
+                self.ctx.store.write("events", pd.DataFrame({"id": [9]}), {})
+
+        self.assertEqual(self.ctx.store.read("events")["id"].tolist(), [1, 2, 3])
+        self.assertEqual(self.ctx.store.names(), ["events"])
+        self.assertEqual(sorted(os.listdir(self.ctx.store.directory)), ["events"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from sqthon import Sqthon
+from sqthon.exception import MemoryThresholdWarning
+
+
+class TestMemoryTracking(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        self.rows = 20_000
+        pd.DataFrame({
+            "id": np.arange(self.rows),
+            "name": [f"name {i}" for i in range(self.rows)],
+        }).to_sql("people", self.ctx.connection, index=False)
+        self.ctx.connection.commit()
+
+    def tearDown(self):
+        self.ctx.untrack_memory()
+
+    def test_queries_are_logged_without_tracking(self):
+        self.ctx.run_query("SELECT * FROM people")
+
+        record = self.ctx.query_history().iloc[-1]
+        self.assertEqual((record["operation"], record["rows"]), ("run_query", self.rows))
+        self.assertIsNone(record["peak_bytes"])
+
+    def test_peak_and_retained_memory(self):
+        self.ctx.track_memory()
+        result = self.ctx.run_query("SELECT * FROM people")
+
+        record = self.ctx.query_history().iloc[-1]
+        self.assertEqual(record["frame_bytes"], int(result.memory_usage(deep=True).sum()))
+        self.assertGreater(record["peak_bytes"], 0)
+        self.assertGreaterEqual(record["peak_bytes"], record["retained_bytes"])
+
+    def test_threshold_warns(self):
+        self.ctx.track_memory(threshold=100_000)
+        with self.assertWarns(MemoryThresholdWarning):
+            self.ctx.run_query("SELECT * FROM people")
+
+    def test_threshold_switches_to_chunks(self):
+        self.ctx.track_memory(threshold=100_000, action="chunk", chunksize=1_000)
+        with self.assertWarns(MemoryThresholdWarning):
+            result = self.ctx.run_query("SELECT * FROM people")
+
+        self.assertNotIsInstance(result, pd.DataFrame)
+        self.assertEqual(sum(len(chunk) for chunk in result), self.rows)
+        record = self.ctx.query_history().iloc[-1]
+        self.assertTrue(record["chunked"])
+        self.assertEqual(record["rows"], self.rows)
+
+    def test_threshold_warning_is_shown_by_default(self):
+        # ResourceWarning is in Python's default ignore filters.
+        self.assertNotIsInstance(MemoryThresholdWarning(), ResourceWarning)
+
+    def test_small_results_stay_frames_in_chunk_mode(self):
+        self.ctx.track_memory(threshold=100_000_000, action="chunk", chunksize=1_000)
+        result = self.ctx.run_query("SELECT * FROM people")
+        self.assertEqual(len(result), self.rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import decimal
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import text
+
+from sqthon import Sqthon
+from sqthon.partition import partition_bounds
+
+
+class TestParallelRead(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path, pool_size=4)
+        self.ctx.connection.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, score REAL, at TEXT)"))
+        self.ctx.connection.execute(
+            text("INSERT INTO events (score, at) VALUES (:score, :at)"),
+            [{"score": None if i % 50 == 0 else i / 7, "at": f"2024-01-{i % 28 + 1:02d} 10:00:00"}
+             for i in range(1000)],
+        )
+        self.ctx.connection.commit()
+
+    def test_partitions_cover_every_row(self):
+        for column in ("id", "score", "at"):
+            result = self.ctx.parallel_read("events", column, num_partitions=4, max_workers=3)
+            self.assertEqual(sorted(result["id"]), list(range(1, 1001)), column)
+
+        self.assertEqual(self.ctx.query_log[-1]["operation"], "parallel_read")
+        self.assertEqual(self.ctx.query_log[-1]["rows"], 1000)
+
+    def test_schema_qualified_table(self):
+        result = self.ctx.parallel_read("main.events", "id", num_partitions=3)
+        self.assertEqual(len(result), 1000)
+
+    def test_stream_in_order(self):
+        chunks = list(self.ctx.parallel_read("SELECT id, score FROM events WHERE id > 100", "id",
+                                             num_partitions=3, stream=True, ordered=True))
+        self.assertEqual(len(chunks), 3)
+        ids = [i for chunk in chunks for i in chunk["id"]]
+        self.assertEqual(ids, list(range(101, 1001)))
+
+    def test_stream_keeps_max_workers_partitions_in_flight(self):
+        chunks = self.ctx.parallel_read("events", "id", num_partitions=8, max_workers=1, stream=True)
+        checkouts = self.ctx.pool_stats()["checkouts"]
+
+        next(chunks)
+
+        # The partition taken plus the one submitted in its place; not all eight.
+        self.assertLessEqual(self.ctx.pool_stats()["checkouts"] - checkouts, 2)
+        self.assertEqual(len(list(chunks)), 7)
+
+    def test_partition_bounds(self):
+        self.assertEqual(partition_bounds(1, 100, 4), [26, 51, 76])
+        self.assertEqual(partition_bounds(1, 2, 4), [2])
+        self.assertEqual(partition_bounds(0.0, 1.0, 2), [0.5])
+        self.assertEqual(partition_bounds(decimal.Decimal("0"), 1.0, 2), [0.5])
+        self.assertEqual(partition_bounds(decimal.Decimal("0"), decimal.Decimal("1"), 2), [decimal.Decimal("0.5")])
+        self.assertEqual(partition_bounds("2024-01-01", "2024-01-03", 2), ["2024-01-02 00:00:00"])
+        with self.assertRaises(ValueError):
+            partition_bounds("a", "z", 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from sqthon import Sqthon
+
+
+class TestPool(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.sq = Sqthon(dialect="sqlite", user="", host="")
+
+    def test_warm_opens_connections(self):
+        ctx = self.sq.connect_to_database(self.path, pool_size=6, warm=4)
+        stats = ctx.pool_stats()
+        self.assertEqual(stats["size"], 6)
+        self.assertEqual(stats["checked_out"], 1)
+        self.assertEqual(stats["checked_in"], 4)
+        self.assertEqual(stats["connects"], 5)
+
+        with ctx.connection.engine.connect():
+            pass
+        self.assertEqual(ctx.pool_stats()["connects"], 5)
+
+    def test_wait_and_timeout_gauges(self):
+        ctx = self.sq.connect_to_database(self.path, pool_size=2, max_overflow=0, pool_timeout=0.2)
+        engine = ctx.connection.engine
+        held = engine.connect()
+
+        def release():
+            time.sleep(0.05)
+            held.close()
+
+        threading.Thread(target=release).start()
+        with engine.connect():
+            with self.assertRaises(PoolTimeoutError):
+                engine.connect()
+
+        stats = ctx.pool_stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["waits"], 2)
+        self.assertGreaterEqual(stats["max_wait_s"], 0.15)
+        self.assertGreater(stats["wait_s"], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
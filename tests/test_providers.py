@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import text
+
+from sqthon import Sqthon
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal /api/chat. Models named 'no-tools' reject tools like older Ollama models do."""
+
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubOllamaHandler.requests.append(payload)
+        last = payload["messages"][-1]
+
+        if payload["model"] == "no-tools" and "tools" in payload:
+            return self._reply(400, {"error": "registry.ollama.ai/library/no-tools does not support tools"})
+
+        if "tools" in payload and last["role"] == "user":
+            message = {"role": "assistant", "content": "",
+                       "tool_calls": [{"function": {"name": "ask_db", "arguments": {"query": "SELECT COUNT(*) AS n FROM items"}}}]}
+        elif payload.get("format") == "json" and payload["messages"][-2]["role"] == "user":
+            message = {"role": "assistant", "content": json.dumps({"query": "SELECT COUNT(*) AS n FROM items"})}
+        else:
+            tool = next(m for m in reversed(payload["messages"]) if m["role"] == "tool")
+            answer = f"Result: {tool['content']}"
+            content = json.dumps({"answer": answer}) if payload.get("format") == "json" else answer
+            message = {"role": "assistant", "content": content}
+        self._reply(200, {"model": payload["model"], "message": message, "done": True,
+                          "prompt_eval_count": 12, "eval_count": 4})
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOllamaProvider(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        os.environ.pop("OLLAMA_HOST", None)
+
+    def connect(self, model: str):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(
+            database=path, use_llm=True, model=model, llm_provider="ollama"
+        )
+        ctx.connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        ctx.connection.execute(text("INSERT INTO items VALUES (1), (2)"))
+        ctx.connection.commit()
+        return ctx
+
+    def test_tool_calling(self):
+        ctx = self.connect("llama3.1")
+        content, result = ctx.llm.answer("How many items?")
+        self.assertEqual(content, 'Result: [{"n": 2}]')
+        self.assertEqual(result.iloc[0]["n"], 2)
+        self.assertEqual(StubOllamaHandler.requests[-1]["messages"][0]["role"], "system")
+
+    def test_json_mode_fallback(self):
+        ctx = self.connect("no-tools")
+        content, result = ctx.llm.answer("How many items?")
+        self.assertEqual(content, 'Result: [{"n": 2}]')
+        self.assertIn("no-tools", ctx.llm.provider.json_mode_models)
+
+
+if __name__ == "__main__":
+    unittest.main()
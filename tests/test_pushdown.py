@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from sqthon import Sqthon
+from sqthon.pushdown import box_query
+
+
+class TestPushdown(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        rng = np.random.default_rng(0)
+        self.sales = pd.DataFrame({
+            "region": rng.choice(["north", "south", "east"], size=5_000),
+            "amount": rng.uniform(0, 100, size=5_000),
+        })
+        self.sales.to_sql("sales", self.ctx.connection, index=False)
+        self.ctx.connection.commit()
+
+    def tearDown(self):
+        plt.close("all")
+
+    def test_bar_is_grouped_in_sql(self):
+        result = self.ctx.run_query("SELECT * FROM sales", visualize=True, plot_type="bar",
+                                    x="region", y="amount", aggregate=True)
+
+        expected = self.sales.groupby("region")["amount"].mean()
+        self.assertEqual(len(result), 3)
+        for _, row in result.iterrows():
+            self.assertAlmostEqual(row["amount"], expected[row["region"]])
+
+    def test_hist_is_binned_in_sql(self):
+        result = self.ctx.run_query("SELECT amount FROM sales", visualize=True, plot_type="hist",
+                                    x="amount", aggregate=True, bins=10)
+
+        counts, _ = np.histogram(self.sales["amount"], bins=10)
+        self.assertEqual(result["count"].tolist(), counts.tolist())
+
+    def test_box_falls_back_on_sqlite(self):
+        result = self.ctx.run_query("SELECT * FROM sales", visualize=True, plot_type="box",
+                                    x="region", y="amount", aggregate=True)
+        self.assertEqual(len(result), 5_000)
+
+    def test_hist_of_dates_falls_back(self):
+        days = pd.DataFrame({"day": pd.date_range("2024-01-01", periods=500, freq="h")})
+        days.to_sql("days", self.ctx.connection, index=False)
+
+        result = self.ctx.run_query("SELECT day FROM days", visualize=True, plot_type="hist",
+                                    x="day", aggregate=True, bins=10)
+        self.assertEqual(len(result), 500)
+
+    def test_plot_aggregated_box(self):
+        stats = pd.DataFrame({"region": ["north", "south"], "min": [0, 1], "q1": [2, 3], "med": [4, 5],
+                              "q3": [6, 7], "max": [20, 9]})
+        self.ctx.visualizer.plot_aggregate(stats, "box", x="region", y="amount")
+
+    def test_box_groups_by_hue(self):
+        quote = self.ctx.connection.engine.dialect.identifier_preparer.quote
+        sql = box_query("SELECT * FROM sales", "region", "amount", quote, "postgresql", hue="kind")
+        self.assertIn('GROUP BY region, kind', sql)
+
+        stats = pd.DataFrame({"region": ["north", "north"], "kind": ["a", "b"], "min": [0, 1], "q1": [2, 3],
+                              "med": [4, 5], "q3": [6, 7], "max": [20, 9]})
+        self.ctx.visualizer.plot_aggregate(stats, "box", x="region", y="amount", hue="kind", show=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
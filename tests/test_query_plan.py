@@ -0,0 +1,55 @@
+import unittest
+
+from sqthon.exception import QueryBudgetExceeded
+from sqthon.query_plan import streams_rows, table_references
+from tests.test_llm import make_context
+
+
+class TestQueryPlan(unittest.TestCase):
+    def setUp(self):
+        self.ctx = make_context(rows=50)
+
+    def test_explain_estimates_cross_join(self):
+        plan = self.ctx.explain("SELECT * FROM items a, items b")
+        self.assertEqual(plan["returned"], 2500)
+        self.assertEqual(plan["examined"], 50 + 50 * 50)
+        self.assertTrue(all(scan["full_scan"] for scan in plan["scans"]))
+
+        plan = self.ctx.explain("SELECT * FROM items i WHERE i.id = 3")
+        self.assertEqual(plan["examined"], 1)
+        self.assertFalse(plan["scans"][0]["full_scan"])
+
+        plan = self.ctx.explain("SELECT COUNT(*) FROM items")
+        self.assertEqual((plan["examined"], plan["returned"]), (50, 1))
+
+    def test_check_budget(self):
+        llm = self.ctx.llm
+        llm.max_rows = 100
+        query = "SELECT * FROM items a CROSS JOIN items b"
+
+        with self.assertRaises(QueryBudgetExceeded):
+            llm.check_budget(query)
+
+        llm.over_budget = "limit"
+        self.assertEqual(len(llm.ask_db(query)), 100)
+        self.assertEqual(llm.check_budget("SELECT * FROM items"), "SELECT * FROM items")
+        # A LIMIT around an aggregate doesn't bound the rows it reads.
+        with self.assertRaises(QueryBudgetExceeded):
+            llm.check_budget("SELECT COUNT(*) FROM items a CROSS JOIN items b")
+
+    def test_streams_rows(self):
+        self.assertTrue(streams_rows("WITH t AS (SELECT COUNT(*) AS n FROM items) SELECT * FROM t"))
+        self.assertTrue(streams_rows("SELECT a.id FROM items a WHERE a.id IN (SELECT MAX(id) FROM items)"))
+        self.assertFalse(streams_rows("SELECT name, COUNT(*) FROM items GROUP BY name"))
+        self.assertFalse(streams_rows("SELECT DISTINCT name FROM items"))
+        self.assertFalse(streams_rows("SELECT * FROM items ORDER BY name"))
+
+    def test_table_references(self):
+        self.assertEqual(
+            table_references("SELECT * FROM orders AS o JOIN customers c ON o.cid = c.id WHERE o.x = 1"),
+            {"orders": "orders", "o": "orders", "customers": "customers", "c": "customers"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
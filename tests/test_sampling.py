@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import text
+
+from sqthon import Sqthon
+from sqthon.sampling import approx_distinct, key_ranges, sample_query, sample_tables
+import pandas as pd
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        self.ctx.connection.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, kind TEXT, amount REAL)"))
+        self.ctx.connection.execute(
+            text("INSERT INTO events (kind, amount) VALUES (:kind, :amount)"),
+            [{"kind": f"k{i % 10}", "amount": None if i % 4 == 0 else float(i)} for i in range(50_000)],
+        )
+        self.ctx.connection.commit()
+
+    def test_describe_table(self):
+        result = self.ctx.describe_table("events", sample_rows=5000)
+        self.assertEqual(result["rows"], 50_000)
+        self.assertEqual(result["rows_source"], "rowid")
+        self.assertLessEqual(result["sample_rows"], 5000)
+        self.assertGreater(result["sample_rows"], 4000)
+
+        columns = result["columns"].set_index("column")
+        self.assertEqual(columns.loc["kind", "distinct"], 10)
+        self.assertAlmostEqual(columns.loc["amount", "null_fraction"], 0.25, delta=0.02)
+        self.assertGreater(columns.loc["id", "distinct"], 40_000)
+
+        self.ctx.connection.execute(text("ANALYZE"))
+        self.assertEqual(self.ctx.describe_table("events")["rows_source"], "sqlite_stat1")
+
+    def test_sampled_run_query(self):
+        sampled = self.ctx.run_query("SELECT e.kind, COUNT(*) AS n FROM events AS e WHERE e.amount IS NOT NULL "
+                                     "GROUP BY e.kind ORDER BY e.kind", sample=0.1, seed=3)
+        self.assertEqual(len(sampled), 10)
+        self.assertAlmostEqual(sampled["n"].sum(), 3750, delta=100)
+        self.assertIn("BETWEEN", self.ctx.query_log[-1]["query"])
+
+        again = self.ctx.run_query("SELECT e.kind, COUNT(*) AS n FROM events AS e WHERE e.amount IS NOT NULL "
+                                   "GROUP BY e.kind ORDER BY e.kind", sample=0.1, seed=3)
+        self.assertTrue(sampled.equals(again))
+
+        rows = self.ctx.sample("events", rows=1000, seed=1)
+        self.assertEqual(len(rows), 1000)
+        self.assertFalse(rows["id"].equals(self.ctx.sample("events", rows=1000, seed=2)["id"]))
+
+    def test_unknown_row_count_is_not_a_head_read(self):
+        with self.assertWarns(UserWarning):
+            query = sample_query("events", self.ctx.connection, rows=100, stats={"rows": None})
+        self.assertEqual(query, 'SELECT * FROM events ORDER BY random() LIMIT 100')
+        ids = self.ctx.connection.execute(text(query)).scalars().all()
+        self.assertEqual(len(ids), 100)
+        self.assertGreater(max(ids), 100)
+
+    def test_sample_tables_keeps_aliases(self):
+        query = sample_tables("SELECT * FROM events JOIN events b ON events.id = b.id WHERE b.id < 10",
+                              self.ctx.connection, fraction=0.5)
+        self.assertRegex(query, r"^SELECT \* FROM \(SELECT \* FROM events WHERE .*\) AS events "
+                                r"JOIN \(SELECT \* FROM events WHERE .*\) AS b ON events.id = b.id WHERE b.id < 10$")
+
+    def test_sample_tables_comma_joins_and_hints(self):
+        query = sample_tables("SELECT a.id, b.id FROM events a, events AS b WHERE a.id = b.id",
+                              self.ctx.connection, fraction=0.5)
+        self.assertRegex(query, r"^SELECT a.id, b.id FROM \(SELECT .*\) AS a, \(SELECT .*\) AS b WHERE a.id = b.id$")
+
+        with self.assertRaises(ValueError):
+            sample_tables("SELECT * FROM events INDEXED BY ix_kind", self.ctx.connection, fraction=0.5)
+
+    def test_key_ranges_are_seeded_and_disjoint(self):
+        ranges = key_ranges(1, 1_000_000, 0.01, seed=7)
+        self.assertEqual(ranges, key_ranges(1, 1_000_000, 0.01, seed=7))
+        self.assertEqual(sum(b - a + 1 for a, b in ranges), 10_000)
+        self.assertTrue(all(b1 < a2 for (_, b1), (a2, _) in zip(ranges, ranges[1:])))
+
+    def test_approx_distinct(self):
+        self.assertEqual(approx_distinct(pd.Series([1, 1, 2, None]), 4), 2)
+        self.assertEqual(approx_distinct(pd.Series(range(100)), 10_000), 10_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from sqthon import Sqthon
+from sqthon.sqlite_profile import create_sqlite_engine, pragmas
+
+
+class TestSqliteProfile(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "test.db")
+
+    def test_performance_profile(self):
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(
+            database=self.path, sqlite_profile="performance")
+        self.assertEqual(ctx.connection.engine.pool.size(), 20)
+        pragma = lambda name: ctx.connection.execute(text(f"PRAGMA {name}")).scalar()
+        self.assertEqual(pragma("journal_mode"), "wal")
+        self.assertEqual(pragma("synchronous"), 1)
+        self.assertEqual(pragma("mmap_size"), 256 * 1024 * 1024)
+        self.assertEqual(pragma("busy_timeout"), 5000)
+
+    def test_read_only_parallel_reads(self):
+        writer = create_sqlite_engine(self.path, profile="performance")
+        with writer.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+
+        reader = create_sqlite_engine(self.path, profile="performance", mode="ro", pool_size=4)
+        self.assertNotIn("journal_mode", pragmas("performance", "ro"))
+
+        def total(_):
+            with reader.connect() as conn:
+                return conn.execute(text("SELECT SUM(x) FROM t")).scalar()
+
+        with ThreadPoolExecutor(4) as pool:
+            self.assertEqual(list(pool.map(total, range(8))), [6] * 8)
+        with reader.connect() as conn, self.assertRaises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (4)"))
+
+    def test_shared_in_memory(self):
+        engine = create_sqlite_engine("shared_test", profile="performance", mode="memory")
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("CREATE TABLE t (x INTEGER)"))
+            first.execute(text("INSERT INTO t VALUES (1)"))
+            first.commit()
+            self.assertEqual(second.execute(text("SELECT COUNT(*) FROM t")).scalar(), 1)
+        self.assertFalse(os.path.exists("shared_test"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
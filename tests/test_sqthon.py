@@ -1,25 +1,57 @@
+import os
+import tempfile
 import unittest
+
+import matplotlib.pyplot as plt
+
 from sqthon import Sqthon
 
 
 class TestSqthon(unittest.TestCase):
     def setUp(self):
-        """Set up a sqthon instance before each test."""
-        self.sqthon = Sqthon("postgresql", "psycopg2", "sqlbook", "MySQL84")
+        """Set up a sqthon instance and a SQLite database before each test."""
+        self.sqthon = Sqthon(dialect="sqlite", user="", host="")
+        self.db = self.sqthon.connect_to_database(database=os.path.join(tempfile.mkdtemp(), "test.db"))
+
+    def tearDown(self):
+        plt.close("all")
 
     def test_run_query_without_visualization(self):
         """Test that the run query method works without visualization"""
         query = """SELECT 1 as test_column"""
-        result = self.sqthon.run_query(query=query)
+        result = self.db.run_query(query=query)
         self.assertEqual(result.iloc[0]['test_column'], 1)
 
     def test_run_query_with_visualization(self):
         """Test that the run query method works with visualization."""
         query = """SELECT 1 as test_column"""
-        result = self.sqthon.run_query(query=query, visualize=True, plot_type="scatter", x="test_column",
-                                       y="test_column", title="test_plot")
+        result = self.db.run_query(query=query, visualize=True, plot_type="scatter", x="test_column",
+                                   y="test_column", title="test_plot")
         self.assertEqual(result.iloc[0]['test_column'], 1)
 
+    def test_run_query_result_types(self):
+        """Test the rows, scalar and columns result types."""
+        query = "SELECT 1 AS a, 'x' AS b UNION ALL SELECT 2, 'y'"
+        rows = self.db.run_query(query, as_="rows")
+        self.assertEqual([tuple(row) for row in rows], [(1, "x"), (2, "y")])
+        self.assertEqual(rows[1].b, "y")
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM (SELECT 1)", as_="scalar"), 1)
+        self.assertIsNone(self.db.run_query("SELECT 1 WHERE 0", as_="scalar"))
+
+        columns = self.db.run_query(query, as_="columns")
+        self.assertEqual(list(columns), ["a", "b"])
+        self.assertEqual(columns["a"].tolist(), [1, 2])
+        self.assertEqual(len(self.db.run_query("SELECT 1 AS a WHERE 0", as_="columns")["a"]), 0)
+        self.assertEqual(self.db.query_log[-1]["result_type"], "columns")
+
+        with self.assertRaises(ValueError):
+            self.db.run_query(query, as_="dict")
+
+    def test_generate_date_series(self):
+        self.db.generate_date_series("dates", "2024-01-01", "2024-12-31", index=False)
+        result = self.db.run_query("SELECT COUNT(*) AS n FROM dates")
+        self.assertEqual(result.iloc[0]["n"], 366)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import matplotlib.pyplot as plt
+
+from sqthon import Sqthon
+from sqthon import tracing
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.spans = []
+        self.tracer = tracing.add_tracer(self.spans.append)
+
+    def tearDown(self):
+        tracing.remove_tracer(self.tracer)
+        plt.close("all")
+
+    def test_spans_for_connect_query_and_plot(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        ctx.run_query("SELECT 1 AS a, 2 AS b", visualize=True, plot_type="scatter", x="a", y="b")
+
+        by_name = {}
+        for s in self.spans:
+            by_name.setdefault(s.name, []).append(s)
+
+        self.assertEqual(by_name["sqthon.connect"][0].attributes["dialect"], "sqlite")
+        self.assertIn("sqthon.checkout", by_name)
+        run_query = by_name["sqthon.run_query"][0]
+        self.assertEqual(run_query.attributes["rows"], 1)
+        self.assertGreater(run_query.attributes["bytes"], 0)
+        execute = [s for s in by_name["sqthon.execute"] if s.parent is run_query]
+        self.assertEqual(len(execute), 1)
+        self.assertEqual(by_name["sqthon.plot"][0].attributes["plot_type"], "scatter")
+        self.assertTrue(all(s.duration_s >= 0 for s in self.spans))
+
+    def test_checkout_span_covers_the_pool_wait(self):
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path, pool_size=2,
+                                                                             max_overflow=0)
+        engine = ctx.connection.engine
+        held, release = threading.Event(), threading.Event()
+
+        def hold():
+            with engine.connect():
+                held.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+        threading.Timer(0.2, release.set).start()
+        self.spans.clear()
+        with engine.connect():
+            pass
+        holder.join()
+
+        checkout = [s for s in self.spans if s.name == "sqthon.checkout"]
+        self.assertEqual(len(checkout), 1)
+        self.assertGreater(checkout[0].duration_s, 0.15)
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(ZeroDivisionError):
+            with tracing.span("work"):
+                1 / 0
+        self.assertIsInstance(self.spans[-1].error, ZeroDivisionError)
+
+    def test_disabled_returns_noop(self):
+        tracing.remove_tracer(self.tracer)
+        self.assertFalse(tracing.enabled())
+        with tracing.span("work") as s:
+            s.set(rows=1)
+        self.assertEqual(self.spans, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
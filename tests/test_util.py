@@ -0,0 +1,37 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from sqthon.util import dataframe_preview, limit_query
+
+
+class TestUtil(unittest.TestCase):
+    def test_dataframe_preview_serializes_head_only(self):
+        df = pd.DataFrame({
+            "id": np.arange(100_000),
+            "amount": np.where(np.arange(100_000) % 10 == 0, np.nan, 1.5),
+            "day": pd.date_range("2024-01-01", periods=100_000, freq="min"),
+            "name": "x",
+        })
+
+        preview = dataframe_preview(df, max_rows=5)
+
+        self.assertEqual(preview["row_count"], 100_000)
+        self.assertEqual(len(preview["rows"]), 5)
+        self.assertEqual(preview["columns"]["id"]["max"], 99_999)
+        self.assertEqual(preview["columns"]["amount"]["nulls"], 10_000)
+        self.assertNotIn("min", preview["columns"]["name"])
+        json.dumps(preview)
+
+    def test_limit_query(self):
+        self.assertEqual(
+            limit_query("SELECT * FROM sales;", 10),
+            "SELECT * FROM (SELECT * FROM sales) AS sqthon_limited LIMIT 10",
+        )
+        self.assertEqual(limit_query("SHOW TABLES", 10), "SHOW TABLES")
+
+
+if __name__ == "__main__":
+    unittest.main()
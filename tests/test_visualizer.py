@@ -1,12 +1,23 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
+import numpy as np
 import pandas as pd
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
 from sqthon.data_visualizer import DataVisualizer
+from sqthon.figure_cache import FigureCache
+from sqthon.downsample import lttb, downsample_line
 
 class TestDataVisualizer(unittest.TestCase):
     def setUp(self):
         """Set up a DataVisualizer instance before each test."""
         self.visualizer = DataVisualizer()
 
+    def tearDown(self):
+        plt.close("all")
+
     def test_plot(self):
         """Test that the plot method runs without errors."""
         df = pd.DataFrame({
@@ -16,6 +27,132 @@ class TestDataVisualizer(unittest.TestCase):
 
         self.visualizer.plot(df, plot_type="scatter", x="x", y="y", title="Test for scatter plot")
 
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        x = np.arange(100_000, dtype=float)
+        y = np.sin(x / 1000)
+        y[54_321] = 10
+
+        kept = lttb(x, y, 500)
+
+        self.assertEqual(len(kept), 500)
+        self.assertEqual((kept[0], kept[-1]), (0, 99_999))
+        self.assertIn(54_321, kept)
+
+    def test_downsample_line_per_hue(self):
+        df = pd.DataFrame({
+            "day": np.tile(pd.date_range("2020-01-01", periods=50_000, freq="min"), 2),
+            "value": np.random.default_rng(0).normal(size=100_000),
+            "kind": np.repeat(["a", "b"], 50_000),
+        })
+
+        reduced = downsample_line(df, "day", "value", max_points=1000, hue="kind")
+
+        self.assertEqual(len(reduced), 1000)
+        self.assertEqual(reduced["kind"].value_counts().to_dict(), {"a": 500, "b": 500})
+
+    def test_plot_large_frames(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"x": np.arange(200_000), "y": rng.normal(size=200_000)})
+
+        for plot_type in ("line", "scatter", "hist", "kde"):
+            y = None if plot_type in ("hist", "kde") else "y"
+            self.visualizer.plot(df, plot_type=plot_type, x="x" if y else "y", y=y, max_points=5_000)
+
+    def test_plot_large_frames_with_text_and_date_columns(self):
+        days = pd.date_range("2000-01-01", periods=20_000, freq="h")
+        df = pd.DataFrame({
+            "day": days.strftime("%Y-%m-%d %H:%M:%S"),
+            "date": days.date,
+            "kind": np.tile(["a", "b", "c"], 20_000)[:20_000],
+            "y": np.random.default_rng(0).normal(size=20_000),
+        })
+
+        self.visualizer.plot(df, plot_type="line", x="day", y="y", max_points=1_000)
+        self.visualizer.plot(df, plot_type="line", x="date", y="y", max_points=1_000)
+        self.visualizer.plot(df, plot_type="hist", x="kind", max_points=1_000)
+        self.visualizer.plot(df, plot_type="hist", x="date", max_points=1_000)
+        self.visualizer.plot(df, plot_type="scatter", x="kind", y="y", max_points=1_000)
+        self.visualizer.plot(df, plot_type="hist", x="y", max_points=1_000, binwidth=0.5)
+
+    def test_scatter_hexbin_with_datetime_x(self):
+        days = pd.date_range("2000-01-01", periods=30_000, freq="min")
+        df = pd.DataFrame({"at": days, "day": days.strftime("%Y-%m-%d %H:%M:%S"), "date": days.date,
+                           "y": np.random.default_rng(0).normal(size=30_000)})
+
+        for x in ("at", "day", "date"):
+            fig = self.visualizer.plot(df, plot_type="scatter", x=x, y="y")
+            ax = fig.axes[0]
+            self.assertEqual(len(ax.collections), 1, x)
+            self.assertIsInstance(ax.xaxis.get_major_formatter(), mdates.AutoDateFormatter)
+            plt.close(fig)
+
+    def test_render_batch_writes_files(self):
+        df = pd.DataFrame({"x": range(50), "y": np.arange(50) ** 2})
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = [
+                (df, {"plot_type": "line", "x": "x", "y": "y"}, Path(tmp) / "line.png"),
+                (df, {"plot_type": "bar", "x": "x", "y": "y"}, Path(tmp) / "nested" / "bar.svg"),
+                (df, {"plot_type": "unknown", "x": "x"}, Path(tmp) / "bad.png"),
+            ]
+            results = DataVisualizer.render_batch(jobs, max_workers=2)
+
+            self.assertEqual([r["path"] for r in results], [str(job[2]) for job in jobs])
+            self.assertIsNone(results[0]["error"])
+            self.assertTrue((Path(tmp) / "line.png").read_bytes().startswith(b"\x89PNG"))
+            self.assertIn(b"<svg", (Path(tmp) / "nested" / "bar.svg").read_bytes())
+            self.assertIn("Unsupported plot type", results[2]["error"])
+
+
+    def test_figure_cache_reuses_and_evicts(self):
+        df = pd.DataFrame({"x": range(20), "y": range(20)})
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FigureCache(tmp)
+            first = DataVisualizer.plot_cached(df, cache, plot_type="line", x="x", y="y")
+            again = DataVisualizer.plot_cached(df.copy(), cache, plot_type="line", x="x", y="y")
+            self.assertEqual(first, again)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            changed = df.assign(y=df["y"] * 2)
+            other = DataVisualizer.plot_cached(changed, cache, plot_type="line", x="x", y="y")
+            self.assertNotEqual(first, other)
+
+            cache.max_bytes = other.stat().st_size
+            os.utime(first, (0, 0))
+            cache.evict()
+            self.assertFalse(first.exists())
+            self.assertTrue(other.exists())
+
+            results = DataVisualizer.render_batch(
+                [(changed, {"plot_type": "line", "x": "x", "y": "y"}, Path(tmp) / "out" / "a.png")], cache=cache
+            )
+            self.assertTrue(results[0]["cached"])
+            self.assertTrue((Path(tmp) / "out" / "a.png").exists())
+
+
+    def test_multi_plot_fetches_panel_queries(self):
+        from sqthon import Sqthon
+
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        ctx = Sqthon(dialect="sqlite", user="", host="").connect_to_database(database=path)
+        pd.DataFrame({"day": range(30), "sales": range(30), "region": ["a", "b", "c"] * 10,
+                      "notes": ["x" * 100] * 30}).to_sql("sales", ctx.connection, index=False)
+        ctx.connection.commit()
+        local = pd.DataFrame({"x": [1, 2, 3], "y": [3, 2, 1]})
+        specs = [
+            {"type": "line", "x": "x", "y": "y", "subtitle": "local"},
+            {"type": "line", "x": "day", "y": "sales", "query": "SELECT * FROM sales", "subtitle": "sales"},
+            {"type": "bar", "x": "region", "y": "sales", "query": "SELECT * FROM sales WHERE day < 10",
+             "context": ctx, "subtitle": "regions"},
+        ]
+        original = [dict(spec) for spec in specs]
+
+        fig = DataVisualizer.multi_plot(local, specs, context=ctx, show=False, yticks=[0, 10, 20])
+
+        self.assertEqual(specs, original)
+        self.assertEqual([ax.get_title() for ax in fig.axes], ["local", "sales", "regions"])
+        self.assertEqual(len(fig.axes[1].lines[0].get_xdata()), 30)
+        self.assertEqual(list(fig.axes[2].get_yticks()), [0, 10, 20])
+
 
 if __name__ == "__main__":
     unittest.main()